@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase 
+from pymongo.write_concern import WriteConcern
 from typing import Optional
 from .settings import settings 
+from ..shared.metrics import MongoCommandMetrics
 
 class DatabaseConnection: 
     client: Optional[AsyncIOMotorClient] = None 
@@ -9,7 +11,8 @@ class DatabaseConnection:
 db_connection = DatabaseConnection()
 
 async def connect_to_mongo():
-    db_connection.client = AsyncIOMotorClient(settings.mongo_url)
+    event_listeners = [MongoCommandMetrics()] if settings.metrics_enabled else []
+    db_connection.client = AsyncIOMotorClient(settings.mongo_url, event_listeners=event_listeners)
     db_connection.database = db_connection.client[settings.database_name]
     
 async def close_mongo_connection():
@@ -17,4 +20,17 @@ async def close_mongo_connection():
         db_connection.client.close()
         
 def get_database() -> Optional[AsyncIOMotorDatabase]:
-    return db_connection.database
\ No newline at end of file
+    return db_connection.database
+
+def get_write_concern() -> Optional[WriteConcern]:
+    options = {}
+
+    if settings.mongo_write_concern_w is not None:
+        w = settings.mongo_write_concern_w
+        options["w"] = int(w) if w.isdigit() else w
+    if settings.mongo_write_concern_journal is not None:
+        options["j"] = settings.mongo_write_concern_journal
+    if settings.mongo_write_concern_timeout_ms is not None:
+        options["wtimeout"] = settings.mongo_write_concern_timeout_ms
+
+    return WriteConcern(**options) if options else None
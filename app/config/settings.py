@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings 
-from typing import Optional 
+from typing import Dict, Optional 
 
 class Settings(BaseSettings): 
     
@@ -9,8 +9,72 @@ class Settings(BaseSettings):
     version: str = "1.0.0"
     
     # Database settings 
+    # "mongodb" or "memory" (process-local, for load-test baselines and ephemeral environments)
+    order_repository_backend: str = "mongodb"
     mongo_url: str = "mongodb://localhost:27017" 
     database_name: str = "orders_db"
+    mongo_ensure_indexes: bool = True
+    mongo_drop_drifted_indexes: bool = False
+    # Build entities from stored documents without re-running validation (they were validated on the way in)
+    mongo_trusted_reads: bool = True
+    
+    # Write concern for order writes; unset values fall back to the server/URI defaults
+    mongo_write_concern_w: Optional[str] = None
+    mongo_write_concern_journal: Optional[bool] = None
+    mongo_write_concern_timeout_ms: Optional[int] = None
+    
+    # Order counters: how often drifted counts are recomputed from the orders collection (0 disables)
+    order_counters_reconcile_interval_seconds: int = 3600
+    # How long reconciliation waits for in-flight counter updates before trusting a count unchanged
+    order_counters_reconcile_settle_seconds: float = 5.0
+    
+    # Order cache for GET by id: in-process LRU plus an optional shared tier ("redis" or "local")
+    order_cache_enabled: bool = True
+    order_cache_max_size: int = 10000
+    order_cache_ttl_seconds: float = 10.0
+    order_cache_shared_backend: Optional[str] = None
+    redis_url: str = "redis://localhost:6379/0"
+    
+    # Concurrent GETs by id in the same event-loop tick are served by one $in query
+    order_get_coalescing_enabled: bool = True
+    order_get_coalescing_max_batch_size: int = 100
+    
+    # Transactional outbox: order.created events are stored with the order and relayed to RabbitMQ
+    # by a background task. Transactions need a replica set; on a standalone server the event is
+    # written right after the order instead
+    outbox_enabled: bool = True
+    outbox_use_transactions: bool = True
+    outbox_relay_batch_size: int = 100
+    outbox_relay_poll_interval_seconds: float = 0.5
+    outbox_relay_lease_seconds: float = 30.0
+    outbox_sent_retention_seconds: int = 86400
+    
+    # Idempotency-Key support for order creation: responses are replayed to retries for the TTL.
+    # An attempt still running after the lock timeout is assumed dead and may be run again
+    idempotency_enabled: bool = True
+    idempotency_ttl_seconds: int = 86400
+    idempotency_lock_timeout_seconds: float = 30.0
+    idempotency_wait_timeout_seconds: float = 10.0
+    idempotency_cache_max_size: int = 10000
+    
+    # Admission control: at most `max_concurrency` order requests run at once; the rest wait up to
+    # the queue timeout in a bounded queue ordered by priority (status changes, then reads and
+    # creates, then batch endpoints), and are answered 503 with Retry-After when it is full or times out.
+    # Per-class caps, e.g. ADMISSION_CLASS_LIMITS='{"bulk": 8}'
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 256
+    admission_max_queue_size: int = 512
+    admission_queue_timeout_seconds: float = 1.0
+    admission_retry_after_seconds: int = 1
+    admission_class_limits: Dict[str, int] = {"bulk": 16}
+    
+    # Live order streams (Server-Sent Events) fed by status changes made in this process. A client
+    # more than `buffer_size` events behind is disconnected and resumes with Last-Event-ID
+    order_stream_heartbeat_seconds: float = 15.0
+    order_stream_buffer_size: int = 100
+    order_stream_history_size: int = 1000
+    order_stream_max_subscribers: int = 10000
+    order_stream_retry_ms: int = 3000
     
     # RabbitMQ settings 
     rabbitmq_host: str = "localhost"
@@ -18,12 +82,68 @@ class Settings(BaseSettings):
     rabbitmq_username: str = "guest"
     rabbitmq_password: str = "guest"
     rabbitmq_vhost: str = "/"
+    rabbitmq_channel_pool_size: int = 8
+    # Unconfirmed publishes allowed at once; further publishes wait for a slot
+    rabbitmq_max_in_flight: int = 256
+    rabbitmq_publish_timeout_seconds: float = 5.0
+    # Connection supervisor: reconnect backoff (full jitter, doubling up to the max), how long a
+    # publish waits for a connection in progress, and the circuit breaker in front of publishes
+    rabbitmq_reconnect_initial_delay_seconds: float = 0.5
+    rabbitmq_reconnect_max_delay_seconds: float = 30.0
+    rabbitmq_connect_wait_seconds: float = 5.0
+    rabbitmq_breaker_failure_threshold: int = 5
+    rabbitmq_breaker_reset_seconds: float = 30.0
+    # Events the broker cannot take are appended here and replayed on reconnect; unset to fail fast instead
+    rabbitmq_spill_path: Optional[str] = "data/event_spill.jsonl"
+    rabbitmq_spill_max_bytes: int = 100 * 1024 * 1024
+    
+    # Event pipeline: directly published events are queued and flushed in micro-batches
+    # (whichever comes first of max batch size or flush interval); a full queue blocks producers
+    event_pipeline_enabled: bool = True
+    event_pipeline_max_queue_size: int = 10000
+    event_pipeline_max_batch_size: int = 100
+    event_pipeline_flush_interval_seconds: float = 0.01
+    event_pipeline_drain_timeout_seconds: float = 10.0
+    # A batch that fails to publish is retried with exponential backoff between these bounds
+    event_pipeline_retry_initial_seconds: float = 0.1
+    event_pipeline_retry_max_seconds: float = 5.0
+    
+    # Event encoding: content type used to publish ("application/json" or "application/msgpack"),
+    # with per-routing-key overrides, e.g. EVENT_CONTENT_TYPE_OVERRIDES='{"order.created": "application/msgpack"}'
+    event_content_type: str = "application/json"
+    event_content_type_overrides: Dict[str, str] = {}
     
     # Exchange and Queue settings 
     orders_exchange: str = "orders_exchange"
     payment_queue: str = "payment_requests"
     notification_queue: str = "notification_requests"
     
+    # SAGA consumer: payment/delivery outcomes published to `saga_events_exchange` update order status
+    saga_consumer_enabled: bool = True
+    saga_events_exchange: str = "orders_exchange"
+    saga_events_queue: str = "order_saga_events"
+    saga_routing_keys: list = ["payment.*", "delivery.*"]
+    saga_consumer_prefetch: int = 256
+    saga_consumer_batch_size: int = 100
+    saga_consumer_batch_wait_seconds: float = 0.05
+    saga_consumer_workers: int = 4
+    saga_consumer_drain_timeout_seconds: float = 10.0
+    
+    # Prometheus metrics on /metrics: HTTP, MongoDB commands, RabbitMQ publishes and event-loop lag
+    metrics_enabled: bool = True
+    metrics_event_loop_lag_interval_seconds: float = 0.5
+    
+    # Tracing: spans for controller, use cases, repository and publishing, continued from an incoming
+    # `traceparent` and passed on in the AMQP headers of published events. Off until an exporter is
+    # configured, so hot paths pay nothing by default: "console", "file" (JSON Lines at the path
+    # below) or "module:Class", e.g. TRACING_EXPORTERS='["file"]'
+    tracing_enabled: bool = True
+    tracing_exporters: list = []
+    tracing_file_path: str = "data/traces.jsonl"
+    tracing_sample_ratio: float = 1.0
+    tracing_export_interval_seconds: float = 1.0
+    tracing_max_queue_size: int = 2048
+    
     # JWT settings 
     secret_key: str = "my-secret-key" 
     algorithm: str = "HS256"
@@ -1,12 +1,21 @@
-from fastapi import FastAPI, HTTPException 
+from fastapi import FastAPI, HTTPException, Response 
 from fastapi.middleware.cors import CORSMiddleware 
 from contextlib import asynccontextmanager 
+import asyncio 
 import logging 
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from .config.settings import settings 
-from .config.database import connect_to_mongo, close_mongo_connection
+from .config.database import connect_to_mongo, close_mongo_connection, get_database
 
 from .orders.infraestructure.routers.order_router import router as orders_router 
+from .orders.infraestructure.repositories.order_indexes import ensure_indexes
+from .orders.infraestructure.idempotency.idempotency_middleware import IdempotencyMiddleware
+from .shared.admission_control import AdmissionControlMiddleware
+from .shared.metrics import MetricsMiddleware, monitor_event_loop_lag, route_template
+from .shared.tracing import TracingMiddleware, tracer
+from .orders.infraestructure.monitoring.orders_collector import OrdersCollector
+from .orders.infraestructure.dependencies import get_span_exporters, get_admission_controller, get_order_status_hub, get_order_counters, get_order_cache, get_rabbitmq_publisher, get_broker_supervisor, get_outbox_relay, get_event_pipeline, get_saga_consumer, get_idempotency_store, uses_outbox
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,14 +24,52 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     
     logger.info("Starting Orders Service...")
+    tracer.start()
     await connect_to_mongo()
     logger.info("Connect to MongoDB")
     
+    uses_mongo = settings.order_repository_backend == "mongodb"
+    
+    if uses_mongo and settings.mongo_ensure_indexes:
+        try:
+            report = await ensure_indexes(get_database(), drop_drifted=settings.mongo_drop_drifted_indexes)
+            report.log()
+        except Exception as e:
+            logger.error(f"Index reconciliation failed: {e}")
+    
+    # Connect to RabbitMQ in the background; the spill-replay and consumer hooks must be registered first
+    get_rabbitmq_publisher()
+    if settings.saga_consumer_enabled:
+        get_saga_consumer().start()
+    get_broker_supervisor().start()
+    
+    background_tasks = []
+    if settings.metrics_enabled:
+        background_tasks.append(asyncio.create_task(monitor_event_loop_lag(settings.metrics_event_loop_lag_interval_seconds)))
+    if uses_mongo and settings.order_counters_reconcile_interval_seconds > 0:
+        background_tasks.append(asyncio.create_task(
+            get_order_counters().run_reconciliation(settings.order_counters_reconcile_interval_seconds)
+        ))
+    if uses_outbox():
+        background_tasks.append(asyncio.create_task(get_outbox_relay().run()))
+    if settings.event_pipeline_enabled:
+        get_event_pipeline().start()
+    
     yield 
     
     logger.info("Shutting down Orders Service...")
+    if settings.saga_consumer_enabled:
+        await get_saga_consumer().close(settings.saga_consumer_drain_timeout_seconds)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    if settings.event_pipeline_enabled:
+        # Publish whatever is still queued before the broker connection goes away
+        await get_event_pipeline().close(settings.event_pipeline_drain_timeout_seconds)
+    await get_broker_supervisor().close()
     await close_mongo_connection()
     logger.info("Disconnected from MongoDB")
+    await tracer.close()
 
 
 app = FastAPI(
@@ -36,6 +83,38 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+if settings.idempotency_enabled:
+    # Only the endpoints that create orders. Added before CORS so replayed responses get CORS headers too;
+    # the store is resolved on first use, after Mongo is connected
+    app.add_middleware(
+        IdempotencyMiddleware, 
+        store_provider=get_idempotency_store, 
+        paths=["/api/v1/orders/", "/api/v1/orders/batch"], 
+        ttl_seconds=settings.idempotency_ttl_seconds, 
+        lock_seconds=settings.idempotency_lock_timeout_seconds, 
+        wait_seconds=settings.idempotency_wait_timeout_seconds, 
+        cache_size=settings.idempotency_cache_max_size
+    )
+
+if settings.admission_enabled:
+    # Outside idempotency so a shed request costs nothing, inside CORS so browsers can read the 503.
+    # The first matching rule wins: the batch routes are listed before the /{order_id} ones
+    app.add_middleware(
+        AdmissionControlMiddleware, 
+        controller=get_admission_controller(), 
+        rules=[
+            ("POST", r"/api/v1/orders/batch", "bulk"),
+            ("PUT", r"/api/v1/orders/batch/status", "bulk"),
+            ("GET", r"/api/v1/orders", "bulk"),
+            ("PUT", r"/api/v1/orders/[^/]+", "status"),
+            ("DELETE", r"/api/v1/orders/[^/]+", "status"),
+            ("GET", r"/api/v1/orders/user/[^/]+", "read"),
+            ("GET", r"/api/v1/orders/[^/]+", "read"),
+            ("POST", r"/api/v1/orders/", "create"),
+        ], 
+        retry_after_seconds=settings.admission_retry_after_seconds
+    )
+
 app.add_middleware(
     CORSMiddleware, 
     allow_origins=settings.allowed_origins, 
@@ -44,14 +123,48 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+if settings.metrics_enabled:
+    # Outermost, so latency includes time spent queued for admission and shed requests are counted
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(OrdersCollector(
+        admission=get_admission_controller if settings.admission_enabled else None, 
+        order_cache=get_order_cache if settings.order_cache_enabled else None, 
+        status_hub=get_order_status_hub, 
+        event_pipeline=get_event_pipeline if settings.event_pipeline_enabled else None
+    ))
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        # Set as a header: media_type would append a second charset
+        return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+# Without an exporter the spans would be built only to be thrown away
+if settings.tracing_enabled and settings.tracing_exporters:
+    tracer.configure(
+        settings.app_name, 
+        get_span_exporters(), 
+        sample_ratio=settings.tracing_sample_ratio, 
+        max_queue_size=settings.tracing_max_queue_size, 
+        export_interval_seconds=settings.tracing_export_interval_seconds
+    )
+    app.add_middleware(TracingMiddleware, route_name=route_template)
+
 @app.get("/health", tags=["health"])
 async def health_check(): 
-    return {
+    health = {
         "status": "healthy", 
         "service": settings.app_name, 
         "version": settings.version
     }
     
+    if settings.order_cache_enabled:
+        health["order_cache"] = get_order_cache().stats()
+    if settings.admission_enabled:
+        health["admission"] = get_admission_controller().stats()
+    health["order_streams"] = get_order_status_hub().stats()
+    
+    return health
+    
 @app.get("/", tags=["root"])
 async def root():
     
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, validator
 
 class CreateOrderItemDTO(BaseModel):
@@ -81,4 +81,16 @@ class CreateOrderDTO(BaseModel):
                 "delivery_fee": 25.0,
                 "tax_rate": 0.16
             }
-        }
\ No newline at end of file
+        }
+
+
+MAX_BATCH_SIZE = 500
+
+
+class CreateOrdersBatchDTO(BaseModel):
+    # Items are validated one by one against CreateOrderDTO so a bad item fails alone
+    orders: List[Dict[str, Any]] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="Orders following the CreateOrderDTO schema"
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List, Optional, Union
+from pydantic import BaseModel, model_serializer
 from ...domain.entities.order import OrderStatus
 
 class OrderItemResponseDTO(BaseModel):
@@ -36,6 +36,7 @@ class OrderResponseDTO(BaseModel):
     updated_at: datetime
     estimated_delivery_time: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
+    version: int = 0
 
     class Config:
         from_attributes = True
@@ -44,20 +45,65 @@ class OrderResponseDTO(BaseModel):
         }
 
 
+class OrderSummaryResponseDTO(BaseModel):
+    """Sparse order representation; only the fields that were loaded are serialized"""
+    id: str
+    user_id: Optional[str] = None
+    restaurant_id: Optional[str] = None
+    items: Optional[List[OrderItemResponseDTO]] = None
+    delivery_address: Optional[DeliveryAddressResponseDTO] = None
+    status: Optional[OrderStatus] = None
+    total_amount: Optional[float] = None
+    delivery_fee: Optional[float] = None
+    tax_amount: Optional[float] = None
+    final_amount: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    estimated_delivery_time: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+    @model_serializer(mode="wrap")
+    def _only_set_fields(self, handler):
+        data = handler(self)
+        return {key: value for key, value in data.items() if key in self.model_fields_set}
+
+
 class OrderListResponseDTO(BaseModel):
-    orders: List[OrderResponseDTO]
+    orders: List[Union[OrderResponseDTO, OrderSummaryResponseDTO]]
     total: int
-    page: int
+    page: Optional[int] = None
     per_page: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class OrdersByIdsResponseDTO(BaseModel):
+    orders: List[OrderResponseDTO]
+    # Requested ids with no matching order
+    missing: List[str]
+
+
 class OrderCreatedResponseDTO(BaseModel):
     order: OrderResponseDTO
     message: str = "Order created successfully"
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BatchOrderResultDTO(BaseModel):
+    index: int
+    success: bool
+    order: Optional[OrderResponseDTO] = None
+    error: Optional[str] = None
+
+
+class BatchOrdersResponseDTO(BaseModel):
+    results: List[BatchOrderResultDTO]
+    succeeded: int
+    failed: int
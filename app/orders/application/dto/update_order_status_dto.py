@@ -0,0 +1,25 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from ...domain.entities.enums import OrderStatus
+from .create_order_dto import MAX_BATCH_SIZE
+
+
+class OrderStatusChangeDTO(BaseModel):
+    order_id: str
+    new_status: OrderStatus
+    expected_version: Optional[int] = Field(default=None, ge=0)
+
+
+class UpdateOrdersStatusBatchDTO(BaseModel):
+    updates: List[OrderStatusChangeDTO] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "updates": [
+                    {"order_id": "6571234567890abcdef12345", "new_status": "preparing"},
+                    {"order_id": "6571234567890abcdef67890", "new_status": "ready", "expected_version": 3}
+                ]
+            }
+        }
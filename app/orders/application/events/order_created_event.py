@@ -1,10 +1,13 @@
-from pydantic import BaseModel 
+from pydantic import BaseModel, Field 
 from ...domain.entities.order import OrderItem 
 from typing import List 
 from datetime import datetime
+from uuid import uuid4
 
 class OrderCreatedEvent(BaseModel):
     event_type: str = "order.created"
+    # Unique per event, so consumers can drop the redeliveries the outbox relay may produce
+    event_id: str = Field(default_factory=lambda: str(uuid4()))
     order_id: str 
     user_id: str 
     restaurant_id: str 
@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+from ...domain.entities.order import Order
+from ...domain.entities.enums import OrderStatus
+
+class OrderStatusChangedEvent(BaseModel):
+    """Published in-process on every status change, for live order streams"""
+    order_id: str
+    user_id: str
+    restaurant_id: str
+    status: OrderStatus
+    version: int
+    updated_at: datetime
+
+    @classmethod
+    def from_order(cls, order: Order) -> "OrderStatusChangedEvent":
+        return cls(
+            order_id=order.id,
+            user_id=order.user_id,
+            restaurant_id=order.restaurant_id,
+            status=order.status,
+            version=order.version,
+            updated_at=order.updated_at
+        )
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+
+from .order_status_changed_event import OrderStatusChangedEvent
+
+
+class StatusPublisher(ABC):
+    """Receives every order status change once it is stored, e.g. to push it to live streams"""
+
+    @abstractmethod
+    def publish(self, event: OrderStatusChangedEvent) -> None:
+        pass
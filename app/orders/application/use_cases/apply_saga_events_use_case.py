@@ -0,0 +1,54 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from ...domain.entities.enums import OrderStatus
+from ...domain.entities.bulk_result import BulkItemResult, StatusChange
+from ...domain.repositories.order_repository import OrderRepository
+from ..events.order_status_changed_event import OrderStatusChangedEvent
+from ..events.status_publisher import StatusPublisher
+from ....shared.tracing import traced
+
+# Status each payment/delivery outcome moves an order to
+SAGA_EVENT_STATUSES: Dict[str, OrderStatus] = {
+    "payment.completed": OrderStatus.CONFIRMED,
+    "payment.failed": OrderStatus.CANCELLED,
+    "delivery.started": OrderStatus.IN_DELIVERY,
+    "delivery.completed": OrderStatus.DELIVERED,
+}
+
+class ApplySagaEventsUseCase:
+
+    def __init__(self, order_repository: OrderRepository, status_publisher: Optional[StatusPublisher] = None):
+        self.order_repository = order_repository
+        self.status_publisher = status_publisher
+
+    @traced()
+    async def execute(self, events: List[Tuple[str, str]]) -> List[BulkItemResult]:
+        """Apply (routing_key, order_id) events as status transitions; one result per event, in input order"""
+
+        results: Dict[int, BulkItemResult] = {}
+        rounds: List[List[Tuple[int, StatusChange]]] = []
+        seen = Counter()
+
+        for index, (routing_key, order_id) in enumerate(events):
+            status = SAGA_EVENT_STATUSES.get(routing_key)
+            if status is None:
+                results[index] = BulkItemResult(index=index, error=f"No status transition for '{routing_key}' events")
+                continue
+
+            # A batch write takes each order once, so later events for the same order go in
+            # later rounds and are applied in the order they arrived
+            round_number = seen[order_id]
+            seen[order_id] += 1
+            if round_number == len(rounds):
+                rounds.append([])
+            rounds[round_number].append((index, StatusChange(order_id=order_id, status=status)))
+
+        for changes in rounds:
+            round_results = await self.order_repository.update_status_many([change for _, change in changes])
+            for (index, _), result in zip(changes, round_results):
+                results[index] = result.model_copy(update={"index": index})
+                if self.status_publisher and result.order:
+                    self.status_publisher.publish(OrderStatusChangedEvent.from_order(result.order))
+
+        return [results[index] for index in range(len(events))]
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from bson import ObjectId
 
 from ...domain.entities.order import Order
 from ...domain.entities.enums import OrderStatus
 from ...domain.entities.value_objects import DeliveryAddress, OrderItem
+from ...domain.entities.outbox_message import OutboxMessage
 
 from ...domain.repositories.order_repository import OrderRepository
 
@@ -13,78 +15,102 @@ from ..dto.order_response_dto import OrderResponseDTO
 from ....shared.exceptions import BusinessException
 
 from ..events.order_created_event import OrderCreatedEvent
+from ....shared.tracing import traced, with_trace_context
 
 class CreateOrderUseCase:
     
-    def __init__(self, order_repository: OrderRepository, event_publisher: Optional[object] = None):
+    def __init__(self, order_repository: OrderRepository, event_publisher: Optional[object] = None, use_outbox: bool = False):
         self.order_repository = order_repository
         self.event_publisher = event_publisher
+        self.use_outbox = use_outbox
         
+    @traced()
     async def execute(self, order_dto: CreateOrderDTO) -> Order:
         
         try:
             
-            order_items = []
-            for item_dto in order_dto.items: 
-                subtotal = item_dto.quantity * item_dto.unit_price
-                order_item = OrderItem(
-                    product_id=item_dto.product_id,
-                    product_name=item_dto.product_name, 
-                    quantity=item_dto.quantity, 
-                    unit_price=item_dto.unit_price, 
-                    subtotal=subtotal
-                )
-                
-                order_items.append(order_item)
-                
-            delivery_address = DeliveryAddress(
-                street=order_dto.delivery_address.street, 
-                city=order_dto.delivery_address.city,
-                state=order_dto.delivery_address.state, 
-                postal_code=order_dto.delivery_address.postal_code,
-                country=order_dto.delivery_address.country,
-                additional_info=order_dto.delivery_address.additional_info
-            )
+            order = self.build_order(order_dto)
             
-            total_amount = sum(item.subtotal for item in order_items)
-            tax_amount = total_amount * order_dto.tax_rate
-            final_amount = total_amount + order_dto.delivery_fee + tax_amount
+            # Publish order created event for SAGA orchestration. With the outbox the event
+            # is stored with the order and relayed later, so creation never waits on the broker
             
-            order = Order(
-                user_id=order_dto.user_id,
-                restaurant_id=order_dto.restaurant_id,
-                items=order_items,
-                delivery_address=delivery_address,
-                notes=order_dto.notes,
-                delivery_fee=order_dto.delivery_fee,
-                tax_amount=tax_amount,
-                total_amount=total_amount,
-                status=OrderStatus.PENDING,
-                final_amount=final_amount,
-                estimated_delivery_time=self._calculate_estimated_delivery_time(),
-            )
+            if self.use_outbox:
+                return await self.order_repository.create(order, outbox=[self.build_outbox_message(order)])
             
             created_order = await self.order_repository.create(order)
             
-            # Publish order created event for SAGA orchestration
-            
             if self.event_publisher:
-                event = OrderCreatedEvent(
-                    order_id=created_order.id, 
-                    user_id=created_order.user_id, 
-                    restaurant_id=created_order.restaurant_id, 
-                    total_amount=created_order.total_amount,
-                    items=created_order.items, 
-                    created_at=created_order.created_at
-                )
-
-                await self.event_publisher.publish(event)
+                await self.event_publisher.publish(self.build_event(created_order))
             
             return created_order
          
         except Exception as e: 
             raise BusinessException(f"Failed to create order: {str(e)}")
         
+    @traced()
+    def build_order(self, order_dto: CreateOrderDTO) -> Order:
+        
+        order_items = []
+        for item_dto in order_dto.items: 
+            subtotal = item_dto.quantity * item_dto.unit_price
+            order_item = OrderItem(
+                product_id=item_dto.product_id,
+                product_name=item_dto.product_name, 
+                quantity=item_dto.quantity, 
+                unit_price=item_dto.unit_price, 
+                subtotal=subtotal
+            )
+            
+            order_items.append(order_item)
+            
+        delivery_address = DeliveryAddress(
+            street=order_dto.delivery_address.street, 
+            city=order_dto.delivery_address.city,
+            state=order_dto.delivery_address.state, 
+            postal_code=order_dto.delivery_address.postal_code,
+            country=order_dto.delivery_address.country,
+            additional_info=order_dto.delivery_address.additional_info
+        )
+        
+        total_amount = sum(item.subtotal for item in order_items)
+        tax_amount = total_amount * order_dto.tax_rate
+        final_amount = total_amount + order_dto.delivery_fee + tax_amount
+        
+        return Order(
+            id=str(ObjectId()),
+            user_id=order_dto.user_id,
+            restaurant_id=order_dto.restaurant_id,
+            items=order_items,
+            delivery_address=delivery_address,
+            notes=order_dto.notes,
+            delivery_fee=order_dto.delivery_fee,
+            tax_amount=tax_amount,
+            total_amount=total_amount,
+            status=OrderStatus.PENDING,
+            final_amount=final_amount,
+            estimated_delivery_time=self._calculate_estimated_delivery_time(),
+        )
+
+    def build_event(self, created_order: Order) -> OrderCreatedEvent:
+        return OrderCreatedEvent(
+            order_id=created_order.id, 
+            user_id=created_order.user_id, 
+            restaurant_id=created_order.restaurant_id, 
+            total_amount=created_order.total_amount,
+            items=created_order.items, 
+            created_at=created_order.created_at
+        )
+        
+    def build_outbox_message(self, order: Order) -> OutboxMessage:
+        event = self.build_event(order)
+        return OutboxMessage(
+            event_id=event.event_id,
+            routing_key=event.event_type,
+            # The relay publishes it later; the stored trace context links that publish to this request
+            payload=with_trace_context(event.model_dump()),
+            aggregate_id=order.id
+        )
+        
     def _calculate_estimated_delivery_time(self) -> datetime:
         """Calculate estimated delivery time (30-45 minutes from now)"""
         import random
@@ -0,0 +1,61 @@
+import logging
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
+
+from ...domain.entities.bulk_result import BulkItemResult
+from ...domain.repositories.order_repository import OrderRepository
+
+from ..dto.create_order_dto import CreateOrderDTO
+from .create_order_use_case import CreateOrderUseCase
+from ....shared.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+class CreateOrdersBatchUseCase:
+
+    def __init__(self, order_repository: OrderRepository, event_publisher: Optional[object] = None, use_outbox: bool = False):
+        self.order_repository = order_repository
+        self.event_publisher = event_publisher
+        self.use_outbox = use_outbox
+        self.create_order_use_case = CreateOrderUseCase(order_repository, event_publisher, use_outbox)
+
+    @traced()
+    async def execute(self, raw_orders: List[Dict[str, Any]]) -> List[BulkItemResult]:
+
+        results: Dict[int, BulkItemResult] = {}
+        orders = []
+        positions = []
+
+        for index, raw_order in enumerate(raw_orders):
+            try:
+                order_dto = CreateOrderDTO.model_validate(raw_order)
+                orders.append(self.create_order_use_case.build_order(order_dto))
+                positions.append(index)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, error=self._format_validation_error(e))
+            except ValueError as e:
+                results[index] = BulkItemResult(index=index, error=str(e))
+
+        outbox = [self.create_order_use_case.build_outbox_message(order) for order in orders] if self.use_outbox else []
+
+        # One unordered insert for every valid order; results come back in `orders` order
+        for position, result in zip(positions, await self.order_repository.create_many(orders, outbox)):
+            results[position] = result.model_copy(update={"index": position})
+
+        created = [results[position].order for position in positions if results[position].success]
+
+        if self.event_publisher and created and not self.use_outbox:
+            events = [self.create_order_use_case.build_event(order) for order in created]
+            try:
+                await self.event_publisher.publish_many(events)
+            except Exception as e:
+                # The orders are already persisted; a failed publish must not report them as failed
+                logger.error(f"Failed to publish {len(events)} order.created events: {e}")
+
+        return [results[index] for index in range(len(raw_orders))]
+
+    def _format_validation_error(self, error: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+            for detail in error.errors()
+        )
@@ -1,12 +1,14 @@
 from ...domain.entities.order import Order 
 from ...domain.repositories.order_repository import OrderRepository 
 from ....shared.exceptions import BusinessException, NotFoundException 
+from ....shared.tracing import traced
 
 class DeleteOrderUseCase:
     
     def __init__(self, order_repository: OrderRepository):
         self.order_repository = order_repository 
         
+    @traced()
     async def execute(self, order_id: str) -> bool:
         
         success = await self.order_repository.delete(order_id)
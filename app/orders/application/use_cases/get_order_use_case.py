@@ -1,17 +1,33 @@
+from typing import Optional
 from ...domain.entities.order import Order 
+from ...domain.entities.order_version import OrderVersion
 from ...domain.repositories.order_repository import OrderRepository 
 from ....shared.exceptions import NotFoundException
+from ....shared.batch_loader import BatchLoader
+from ....shared.tracing import traced
 
 class GetOrderUseCase:
     
-    def __init__(self, order_repository: OrderRepository):
+    def __init__(self, order_repository: OrderRepository, coalesce: bool = False, max_batch_size: int = 100):
         self.order_repository = order_repository 
+        # Lookups arriving in the same event-loop tick share one get_many_by_ids query
+        self.loader = BatchLoader(order_repository.get_many_by_ids, max_batch_size) if coalesce else None
         
+    @traced()
     async def execute(self, order_id: str) -> Order: 
-        order = await self.order_repository.get_by_id(order_id)
+        if self.loader:
+            order = await self.loader.load(order_id)
+            # Coalesced callers receive the same instance; give each its own
+            order = order.model_copy() if order else None
+        else:
+            order = await self.order_repository.get_by_id(order_id)
         
         if not order: 
             raise NotFoundException(f"Order with id {order_id} not found")
         
         return order
-        
\ No newline at end of file
+
+    @traced()
+    async def get_version(self, order_id: str) -> Optional[OrderVersion]:
+        """Current version of the order without loading it, to answer conditional requests"""
+        return await self.order_repository.get_version(order_id)
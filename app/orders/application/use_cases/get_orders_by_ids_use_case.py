@@ -0,0 +1,28 @@
+from typing import Any, Dict, List
+from ...domain.repositories.order_repository import OrderRepository
+from ....shared.exceptions import ValidationException
+from ....shared.tracing import traced
+
+MAX_IDS = 100
+
+class GetOrdersByIdsUseCase:
+
+    def __init__(self, order_repository: OrderRepository):
+        self.order_repository = order_repository
+
+    @traced()
+    async def execute(self, order_ids: List[str]) -> Dict[str, Any]:
+        """Orders in the requested order (duplicates collapsed) plus the ids that were not found"""
+
+        order_ids = list(dict.fromkeys(order_ids))
+        if not order_ids:
+            raise ValidationException("At least one order id is required")
+        if len(order_ids) > MAX_IDS:
+            raise ValidationException(f"At most {MAX_IDS} order ids can be requested at once")
+
+        found = await self.order_repository.get_many_by_ids(order_ids)
+
+        return {
+            "orders": [found[order_id] for order_id in order_ids if order_id in found],
+            "missing": [order_id for order_id in order_ids if order_id not in found]
+        }
@@ -1,27 +1,57 @@
 import math 
-from typing import List, Dict, Any 
+from typing import List, Dict, Any, Optional 
 from ...domain.entities.order import Order 
+from ...domain.entities.order_summary import ORDER_FIELDS, SUMMARY_FIELDS 
 from ...domain.repositories.order_repository import OrderRepository 
+from ....shared.pagination import PageCursor 
+from ....shared.exceptions import ValidationException 
+from ....shared.tracing import traced
 
 class GetOrdersByUserUseCase: 
     
     def __init__(self, order_repository: OrderRepository):
         self.order_repository = order_repository
         
-    async def execute(self, user_id: str, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @traced()
+    async def execute(self, user_id: str, page: int = 1, per_page: int = 10, after: Optional[str] = None, view: str = "full", fields: Optional[List[str]] = None) -> Dict[str, Any]:
         
-        skip = (page - 1) * per_page 
+        projection = self._resolve_fields(view, fields)
         
-        orders = await self.order_repository.get_by_user_id(user_id=user_id, limit=per_page, skip=skip)
+        # A cursor switches to keyset paging; page/skip remains as the legacy mode
+        cursor = PageCursor.decode(after)
+        skip = 0 if cursor else (page - 1) * per_page 
         
-        # implementar el total
-        total = 0
+        # Fetch one extra order to know whether another page exists
+        orders = await self.order_repository.get_by_user_id(user_id=user_id, limit=per_page + 1, skip=skip, after=cursor, fields=projection)
+        
+        has_more = len(orders) > per_page
+        orders = orders[:per_page]
+        next_cursor = PageCursor.after_item(orders[-1]).encode() if has_more else None
+        
+        total = await self.order_repository.count_by_user_id(user_id)
         
         total_pages = math.ceil(total / per_page) if total > 0 else 1 
         
         return {
             "orders": orders, 
             "total": total, 
+            "page": None if cursor else page, 
             "per_page" : per_page, 
-            "total_pages": total_pages
-        }
\ No newline at end of file
+            "total_pages": total_pages, 
+            "next_cursor": next_cursor, 
+            "fields": projection
+        }
+    
+    def _resolve_fields(self, view: str, fields: Optional[List[str]]) -> Optional[List[str]]:
+        """Fields to load for the listing, or None for full orders"""
+        
+        if fields:
+            unknown = set(fields) - set(ORDER_FIELDS) - {"id"}
+            if unknown:
+                raise ValidationException(f"Unknown fields: {', '.join(sorted(unknown))}")
+            return [field for field in fields if field != "id"]
+        
+        if view == "summary":
+            return list(SUMMARY_FIELDS)
+        
+        return None
\ No newline at end of file
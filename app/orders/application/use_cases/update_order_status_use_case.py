@@ -1,23 +1,32 @@
+from typing import Optional
 from ...domain.entities.order import Order 
 from ...domain.entities.enums import OrderStatus
 from ...domain.repositories.order_repository import OrderRepository 
+from ..events.order_status_changed_event import OrderStatusChangedEvent
+from ..events.status_publisher import StatusPublisher
 from ....shared.exceptions import BusinessException , NotFoundException
+from ....shared.tracing import traced
 
 class UpdateOrderStatusUseCase: 
     
-    def __init__(self, order_repository: OrderRepository):
+    def __init__(self, order_repository: OrderRepository, status_publisher: Optional[StatusPublisher] = None):
         self.order_repository = order_repository
+        # Fans the change out to live order streams
+        self.status_publisher = status_publisher
         
-    async def execute(self, order_id, new_status: OrderStatus) -> Order: 
+    @traced()
+    async def execute(self, order_id, new_status: OrderStatus, expected_version: Optional[int] = None) -> Order: 
 
-        order = await self.order_repository.get_by_id(order_id)
+        if not OrderStatus.allowed_sources(new_status):
+            raise BusinessException(f"Orders cannot be moved to '{new_status.value}'")
 
-        if not order:
+        updated_order = await self.order_repository.update_status(order_id, new_status, expected_version)
+
+        if not updated_order:
             raise NotFoundException(f"Order with id {order_id} not found")
-        
-        order.update_status(new_status)
 
-        updated_order = await self.order_repository.update(order)
+        if self.status_publisher:
+            self.status_publisher.publish(OrderStatusChangedEvent.from_order(updated_order))
 
         return updated_order
     
\ No newline at end of file
@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from ...domain.entities.bulk_result import BulkItemResult, StatusChange
+from ...domain.repositories.order_repository import OrderRepository
+from ..events.order_status_changed_event import OrderStatusChangedEvent
+from ..events.status_publisher import StatusPublisher
+
+from ..dto.update_order_status_dto import OrderStatusChangeDTO
+from ....shared.tracing import traced
+
+class UpdateOrdersStatusBatchUseCase:
+
+    def __init__(self, order_repository: OrderRepository, status_publisher: Optional[StatusPublisher] = None):
+        self.order_repository = order_repository
+        self.status_publisher = status_publisher
+
+    @traced()
+    async def execute(self, updates: List[OrderStatusChangeDTO]) -> List[BulkItemResult]:
+
+        changes = [
+            StatusChange(order_id=update.order_id, status=update.new_status, expected_version=update.expected_version)
+            for update in updates
+        ]
+
+        results = await self.order_repository.update_status_many(changes)
+
+        if self.status_publisher:
+            for result in results:
+                if result.order:
+                    self.status_publisher.publish(OrderStatusChangedEvent.from_order(result.order))
+
+        return results
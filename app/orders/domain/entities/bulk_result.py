@@ -0,0 +1,23 @@
+from typing import Optional
+from pydantic import BaseModel
+
+from .order import Order
+from .enums import OrderStatus
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a batch write, keyed by its position in the request"""
+    index: int
+    order: Optional[Order] = None
+    error: Optional[str] = None
+    # The item lost a race with another write and may succeed if tried again
+    retryable: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class StatusChange(BaseModel):
+    order_id: str
+    status: OrderStatus
+    expected_version: Optional[int] = None
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List
 
 class OrderStatus(str, Enum):
     PENDING = "pending"
@@ -7,4 +8,23 @@ class OrderStatus(str, Enum):
     READY = "ready"
     IN_DELIVERY = "in_delivery"
     DELIVERED = "delivered"
-    CANCELLED = "cancelled" 
\ No newline at end of file
+    CANCELLED = "cancelled" 
+    
+    def can_transition_to(self, target: "OrderStatus") -> bool:
+        return target in ORDER_STATUS_TRANSITIONS[self]
+    
+    @classmethod
+    def allowed_sources(cls, target: "OrderStatus") -> List["OrderStatus"]:
+        """Statuses an order may be in for a transition to `target` to be valid"""
+        return [source for source, targets in ORDER_STATUS_TRANSITIONS.items() if target in targets]
+
+
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.PREPARING, OrderStatus.CANCELLED},
+    OrderStatus.PREPARING: {OrderStatus.READY, OrderStatus.CANCELLED},
+    OrderStatus.READY: {OrderStatus.IN_DELIVERY},
+    OrderStatus.IN_DELIVERY: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
@@ -1,10 +1,12 @@
 from datetime import datetime, timezone
-from typing import List, Optional 
+from typing import Any, Dict, List, Optional 
 from pydantic import BaseModel, Field, field_validator
 from bson import ObjectId 
 
 from .enums import OrderStatus 
-from .value_objects import OrderItem, DeliveryAddress 
+from .value_objects import OrderItem, DeliveryAddress, TRUSTED_DELIVERY_ADDRESS, TRUSTED_ORDER_ITEM
+from .trusted import TrustedConstructor
+from ....shared.exceptions import BusinessException
 
 class Order(BaseModel): 
     id: Optional[str] = Field(default=None, alias="_id")
@@ -22,6 +24,8 @@ class Order(BaseModel):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     estimated_delivery_time: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
+    # Bumped by the repository on every write; used for optimistic concurrency
+    version: int = Field(default=0, ge=0)
     
     @field_validator('id', mode='before')
     @classmethod
@@ -37,6 +41,27 @@ class Order(BaseModel):
             ObjectId: str, 
             datetime: lambda v: v.isoformat()
         }
+    
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "Order":
+        """Build an order from a document this service wrote, without validating it again.
+
+        Input is validated once, at the API boundary, before it is stored. Anything that did
+        not come out of our own collection must go through `Order(**data)` instead. The
+        nested item and address dicts are adopted by the entity, not copied.
+        """
+        # `id` goes first, where the entity declares it
+        data = {"id": str(document["_id"]), **document} if "_id" in document else dict(document)
+        data.pop("_id", None)
+
+        try:
+            data["items"] = [TRUSTED_ORDER_ITEM(item) for item in data["items"]]
+            data["delivery_address"] = TRUSTED_DELIVERY_ADDRESS(data["delivery_address"])
+            data["status"] = OrderStatus(data["status"])
+            return _trusted_order(data)
+        except (KeyError, TypeError, ValueError):
+            # Not shaped like what we write (e.g. a document from before a field was added)
+            return cls.model_validate(document)
         
     def calculate_total(self) -> float: 
         items_total = sum(item.subtotal for item in self.items)
@@ -46,6 +71,9 @@ class Order(BaseModel):
         return self.total_amount + self.delivery_fee + self.tax_amount
     
     def update_status(self, new_status: OrderStatus) -> None: 
+        if not self.status.can_transition_to(new_status):
+            raise BusinessException(f"Cannot change order status from '{self.status.value}' to '{new_status.value}'")
+        
         self.status = new_status 
         self.updated_at = datetime.now(timezone.utc)
         
@@ -56,4 +84,6 @@ class Order(BaseModel):
         return self.status in [OrderStatus.PENDING, OrderStatus.CONFIRMED]
     
     def is_modifiable(self) -> bool: 
-        return self.status == OrderStatus.PENDING
\ No newline at end of file
+        return self.status == OrderStatus.PENDING
+
+_trusted_order = TrustedConstructor(Order)
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
+from bson import ObjectId
+
+from .enums import OrderStatus
+from .order import Order
+from .value_objects import OrderItem, DeliveryAddress, TRUSTED_DELIVERY_ADDRESS, TRUSTED_ORDER_ITEM
+from .trusted import TrustedConstructor
+
+# Fields that can be requested in a sparse fieldset; `id` is always returned
+ORDER_FIELDS = tuple(name for name in Order.model_fields if name != "id")
+
+# Fields shown by dashboard listings: no line items or address
+SUMMARY_FIELDS = (
+    "user_id", "restaurant_id", "status", "total_amount", "delivery_fee", "tax_amount",
+    "final_amount", "created_at", "updated_at", "estimated_delivery_time", "delivered_at", "version"
+)
+
+class OrderSummary(BaseModel):
+    """Partial view of an order loaded with a projection; only the projected fields are set"""
+    id: str = Field(alias="_id")
+    user_id: Optional[str] = None
+    restaurant_id: Optional[str] = None
+    items: Optional[List[OrderItem]] = None
+    delivery_address: Optional[DeliveryAddress] = None
+    status: Optional[OrderStatus] = None
+    total_amount: Optional[float] = None
+    delivery_fee: Optional[float] = None
+    tax_amount: Optional[float] = None
+    final_amount: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    estimated_delivery_time: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def validate_object_id(cls, v):
+        if isinstance(v, ObjectId):
+            return str(v)
+        return v
+
+    class Config:
+        populate_by_name = True
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "OrderSummary":
+        """Trusted counterpart of `OrderSummary(**document)` for projected reads; see Order.from_document"""
+        data = {"id": str(document["_id"]), **document}
+        del data["_id"]
+
+        try:
+            if data.get("items") is not None:
+                data["items"] = [TRUSTED_ORDER_ITEM(item) for item in data["items"]]
+            if data.get("delivery_address") is not None:
+                data["delivery_address"] = TRUSTED_DELIVERY_ADDRESS(data["delivery_address"])
+            if data.get("status") is not None:
+                data["status"] = OrderStatus(data["status"])
+            return _trusted_summary(data)
+        except (KeyError, TypeError, ValueError):
+            return cls.model_validate(document)
+
+
+_trusted_summary = TrustedConstructor(OrderSummary)
+
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class OrderVersion(BaseModel):
+    """The part of an order that changes on every write; enough to tell whether a copy is current"""
+    id: str
+    # Orders written before versioning have none; their status changes still move updated_at
+    version: int = 0
+    updated_at: datetime
+
+    @classmethod
+    def of(cls, order) -> "OrderVersion":
+        return cls(id=order.id, version=order.version, updated_at=order.updated_at)
@@ -0,0 +1,12 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+class OutboxMessage(BaseModel):
+    """Integration event stored in the same write as the order it describes, until the relay publishes it"""
+    event_id: str
+    routing_key: str
+    payload: Dict[str, Any]
+    # Order the message belongs to; batch inserts only keep messages of the orders that were written
+    aggregate_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
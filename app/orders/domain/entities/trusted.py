@@ -0,0 +1,47 @@
+from typing import Any, Dict, Generic, Type, TypeVar
+
+from pydantic import BaseModel
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_object_setattr = object.__setattr__
+
+class TrustedConstructor(Generic[Model]):
+    """Builds `model` instances from field values this service has already validated.
+
+    The values dict becomes the instance's __dict__ as-is: no validation, no per-field
+    copying. That is cheaper than validation and far cheaper than `model_construct`, so
+    callers must hand over a dict they no longer use. Dicts that are not exactly the
+    model's fields in declaration order (which is also serialization order) are rebuilt:
+    missing fields with a plain default are filled in, and anything else raises
+    ValueError so the caller can fall back to validation.
+    """
+
+    def __init__(self, model: Type[Model]):
+        self.model = model
+        self.field_names = list(model.model_fields)
+        self.fields = frozenset(self.field_names)
+        self.defaults = {
+            name: field.default for name, field in model.model_fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+
+    def __call__(self, values: Dict[str, Any]) -> Model:
+        fields_set = set(values)
+        if list(values) != self.field_names:
+            values = self._in_field_order(values, fields_set)
+
+        instance = self.model.__new__(self.model)
+        _object_setattr(instance, "__dict__", values)
+        _object_setattr(instance, "__pydantic_fields_set__", fields_set)
+        _object_setattr(instance, "__pydantic_extra__", None)
+        _object_setattr(instance, "__pydantic_private__", None)
+        return instance
+
+    def _in_field_order(self, values: Dict[str, Any], fields_set: set) -> Dict[str, Any]:
+        if not fields_set <= self.fields:
+            raise ValueError(f"Unknown {self.model.__name__} fields: {sorted(fields_set - self.fields)}")
+        try:
+            return {name: values[name] if name in fields_set else self.defaults[name] for name in self.field_names}
+        except KeyError as e:
+            raise ValueError(f"Missing {self.model.__name__} field {e}") from None
@@ -1,6 +1,8 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 
+from .trusted import TrustedConstructor
+
 class OrderItem(BaseModel):
     product_id: str 
     product_name: str 
@@ -17,4 +19,8 @@ class DeliveryAddress(BaseModel):
     state: str
     postal_code: str
     country: str = "Mexico"
-    additional_info: Optional[str] = None 
\ No newline at end of file
+    additional_info: Optional[str] = None 
+
+# Build these value objects from already validated values; shared by Order and OrderSummary
+TRUSTED_ORDER_ITEM = TrustedConstructor(OrderItem)
+TRUSTED_DELIVERY_ADDRESS = TrustedConstructor(DeliveryAddress)
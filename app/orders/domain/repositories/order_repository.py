@@ -1,27 +1,59 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Union
 from ..entities.order import Order, OrderStatus
+from ..entities.bulk_result import BulkItemResult, StatusChange
+from ..entities.outbox_message import OutboxMessage
+from ..entities.order_summary import OrderSummary
+from ..entities.order_version import OrderVersion
+from ....shared.pagination import PageCursor
 
 class OrderRepository(ABC):
     
     @abstractmethod
-    async def create(self, order: Order) -> Order: 
+    async def create(self, order: Order, outbox: Sequence[OutboxMessage] = ()) -> Order: 
+        """Insert the order. `outbox` messages are persisted atomically with it, for the relay to publish"""
         pass    
 
+    @abstractmethod
+    async def create_many(self, orders: List[Order], outbox: Sequence[OutboxMessage] = ()) -> List[BulkItemResult]:
+        """Insert all orders in one unordered batch; one result per order, in input order.
+        Only the `outbox` messages whose aggregate_id is a written order are kept"""
+        pass
+
     @abstractmethod 
     async def get_by_id(self, order_id: str) -> Optional[Order]:
         pass
 
+    @abstractmethod
+    async def get_many_by_ids(self, order_ids: Sequence[str]) -> Dict[str, Order]:
+        """Load several orders in one query, keyed by id; ids that do not exist (or are malformed) are left out"""
+        pass
+
+    @abstractmethod
+    async def get_version(self, order_id: str) -> Optional[OrderVersion]:
+        """Load only the version and updated_at of the order, for conditional requests; None if it does not exist"""
+        pass
+
     @abstractmethod 
-    async def get_by_user_id(self, user_id: str, limit: int = 10, skip: int = 0) -> List[Order]: 
+    async def get_by_user_id(self, user_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]: 
+        """List orders newest first. When `after` is given, `skip` is ignored and the page starts right after the cursor.
+        When `fields` is given only those fields (plus id and created_at) are loaded and OrderSummary items are returned"""
         pass 
     
     @abstractmethod
-    async def update_status(self, order_id: str, status: OrderStatus) -> bool:
+    async def update_status(self, order_id: str, status: OrderStatus, expected_version: Optional[int] = None) -> Optional[Order]:
+        """Apply the transition in a single conditional write and return the updated order, or None if it does not exist.
+        Raises ConflictException when the current status does not allow it or the version no longer matches"""
         pass 
     
+    @abstractmethod
+    async def update_status_many(self, changes: List[StatusChange]) -> List[BulkItemResult]:
+        """Apply several transitions with one batched write; one result per change, in input order"""
+        pass
+    
     @abstractmethod
     async def update(self, order: Order) -> Order: 
+        """Overwrite the order if its stored version still equals `order.version`, otherwise raise ConflictException"""
         pass
 
     @abstractmethod
@@ -29,9 +61,21 @@ class OrderRepository(ABC):
         pass 
     
     @abstractmethod 
-    async def get_by_restaurant_id(self, restaurant_id: str, limit: int = 10, skip: int = 0) -> List[Order]:
+    async def get_by_restaurant_id(self, restaurant_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
         pass 
     
     @abstractmethod 
-    async def get_by_status(self, status: OrderStatus, limit: int = 10, skip: int = 0) -> List[List]:
-        pass
\ No newline at end of file
+    async def get_by_status(self, status: OrderStatus, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        pass
+
+    @abstractmethod
+    async def count_by_user_id(self, user_id: str) -> int:
+        pass
+
+    @abstractmethod
+    async def count_by_restaurant_id(self, restaurant_id: str) -> int:
+        pass
+
+    @abstractmethod
+    async def count_by_status(self, status: OrderStatus) -> int:
+        pass
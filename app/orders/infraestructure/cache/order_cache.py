@@ -0,0 +1,201 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ...domain.entities.order import Order
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry TTL; least recently used entries are evicted first"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedCacheBackend(ABC):
+    """Cache shared between service instances; values are opaque bytes"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """One value (or None) per key, in order, in a single round trip"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class LocalSharedCacheBackend(SharedCacheBackend):
+    """Single-process stand-in for the shared backend, for local development and tests"""
+
+    def __init__(self, max_size: int = 100_000):
+        self._cache = LRUCache(max_size, ttl_seconds=0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [self._cache.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._cache.ttl_seconds = ttl_seconds
+        self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisCacheBackend(SharedCacheBackend):
+
+    def __init__(self, url: str):
+        # Imported lazily so the redis client is only required when this backend is configured
+        from redis import asyncio as redis_asyncio
+        self.client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return await self.client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(key, value, px=int(ttl_seconds * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+
+class OrderCache:
+    """Two-tier order cache: an in-process LRU in front of an optional shared backend"""
+
+    KEY_PREFIX = "order:"
+
+    def __init__(self, local: LRUCache, shared: Optional[SharedCacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, order_id: str) -> Optional[Order]:
+        order = self.local.get(order_id)
+        if order is not None:
+            self.local_hits += 1
+            return order.model_copy()
+
+        if self.shared:
+            try:
+                payload = await self.shared.get(self.KEY_PREFIX + order_id)
+            except Exception as e:
+                logger.warning(f"Shared order cache read failed: {e}")
+                payload = None
+
+            if payload is not None:
+                self.shared_hits += 1
+                order = Order.model_validate_json(payload)
+                self.local.set(order_id, order)
+                return order.model_copy()
+
+        self.misses += 1
+        return None
+
+    async def get_many(self, order_ids: Sequence[str]) -> Dict[str, Order]:
+        """Cached orders among `order_ids`, keyed by id; the shared tier is read with one request"""
+
+        orders: Dict[str, Order] = {}
+        remote: List[str] = []
+        for order_id in order_ids:
+            order = self.local.get(order_id)
+            if order is not None:
+                self.local_hits += 1
+                orders[order_id] = order.model_copy()
+            else:
+                remote.append(order_id)
+
+        if remote and self.shared:
+            try:
+                payloads = await self.shared.get_many([self.KEY_PREFIX + order_id for order_id in remote])
+            except Exception as e:
+                logger.warning(f"Shared order cache read failed: {e}")
+                payloads = [None] * len(remote)
+
+            for order_id, payload in zip(remote, payloads):
+                if payload is not None:
+                    self.shared_hits += 1
+                    order = Order.model_validate_json(payload)
+                    self.local.set(order_id, order)
+                    orders[order_id] = order.model_copy()
+
+        self.misses += len(order_ids) - len(orders)
+        return orders
+
+    async def set(self, order: Order) -> None:
+        self.local.set(order.id, order.model_copy())
+
+        if self.shared:
+            try:
+                await self.shared.set(self.KEY_PREFIX + order.id, order.model_dump_json().encode(), self.local.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Shared order cache write failed: {e}")
+
+    async def invalidate(self, order_id: str) -> None:
+        self.invalidations += 1
+        self.local.delete(order_id)
+
+        if self.shared:
+            try:
+                await self.shared.delete(self.KEY_PREFIX + order_id)
+            except Exception as e:
+                logger.warning(f"Shared order cache invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.local_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+        }
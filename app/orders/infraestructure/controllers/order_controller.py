@@ -1,18 +1,28 @@
-from typing import List 
+from typing import List, Optional 
 from fastapi import HTTPException, status 
+from fastapi.responses import Response, StreamingResponse 
 
 from ...application.use_cases.create_order_use_case import CreateOrderUseCase
+from ...application.use_cases.create_orders_batch_use_case import CreateOrdersBatchUseCase
 from ...application.use_cases.get_order_use_case import GetOrderUseCase
 from ...application.use_cases.get_orders_by_user_use_case import GetOrdersByUserUseCase
+from ...application.use_cases.get_orders_by_ids_use_case import GetOrdersByIdsUseCase
 from ...application.use_cases.update_order_status_use_case import UpdateOrderStatusUseCase
+from ...application.use_cases.update_orders_status_batch_use_case import UpdateOrdersStatusBatchUseCase
 from ...application.use_cases.delete_order_use_case import DeleteOrderUseCase
 
-from ...application.dto.create_order_dto import CreateOrderDTO
-from ...application.dto.order_response_dto import OrderResponseDTO, OrderListResponseDTO, OrderCreatedResponseDTO
+from ...application.dto.create_order_dto import CreateOrderDTO, CreateOrdersBatchDTO
+from ...application.dto.update_order_status_dto import UpdateOrdersStatusBatchDTO
 
 from ...domain.entities.enums import OrderStatus
-from ....shared.exceptions import NotFoundException, BusinessException 
-from ....shared.responses import SuccessResponse, ErrorResponse 
+from ...domain.entities.order_summary import OrderSummary
+from ....shared.exceptions import NotFoundException, BusinessException, ValidationException, ConflictException 
+from ....shared.fanout import TooManySubscribers
+from ....shared.tracing import traced
+from ....shared.responses import not_modified_response, success_response 
+from ....shared.etag import etag_headers, etag_matches, listing_etag, version_etag
+from .order_response_mapper import order_to_response, orders_to_response, summary_to_response, batch_to_response
+from ..streaming.order_event_streams import OrderEventStreams, SSE_HEADERS, is_final
 
 class OrderController:
     
@@ -20,58 +30,33 @@ class OrderController:
         create_order_use_case: CreateOrderUseCase,
         get_order_use_case: GetOrderUseCase,
         get_orders_by_user_use_case: GetOrdersByUserUseCase,
+        get_orders_by_ids_use_case: GetOrdersByIdsUseCase,
         update_order_status_use_case: UpdateOrderStatusUseCase, 
-        delete_order_use_case: DeleteOrderUseCase
+        delete_order_use_case: DeleteOrderUseCase,
+        create_orders_batch_use_case: CreateOrdersBatchUseCase,
+        update_orders_status_batch_use_case: UpdateOrdersStatusBatchUseCase, 
+        order_event_streams: OrderEventStreams
     ):
         self.create_order_use_case = create_order_use_case
         self.get_order_use_case = get_order_use_case
         self.get_orders_by_user_use_case = get_orders_by_user_use_case
+        self.get_orders_by_ids_use_case = get_orders_by_ids_use_case
         self.update_order_status_use_case = update_order_status_use_case
         self.delete_order_use_case = delete_order_use_case
+        self.create_orders_batch_use_case = create_orders_batch_use_case
+        self.update_orders_status_batch_use_case = update_orders_status_batch_use_case
+        self.order_event_streams = order_event_streams
         
-    async def create_order(self, order_dto: CreateOrderDTO) -> SuccessResponse:
+    @traced()
+    async def create_order(self, order_dto: CreateOrderDTO) -> Response:
         
         try: 
             
             order = await self.create_order_use_case.execute(order_dto)
             
-            order_response = OrderResponseDTO(
-                id=order.id, 
-                user_id=order.user_id, 
-                restaurant_id=order.restaurant_id, 
-                items=[
-                    {
-                        "product_id": item.product_id, 
-                        "product_name": item.product_name, 
-                        "quantity": item.quantity, 
-                        "unit_price": item.unit_price, 
-                        "subtotal": item.subtotal
-                    }
-                    for item in order.items
-                ],
-                delivery_address={
-                    "street": order.delivery_address.street,
-                    "city": order.delivery_address.city,
-                    "state": order.delivery_address.state,
-                    "postal_code": order.delivery_address.postal_code,
-                    "country": order.delivery_address.country,
-                    "additional_info": order.delivery_address.additional_info 
-                },
-                status=order.status, 
-                total_amount=order.total_amount,
-                delivery_fee=order.delivery_fee,
-                tax_amount=order.tax_amount,
-                final_amount=order.final_amount,
-                notes=order.notes,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                estimated_delivery_time=order.estimated_delivery_time,
-                delivered_at=order.delivered_at
-            )
-
-            response_data = OrderCreatedResponseDTO(order=order_response)
+            response_data = {"order": order_to_response(order), "message": "Order created successfully"}
             
-            return SuccessResponse(
+            return success_response(
                 data=response_data, 
                 message="Order created successfully", 
                 status_code=status.HTTP_201_CREATED
@@ -89,48 +74,44 @@ class OrderController:
                 detail=f"Internal Server Error: {str(e)}"
             )
     
-    async def get_order(self, order_id: str) -> SuccessResponse:
-        try:
-            order = await self.get_order_use_case.execute(order_id)
+    @traced()
+    async def create_orders_batch(self, batch_dto: CreateOrdersBatchDTO) -> Response:
+        
+        try: 
             
-            order_response = OrderResponseDTO(
-                id=order.id, 
-                user_id=order.user_id, 
-                restaurant_id=order.restaurant_id, 
-                items=[
-                    {
-                        "product_id": item.product_id, 
-                        "product_name": item.product_name, 
-                        "quantity": item.quantity, 
-                        "unit_price": item.unit_price, 
-                        "subtotal": item.subtotal
-                    }
-                    for item in order.items
-                ],
-                delivery_address={
-                    "street": order.delivery_address.street,
-                    "city": order.delivery_address.city,
-                    "state": order.delivery_address.state,
-                    "postal_code": order.delivery_address.postal_code,
-                    "country": order.delivery_address.country,
-                    "additional_info": order.delivery_address.additional_info 
-                },
-                status=order.status, 
-                total_amount=order.total_amount,
-                delivery_fee=order.delivery_fee,
-                tax_amount=order.tax_amount,
-                final_amount=order.final_amount,
-                notes=order.notes,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                estimated_delivery_time=order.estimated_delivery_time,
-                delivered_at=order.delivered_at
+            results = await self.create_orders_batch_use_case.execute(batch_dto.orders)
+            
+            return success_response(
+                data=batch_to_response(results), 
+                message="Batch processed", 
+                status_code=status.HTTP_200_OK
+            )
+            
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal Server Error: {str(e)}"
             )
+    
+    @traced()
+    async def get_order(self, order_id: str, if_none_match: Optional[str] = None) -> Response:
+        try:
+            if if_none_match:
+                # Pollers usually already hold the current order: check its version without loading it
+                version = await self.get_order_use_case.get_version(order_id)
+                if version is not None:
+                    etag = version_etag(version.version, version.updated_at)
+                    if etag_matches(if_none_match, etag):
+                        return not_modified_response(etag_headers(etag))
+            
+            order = await self.get_order_use_case.execute(order_id)
+            etag = version_etag(order.version, order.updated_at)
             
-            return SuccessResponse(
-                data=order_response, 
+            return success_response(
+                data=order_to_response(order), 
                 message="Order retrieved successfully", 
-                status_code=status.HTTP_200_OK
+                status_code=status.HTTP_200_OK, 
+                headers=etag_headers(etag)
             )
             
         except NotFoundException as e:
@@ -144,103 +125,148 @@ class OrderController:
                 detail=f"Internal Server Error: {str(e)}"
             )
     
-    async def get_orders_by_user(self, user_id: str, limit: int = 10, skip: int = 0) -> SuccessResponse:
+    @traced()
+    async def get_orders_by_user(self, user_id: str, page: int = 1, per_page: int = 10, after: Optional[str] = None, view: str = "full", fields: Optional[List[str]] = None, if_none_match: Optional[str] = None) -> Response:
         try:
-            orders = await self.get_orders_by_user_use_case.execute(user_id, limit, skip)
+            result = await self.get_orders_by_user_use_case.execute(user_id, page, per_page, after, view, fields)
+            
+            # Tagged from the loaded page, so an unchanged page skips mapping and serialization. The view
+            # and fields are part of it: a sparse and a full page of the same orders are different representations
+            etag = listing_etag(
+                result["orders"], 
+                result["total"], 
+                result["page"], 
+                result["per_page"], 
+                result["next_cursor"], 
+                view, 
+                ",".join(result["fields"]) if result["fields"] is not None else "*"
+            )
+            if etag_matches(if_none_match, etag):
+                return not_modified_response(etag_headers(etag))
             
             orders_response = [
-                OrderResponseDTO(
-                    id=order.id, 
-                    user_id=order.user_id, 
-                    restaurant_id=order.restaurant_id, 
-                    items=[
-                        {
-                            "product_id": item.product_id, 
-                            "product_name": item.product_name, 
-                            "quantity": item.quantity, 
-                            "unit_price": item.unit_price, 
-                            "subtotal": item.subtotal
-                        }
-                        for item in order.items
-                    ],
-                    delivery_address={
-                        "street": order.delivery_address.street,
-                        "city": order.delivery_address.city,
-                        "state": order.delivery_address.state,
-                        "postal_code": order.delivery_address.postal_code,
-                        "country": order.delivery_address.country,
-                        "additional_info": order.delivery_address.additional_info 
-                    },
-                    status=order.status, 
-                    total_amount=order.total_amount,
-                    delivery_fee=order.delivery_fee,
-                    tax_amount=order.tax_amount,
-                    final_amount=order.final_amount,
-                    notes=order.notes,
-                    created_at=order.created_at,
-                    updated_at=order.updated_at,
-                    estimated_delivery_time=order.estimated_delivery_time,
-                    delivered_at=order.delivered_at
-                )
-                for order in orders
+                summary_to_response(order, result["fields"]) 
+                if isinstance(order, OrderSummary) else 
+                order_to_response(order)
+                for order in result["orders"]
             ]
             
-            response_data = OrderListResponseDTO(orders=orders_response)
+            response_data = {
+                "orders": orders_response, 
+                "total": result["total"], 
+                "page": result["page"], 
+                "per_page": result["per_page"], 
+                "total_pages": result["total_pages"], 
+                "next_cursor": result["next_cursor"]
+            }
             
-            return SuccessResponse(
+            return success_response(
                 data=response_data, 
                 message="Orders retrieved successfully", 
-                status_code=status.HTTP_200_OK
+                status_code=status.HTTP_200_OK, 
+                headers=etag_headers(etag)
             )
             
+        except ValidationException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Internal Server Error: {str(e)}"
             )
     
-    async def update_order_status(self, order_id: str, new_status: OrderStatus) -> SuccessResponse: 
+    @traced()
+    async def get_orders_by_ids(self, order_ids: List[str], if_none_match: Optional[str] = None) -> Response:
+        try:
+            result = await self.get_orders_by_ids_use_case.execute(order_ids)
+            
+            etag = listing_etag(result["orders"], *result["missing"])
+            if etag_matches(if_none_match, etag):
+                return not_modified_response(etag_headers(etag))
+            
+            return success_response(
+                data={"orders": orders_to_response(result["orders"]), "missing": result["missing"]}, 
+                message="Orders retrieved successfully", 
+                status_code=status.HTTP_200_OK, 
+                headers=etag_headers(etag)
+            )
+            
+        except ValidationException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal Server Error: {str(e)}"
+            )
+    
+    @traced()
+    async def stream_order_events(self, order_id: str, last_event_id: Optional[str] = None) -> Response:
+        try:
+            # Subscribed before the order is read, so a change in between is not lost
+            subscription = self.order_event_streams.subscribe_order(order_id)
+        except TooManySubscribers as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, 
+                detail=str(e)
+            )
+        
+        try:
+            order = await self.get_order_use_case.execute(order_id)
+        except NotFoundException as e:
+            subscription.close()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, 
+                detail=str(e)
+            )
+        except Exception as e:
+            subscription.close()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal Server Error: {str(e)}"
+            )
+        
+        if is_final(order.status) and last_event_id == str(order.version):
+            # The client saw the final status before the stream ended; 204 stops EventSource reconnecting
+            subscription.close()
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+        
+        return StreamingResponse(
+            self.order_event_streams.order_events(subscription, order, last_event_id), 
+            media_type="text/event-stream", 
+            headers=SSE_HEADERS
+        )
+    
+    @traced()
+    async def stream_restaurant_events(self, restaurant_id: str, last_event_id: Optional[str] = None) -> Response:
+        try:
+            subscription, replay = self.order_event_streams.subscribe_restaurant(restaurant_id, last_event_id)
+        except TooManySubscribers as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, 
+                detail=str(e)
+            )
+        
+        return StreamingResponse(
+            self.order_event_streams.restaurant_events(subscription, replay), 
+            media_type="text/event-stream", 
+            headers=SSE_HEADERS
+        )
+    
+    @traced()
+    async def update_order_status(self, order_id: str, new_status: OrderStatus, expected_version: Optional[int] = None) -> Response: 
         
         try: 
             
-            order = await self.update_order_status_use_case.execute(order_id, new_status)
-
-            order_response = OrderResponseDTO(
-                id=order.id, 
-                user_id=order.user_id, 
-                restaurant_id=order.restaurant_id, 
-                items=[
-                    {
-                        "product_id": item.product_id, 
-                        "product_name": item.product_name, 
-                        "quantity": item.quantity, 
-                        "unit_price": item.unit_price, 
-                        "subtotal": item.subtotal
-                    }
-                    for item in order.items
-                ],
-                delivery_address={
-                    "street": order.delivery_address.street,
-                    "city": order.delivery_address.city,
-                    "state": order.delivery_address.state,
-                    "postal_code": order.delivery_address.postal_code,
-                    "country": order.delivery_address.country,
-                    "additional_info": order.delivery_address.additional_info 
-                },
-                status=order.status, 
-                total_amount=order.total_amount,
-                delivery_fee=order.delivery_fee,
-                tax_amount=order.tax_amount,
-                final_amount=order.final_amount,
-                notes=order.notes,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                estimated_delivery_time=order.estimated_delivery_time,
-                delivered_at=order.delivered_at
-            )
+            order = await self.update_order_status_use_case.execute(order_id, new_status, expected_version)
 
-            return SuccessResponse(
-                data=order_response, 
+            return success_response(
+                data=order_to_response(order), 
                 message="Order retrieved successfully", 
                 status_code=status.HTTP_200_OK
             )
@@ -251,6 +277,12 @@ class OrderController:
                 detail=str(e)
             )
 
+        except ConflictException as e: 
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, 
+                detail=str(e)
+            )
+
         except BusinessException as e: 
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
@@ -263,13 +295,33 @@ class OrderController:
                 detail=f"Interal Server Error: {str(e)}"
             )
 
-    async def delete_order(self, order_id: str) -> SuccessResponse:
+    @traced()
+    async def update_orders_status_batch(self, batch_dto: UpdateOrdersStatusBatchDTO) -> Response:
+
+        try:
+
+            results = await self.update_orders_status_batch_use_case.execute(batch_dto.updates)
+
+            return success_response(
+                data=batch_to_response(results), 
+                message="Batch processed", 
+                status_code=status.HTTP_200_OK
+            )
+
+        except Exception as e: 
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+                detail=f"Internal Server Error: {str(e)}"
+            )
+
+    @traced()
+    async def delete_order(self, order_id: str) -> Response:
         
         try: 
             
             await self.delete_order_use_case.execute(order_id)
 
-            return SuccessResponse(
+            return success_response(
                 data={"deleted_order_id": order_id},
                 message="Order deleted successfully",
                 status_code=status.HTTP_200_OK
@@ -285,9 +337,3 @@ class OrderController:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail=f"Internal Server Error: {str(e)}"
             )
-            
-            
-        
-
-
-
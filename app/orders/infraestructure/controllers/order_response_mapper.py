@@ -0,0 +1,34 @@
+from typing import Any, Dict, List, Sequence
+
+from ...application.dto.order_response_dto import OrderResponseDTO
+from ...domain.entities.bulk_result import BulkItemResult
+from ...domain.entities.order import Order
+from ...domain.entities.order_summary import OrderSummary
+
+# The wire shape is OrderResponseDTO; Order carries the same fields, so its compiled
+# pydantic-core serializer produces the response in one pass without building a DTO
+ORDER_RESPONSE_FIELDS = frozenset(OrderResponseDTO.model_fields)
+
+def order_to_response(order: Order) -> Dict[str, Any]:
+    return order.model_dump(include=ORDER_RESPONSE_FIELDS)
+
+def orders_to_response(orders: Sequence[Order]) -> List[Dict[str, Any]]:
+    return [order.model_dump(include=ORDER_RESPONSE_FIELDS) for order in orders]
+
+def summary_to_response(summary: OrderSummary, fields: Sequence[str]) -> Dict[str, Any]:
+    # created_at is always loaded for the cursor but only returned when asked for
+    return summary.model_dump(include={"id", *fields}, exclude_unset=True)
+
+def batch_to_response(results: Sequence[BulkItemResult]) -> Dict[str, Any]:
+    items = [
+        {
+            "index": result.index, 
+            "success": result.success, 
+            "order": order_to_response(result.order) if result.order else None, 
+            "error": result.error
+        }
+        for result in results
+    ]
+    succeeded = sum(1 for item in items if item["success"])
+
+    return {"results": items, "succeeded": succeeded, "failed": len(items) - succeeded}
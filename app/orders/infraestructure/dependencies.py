@@ -1,34 +1,181 @@
 from functools import lru_cache
-from ...config.database import get_database
+from typing import List
+from ...config.settings import settings
+from ...config.database import get_database, get_write_concern
 from ..domain.repositories.order_repository import OrderRepository
 from ..infraestructure.repositories.mongodb_order_repository import MongoDBOrderRepository
+from ..infraestructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from ..infraestructure.repositories.order_counters import OrderCounters
+from ..infraestructure.repositories.order_outbox import OrderOutbox
+from ..infraestructure.repositories.cached_order_repository import CachedOrderRepository
+from ..infraestructure.cache.order_cache import OrderCache, LRUCache, LocalSharedCacheBackend, RedisCacheBackend
+from ..infraestructure.idempotency.idempotency_store import IdempotencyStore, InMemoryIdempotencyStore, MongoIdempotencyStore
+from ...shared.admission_control import AdmissionController, RouteClass
+from ...shared.tracing import SpanExporter, build_exporter
 
 from ..application.use_cases.create_order_use_case import CreateOrderUseCase
+from ..application.use_cases.create_orders_batch_use_case import CreateOrdersBatchUseCase
 from ..application.use_cases.get_order_use_case import GetOrderUseCase
+from ..application.use_cases.get_orders_by_ids_use_case import GetOrdersByIdsUseCase
 from ..application.use_cases.get_orders_by_user_use_case import GetOrdersByUserUseCase
 from ..application.use_cases.update_order_status_use_case import UpdateOrderStatusUseCase
+from ..application.use_cases.update_orders_status_batch_use_case import UpdateOrdersStatusBatchUseCase
 from ..application.use_cases.delete_order_use_case import DeleteOrderUseCase
+from ..application.use_cases.apply_saga_events_use_case import ApplySagaEventsUseCase
 
 from ..infraestructure.controllers.order_controller import OrderController
 from ..infraestructure.messaging.rabbitmq_publisher import RabbitMQPublisher
+from ..infraestructure.messaging.broker_supervisor import BrokerSupervisor, CircuitBreaker
+from ..infraestructure.messaging.spill_buffer import SpillBuffer
+from ..infraestructure.messaging.codecs import CodecRegistry
+from ..infraestructure.messaging.saga_consumer import SagaEventConsumer
 from ..infraestructure.messaging.event_publisher import EventPublisher
+from ..infraestructure.messaging.outbox_relay import OutboxRelay
+from ..infraestructure.messaging.event_pipeline import EventPipeline
+from ..infraestructure.streaming.order_status_hub import OrderStatusHub
+from ..infraestructure.streaming.order_event_streams import OrderEventStreams
 
 # Repository dependencies
+def uses_outbox() -> bool:
+    # Only the Mongo backend persists and relays an outbox; the memory backend publishes inline
+    return settings.outbox_enabled and settings.order_repository_backend == "mongodb"
+
+@lru_cache()
+def get_order_counters() -> OrderCounters:
+    return OrderCounters(
+        get_database(), 
+        write_concern=get_write_concern(), 
+        settle_seconds=settings.order_counters_reconcile_settle_seconds
+    )
+
+@lru_cache()
+def get_order_outbox() -> OrderOutbox:
+    return OrderOutbox(get_database(), write_concern=get_write_concern())
+
+@lru_cache()
+def get_idempotency_store() -> IdempotencyStore:
+    if settings.order_repository_backend == "memory":
+        return InMemoryIdempotencyStore()
+    return MongoIdempotencyStore(get_database())
+
+@lru_cache()
+def get_span_exporters() -> List[SpanExporter]:
+    return [build_exporter(name, file_path=settings.tracing_file_path) for name in settings.tracing_exporters]
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    limits = settings.admission_class_limits
+    classes = [
+        RouteClass("status", priority=0, max_concurrency=limits.get("status")),
+        RouteClass("read", priority=1, max_concurrency=limits.get("read")),
+        RouteClass("create", priority=1, max_concurrency=limits.get("create")),
+        RouteClass("bulk", priority=2, max_concurrency=limits.get("bulk")),
+    ]
+    return AdmissionController(
+        classes, 
+        max_concurrency=settings.admission_max_concurrency, 
+        max_queue_size=settings.admission_max_queue_size, 
+        queue_timeout_seconds=settings.admission_queue_timeout_seconds
+    )
+
+@lru_cache()
+def get_order_cache() -> OrderCache:
+    shared = None
+    if settings.order_cache_shared_backend == "redis":
+        shared = RedisCacheBackend(settings.redis_url)
+    elif settings.order_cache_shared_backend == "local":
+        shared = LocalSharedCacheBackend()
+    
+    local = LRUCache(settings.order_cache_max_size, settings.order_cache_ttl_seconds)
+    return OrderCache(local, shared)
+
 @lru_cache()
 def get_order_repository() -> OrderRepository:
     """Get order repository instance"""
+    if settings.order_repository_backend == "memory":
+        return InMemoryOrderRepository()
+    
     database = get_database()
-    return MongoDBOrderRepository(database)
+    repository = MongoDBOrderRepository(
+        database, 
+        write_concern=get_write_concern(), 
+        counters=get_order_counters(), 
+        outbox=get_order_outbox() if uses_outbox() else None, 
+        use_transactions=settings.outbox_use_transactions, 
+        trusted_reads=settings.mongo_trusted_reads
+    )
+    
+    if settings.order_cache_enabled:
+        return CachedOrderRepository(repository, get_order_cache())
+    return repository
 
 # Messaging dependencies 
+@lru_cache()
+def get_broker_supervisor() -> BrokerSupervisor:
+    breaker = CircuitBreaker(
+        failure_threshold=settings.rabbitmq_breaker_failure_threshold, 
+        reset_seconds=settings.rabbitmq_breaker_reset_seconds
+    )
+    return BrokerSupervisor(
+        initial_delay_seconds=settings.rabbitmq_reconnect_initial_delay_seconds, 
+        max_delay_seconds=settings.rabbitmq_reconnect_max_delay_seconds, 
+        connect_wait_seconds=settings.rabbitmq_connect_wait_seconds, 
+        breaker=breaker
+    )
+
+@lru_cache()
+def get_codec_registry() -> CodecRegistry:
+    return CodecRegistry(settings.event_content_type, settings.event_content_type_overrides)
+
 @lru_cache()
 def get_rabbitmq_publisher() -> RabbitMQPublisher:
-    return RabbitMQPublisher()
+    spill_buffer = None
+    if settings.rabbitmq_spill_path:
+        spill_buffer = SpillBuffer(settings.rabbitmq_spill_path, max_bytes=settings.rabbitmq_spill_max_bytes)
+    return RabbitMQPublisher(get_broker_supervisor(), spill_buffer, get_codec_registry())
+
+@lru_cache()
+def get_event_pipeline() -> EventPipeline:
+    return EventPipeline(
+        get_rabbitmq_publisher(), 
+        max_queue_size=settings.event_pipeline_max_queue_size, 
+        max_batch_size=settings.event_pipeline_max_batch_size, 
+        flush_interval_seconds=settings.event_pipeline_flush_interval_seconds, 
+        retry_initial_seconds=settings.event_pipeline_retry_initial_seconds, 
+        retry_max_seconds=settings.event_pipeline_retry_max_seconds
+    )
 
 @lru_cache()
 def get_event_publisher() -> EventPublisher: 
     rabbitmq_publisher = get_rabbitmq_publisher()
-    return EventPublisher(rabbitmq_publisher)
+    pipeline = get_event_pipeline() if settings.event_pipeline_enabled else None
+    return EventPublisher(rabbitmq_publisher, pipeline)
+
+@lru_cache()
+def get_order_status_hub() -> OrderStatusHub:
+    return OrderStatusHub(
+        max_subscribers=settings.order_stream_max_subscribers, 
+        history_size=settings.order_stream_history_size
+    )
+
+@lru_cache()
+def get_order_event_streams() -> OrderEventStreams:
+    return OrderEventStreams(
+        get_order_status_hub(), 
+        heartbeat_seconds=settings.order_stream_heartbeat_seconds, 
+        buffer_size=settings.order_stream_buffer_size, 
+        retry_ms=settings.order_stream_retry_ms
+    )
+
+@lru_cache()
+def get_outbox_relay() -> OutboxRelay:
+    return OutboxRelay(
+        get_order_outbox(), 
+        get_rabbitmq_publisher(), 
+        batch_size=settings.outbox_relay_batch_size, 
+        poll_interval_seconds=settings.outbox_relay_poll_interval_seconds, 
+        lease_seconds=settings.outbox_relay_lease_seconds
+    )
 
 
 # Use case dependencies
@@ -37,14 +184,31 @@ def get_create_order_use_case() -> CreateOrderUseCase:
     """Get create order use case instance"""
     order_repository = get_order_repository()
     event_publisher = get_event_publisher()
-    return CreateOrderUseCase(order_repository, event_publisher)
+    return CreateOrderUseCase(order_repository, event_publisher, use_outbox=uses_outbox())
+
+
+@lru_cache()
+def get_create_orders_batch_use_case() -> CreateOrdersBatchUseCase:
+    order_repository = get_order_repository()
+    event_publisher = get_event_publisher()
+    return CreateOrdersBatchUseCase(order_repository, event_publisher, use_outbox=uses_outbox())
 
 
 @lru_cache()
 def get_get_order_use_case() -> GetOrderUseCase:
     """Get order use case instance"""
     order_repository = get_order_repository()
-    return GetOrderUseCase(order_repository)
+    return GetOrderUseCase(
+        order_repository, 
+        coalesce=settings.order_get_coalescing_enabled, 
+        max_batch_size=settings.order_get_coalescing_max_batch_size
+    )
+
+
+@lru_cache()
+def get_get_orders_by_ids_use_case() -> GetOrdersByIdsUseCase:
+    order_repository = get_order_repository()
+    return GetOrdersByIdsUseCase(order_repository)
 
 
 @lru_cache()
@@ -56,13 +220,39 @@ def get_get_orders_by_user_use_case() -> GetOrdersByUserUseCase:
 @lru_cache()
 def get_update_order_status_use_case() -> UpdateOrderStatusUseCase:
     order_repository = get_order_repository()
-    return UpdateOrderStatusUseCase(order_repository)
+    return UpdateOrderStatusUseCase(order_repository, get_order_status_hub())
+
+@lru_cache()
+def get_update_orders_status_batch_use_case() -> UpdateOrdersStatusBatchUseCase:
+    order_repository = get_order_repository()
+    return UpdateOrdersStatusBatchUseCase(order_repository, get_order_status_hub())
 
 @lru_cache()
 def get_delete_order_use_case() -> DeleteOrderUseCase:
     order_repository = get_order_repository() 
     return DeleteOrderUseCase(order_repository)
 
+@lru_cache()
+def get_apply_saga_events_use_case() -> ApplySagaEventsUseCase:
+    order_repository = get_order_repository()
+    return ApplySagaEventsUseCase(order_repository, get_order_status_hub())
+
+# Consumer dependencies
+@lru_cache()
+def get_saga_consumer() -> SagaEventConsumer:
+    return SagaEventConsumer(
+        get_broker_supervisor(), 
+        get_codec_registry(), 
+        get_apply_saga_events_use_case(), 
+        queue_name=settings.saga_events_queue, 
+        exchange_name=settings.saga_events_exchange, 
+        routing_keys=settings.saga_routing_keys, 
+        prefetch=settings.saga_consumer_prefetch, 
+        batch_size=settings.saga_consumer_batch_size, 
+        batch_wait_seconds=settings.saga_consumer_batch_wait_seconds, 
+        workers=settings.saga_consumer_workers
+    )
+
 # Controller dependencies
 @lru_cache()
 def get_order_controller() -> OrderController:
@@ -70,13 +260,21 @@ def get_order_controller() -> OrderController:
     create_order_use_case = get_create_order_use_case()
     get_order_use_case = get_get_order_use_case()
     get_orders_by_user_use_case = get_get_orders_by_user_use_case()
+    get_orders_by_ids_use_case = get_get_orders_by_ids_use_case()
     update_order_use_case = get_update_order_status_use_case()
     delete_order_use_case = get_delete_order_use_case()
+    create_orders_batch_use_case = get_create_orders_batch_use_case()
+    update_orders_status_batch_use_case = get_update_orders_status_batch_use_case()
+    order_event_streams = get_order_event_streams()
     
     return OrderController(
         create_order_use_case=create_order_use_case,
         get_order_use_case=get_order_use_case,
         get_orders_by_user_use_case=get_orders_by_user_use_case,
+        get_orders_by_ids_use_case=get_orders_by_ids_use_case,
         update_order_status_use_case=update_order_use_case, 
-        delete_order_use_case=delete_order_use_case
+        delete_order_use_case=delete_order_use_case,
+        create_orders_batch_use_case=create_orders_batch_use_case,
+        update_orders_status_batch_use_case=update_orders_status_batch_use_case, 
+        order_event_streams=order_event_streams
     )
\ No newline at end of file
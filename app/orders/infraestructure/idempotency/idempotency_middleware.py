@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import logging
+from uuid import uuid4
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..cache.order_cache import LRUCache
+from .idempotency_store import IdempotencyRecord, IdempotencyStore
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """Makes POSTs carrying an Idempotency-Key safe to retry.
+
+    The first request with a key runs normally and its response is stored; a retry
+    with the same key and body gets that response back without reaching the
+    endpoint, so validation, pricing, the insert and the event all happen once.
+    Duplicates arriving while the first attempt is still running wait for it: in
+    this process on the attempt itself, across instances by polling the store.
+    Completed responses are also kept in an in-process LRU so hot retries do not
+    read the store. 5xx responses are not kept, so the retry runs again.
+    """
+
+    def __init__(self, app, store_provider: Callable[[], IdempotencyStore], paths: Iterable[str], ttl_seconds: float = 86400, lock_seconds: float = 30, wait_seconds: float = 10, cache_size: int = 10000):
+        self.app = app
+        self.store_provider = store_provider
+        self.paths = set(paths)
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.cache = LRUCache(cache_size, ttl_seconds)
+        self._in_flight: Dict[str, "asyncio.Future[None]"] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        key = self._key(scope)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await self._error(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+        body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        scoped_key = f"{scope['path']} {key}"
+
+        # Wait out an attempt already running in this process, then use its response
+        while True:
+            record = self.cache.get(scoped_key)
+            if record is not None:
+                return await self._replay(send, record, fingerprint)
+
+            attempt = self._in_flight.get(scoped_key)
+            if attempt is None:
+                break
+            try:
+                await asyncio.wait_for(asyncio.shield(attempt), self.wait_seconds)
+            except asyncio.TimeoutError:
+                return await self._error(send, 409, "A request with this Idempotency-Key is still being processed")
+
+        attempt = self._in_flight[scoped_key] = asyncio.get_running_loop().create_future()
+        try:
+            store = self.store_provider()
+            record = IdempotencyRecord(key=scoped_key, fingerprint=fingerprint, claim_token=uuid4().hex)
+            existing = await store.begin(scoped_key, fingerprint, record.claim_token, self.lock_seconds, self.ttl_seconds)
+            if existing is None:
+                return await self._run(scope, body, receive, send, store, record)
+
+            if not existing.completed:
+                existing = await self._wait_elsewhere(store, scoped_key)
+                if existing is None:
+                    return await self._error(send, 409, "A request with this Idempotency-Key is still being processed")
+
+            self.cache.set(scoped_key, existing)
+            return await self._replay(send, existing, fingerprint)
+        finally:
+            del self._in_flight[scoped_key]
+            attempt.set_result(None)
+
+    async def _run(self, scope, body: bytes, receive, send, store: IdempotencyStore, record: IdempotencyRecord) -> None:
+        start: Dict = {}
+        chunks: List[bytes] = []
+        body_sent = False
+
+        async def receive_body():
+            # The body was already read to fingerprint it; after it, pass through (e.g. disconnects)
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except BaseException:
+            await self._release(store, record)
+            raise
+
+        status_code = start.get("status", 500)
+        if status_code >= 500:
+            # Server-side failures are worth retrying for real
+            await self._release(store, record)
+            return
+
+        record.completed = True
+        record.status_code = status_code
+        record.headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in start.get("headers", [])]
+        record.body = b"".join(chunks)
+        try:
+            stored = await store.complete(record, self.ttl_seconds)
+        except Exception as e:
+            # The client already has its response; a retry would run again, which is no worse than without a key
+            logger.error(f"Could not store idempotent response for {record.key}: {e}")
+            await self._release(store, record)
+            return
+        if not stored:
+            # The lock expired and another attempt took the key over; its response is the one kept
+            logger.warning(f"Idempotency-Key {record.key} was taken over before this attempt finished; its response was not stored")
+            return
+        self.cache.set(record.key, record)
+
+    async def _wait_elsewhere(self, store: IdempotencyStore, key: str) -> Optional[IdempotencyRecord]:
+        """Poll for the response of an attempt running on another instance"""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        delay = 0.05
+        while loop.time() < deadline:
+            await asyncio.sleep(delay)
+            record = await store.get(key)
+            if record is None:
+                # The attempt failed and was released; let the client retry it
+                return None
+            if record.completed:
+                return record
+            delay = min(delay * 2, 0.5)
+        return None
+
+    async def _replay(self, send, record: IdempotencyRecord, fingerprint: str) -> None:
+        if record.fingerprint != fingerprint:
+            return await self._error(send, 422, "Idempotency-Key was already used with a different request body")
+
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers]
+        await send({"type": "http.response.start", "status": record.status_code, "headers": headers + [REPLAYED_HEADER]})
+        await send({"type": "http.response.body", "body": record.body})
+
+    @staticmethod
+    async def _release(store: IdempotencyStore, record: IdempotencyRecord) -> None:
+        try:
+            await store.release(record.key, record.claim_token)
+        except Exception as e:
+            logger.warning(f"Could not release Idempotency-Key {record.key}: {e}")
+
+    @staticmethod
+    def _key(scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                return value.decode("latin-1").strip()
+        return None
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if message["type"] == "http.disconnect" or not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _error(send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        headers: List[Tuple[bytes, bytes]] = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
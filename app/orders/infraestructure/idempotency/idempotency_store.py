@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+class IdempotencyRecord(BaseModel):
+    """A request seen under an Idempotency-Key: in progress until its response is stored"""
+    key: str
+    # Hash of the request body; the same key with a different body is a client error
+    fingerprint: str
+    # Identifies the attempt that owns the key, so one whose lock was taken over cannot write
+    claim_token: Optional[str] = None
+    completed: bool = False
+    status_code: Optional[int] = None
+    headers: List[Tuple[str, str]] = []
+    body: bytes = b""
+
+
+class IdempotencyStore(ABC):
+    """Durable record of Idempotency-Keys, shared by every instance of the service"""
+
+    @abstractmethod
+    async def begin(self, key: str, fingerprint: str, claim_token: str, lock_seconds: float, ttl_seconds: float) -> Optional[IdempotencyRecord]:
+        """Claim `key` for a new attempt identified by `claim_token`. Returns None when the caller now
+        owns it, otherwise the existing record. An attempt still in progress after `lock_seconds` is
+        assumed dead and taken over"""
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        pass
+
+    @abstractmethod
+    async def complete(self, record: IdempotencyRecord, ttl_seconds: float) -> bool:
+        """Store the response of the attempt owning the key; it is replayed until `ttl_seconds` from now.
+        Returns False, storing nothing, when the attempt no longer owns the key"""
+        pass
+
+    @abstractmethod
+    async def release(self, key: str, claim_token: str) -> None:
+        """Give up an owned attempt without a response to keep, so a retry runs it again"""
+        pass
+
+
+class MongoIdempotencyStore(IdempotencyStore):
+    """The `idempotency_keys` collection: the key is the _id, so the unique index comes for free,
+    and `expires_at` drives the TTL index declared in the index registry"""
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.collection = database.idempotency_keys
+
+    async def begin(self, key: str, fingerprint: str, claim_token: str, lock_seconds: float, ttl_seconds: float) -> Optional[IdempotencyRecord]:
+        now = datetime.now(timezone.utc)
+        claim = {
+            "fingerprint": fingerprint,
+            "claim_token": claim_token,
+            "completed": False,
+            "locked_until": now + timedelta(seconds=lock_seconds),
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+        }
+
+        try:
+            await self.collection.insert_one({"_id": key, **claim})
+            return None
+        except DuplicateKeyError:
+            pass
+
+        # The TTL monitor only runs once a minute, so expired records may still be around
+        taken = await self.collection.find_one_and_update(
+            {"_id": key, "$or": [
+                {"completed": False, "locked_until": {"$lt": now}},
+                {"expires_at": {"$lt": now}}
+            ]},
+            {"$set": claim, "$unset": {"status_code": "", "headers": "", "body": ""}},
+            return_document=ReturnDocument.AFTER
+        )
+        if taken:
+            return None
+
+        return await self.get(key)
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        document = await self.collection.find_one({"_id": key})
+        return self._to_record(document) if document else None
+
+    async def complete(self, record: IdempotencyRecord, ttl_seconds: float) -> bool:
+        result = await self.collection.update_one(
+            {"_id": record.key, "fingerprint": record.fingerprint, "claim_token": record.claim_token, "completed": False},
+            {"$set": {
+                "completed": True,
+                "status_code": record.status_code,
+                "headers": [list(header) for header in record.headers],
+                "body": record.body,
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+            }}
+        )
+        return result.matched_count == 1
+
+    async def release(self, key: str, claim_token: str) -> None:
+        await self.collection.delete_one({"_id": key, "claim_token": claim_token, "completed": False})
+
+    @staticmethod
+    def _to_record(document: Dict) -> IdempotencyRecord:
+        return IdempotencyRecord(
+            key=document["_id"],
+            fingerprint=document["fingerprint"],
+            claim_token=document.get("claim_token"),
+            completed=document.get("completed", False),
+            status_code=document.get("status_code"),
+            headers=[tuple(header) for header in document.get("headers", [])],
+            body=document.get("body", b""),
+        )
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Process-local store for the in-memory backend"""
+
+    def __init__(self):
+        # key -> (record, locked_until, expires_at)
+        self._records: Dict[str, Tuple[IdempotencyRecord, datetime, datetime]] = {}
+
+    async def begin(self, key: str, fingerprint: str, claim_token: str, lock_seconds: float, ttl_seconds: float) -> Optional[IdempotencyRecord]:
+        now = datetime.now(timezone.utc)
+        entry = self._records.get(key)
+
+        if entry:
+            record, locked_until, expires_at = entry
+            if expires_at >= now and (record.completed or locked_until >= now):
+                return record.model_copy()
+
+        self._records[key] = (
+            IdempotencyRecord(key=key, fingerprint=fingerprint, claim_token=claim_token),
+            now + timedelta(seconds=lock_seconds),
+            now + timedelta(seconds=ttl_seconds),
+        )
+        return None
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        entry = self._records.get(key)
+        if not entry or entry[2] < datetime.now(timezone.utc):
+            return None
+        return entry[0].model_copy()
+
+    async def complete(self, record: IdempotencyRecord, ttl_seconds: float) -> bool:
+        if not self._owns(record.key, record.claim_token, record.fingerprint):
+            return False
+        now = datetime.now(timezone.utc)
+        self._records[record.key] = (record.model_copy(update={"completed": True}), now, now + timedelta(seconds=ttl_seconds))
+        return True
+
+    async def release(self, key: str, claim_token: str) -> None:
+        if self._owns(key, claim_token):
+            del self._records[key]
+
+    def _owns(self, key: str, claim_token: Optional[str], fingerprint: Optional[str] = None) -> bool:
+        entry = self._records.get(key)
+        if not entry or entry[0].completed or entry[0].claim_token != claim_token:
+            return False
+        return fingerprint is None or entry[0].fingerprint == fingerprint
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractConnection
+from aio_pika.pool import Pool
+
+from ....config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class BrokerUnavailableError(Exception):
+    """Raised when the broker cannot take a publish right now; callers fail fast instead of waiting"""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and rejects calls until `reset_seconds`
+    have passed, then lets calls through again (half-open): a success closes it, a failure re-opens it"""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        # Only a closed breaker reaching the threshold or a failed half-open probe opens it; calls
+        # still in flight when it opened must not push the open window out
+        state = self.state
+        if state == "half_open" or (state == "closed" and self.failures >= self.failure_threshold):
+            self.trip()
+
+    def trip(self) -> None:
+        self.opened_at = time.monotonic()
+
+
+class BrokerSupervisor:
+    """Owns the RabbitMQ connection for the whole process.
+
+    A background task connects, declares the topology once, and on connection loss
+    reconnects with jittered exponential backoff. While the broker is down the
+    circuit breaker is open, so publishers fail fast (or spill) instead of queueing
+    up behind connection attempts. `on_connected` hooks run after every (re)connect
+    before publishers are let through, e.g. to replay spilled events in order.
+    """
+
+    def __init__(self, initial_delay_seconds: float = 0.5, max_delay_seconds: float = 30.0, connect_wait_seconds: float = 5.0, breaker: Optional[CircuitBreaker] = None):
+        self.initial_delay_seconds = initial_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.connect_wait_seconds = connect_wait_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.on_connected: List[Callable[[], Awaitable[None]]] = []
+        self.connection: Optional[AbstractConnection] = None
+        self.channel_pool: Optional[Pool] = None
+        self._ready = asyncio.Event()
+        self._topology_declared = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._supervise())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._teardown()
+
+    @asynccontextmanager
+    async def channel(self, wait_ready: bool = True) -> AsyncIterator[AbstractChannel]:
+        """Borrow a confirm-mode channel. Raises BrokerUnavailableError when the breaker is open
+        or the broker does not come up within connect_wait_seconds"""
+
+        self.start()
+        if not self.breaker.allow():
+            raise BrokerUnavailableError("RabbitMQ is unavailable (circuit open)")
+
+        # Only wait out a connection in progress while things look healthy; a half-open
+        # breaker with no connection means the supervisor is still backing off
+        if wait_ready and not self._ready.is_set() and self.breaker.state == "closed":
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.connect_wait_seconds)
+            except asyncio.TimeoutError:
+                raise BrokerUnavailableError("RabbitMQ is not connected")
+
+        if self.channel_pool is None or (wait_ready and not self._ready.is_set()):
+            raise BrokerUnavailableError("RabbitMQ is not connected")
+
+        async with self.channel_pool.acquire() as channel:
+            yield channel
+
+    async def _supervise(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                lost = await self._connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.breaker.trip()
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(f"RabbitMQ connection attempt {attempt} failed, retrying in {delay:.1f}s: {e}")
+                await self._teardown()
+                await asyncio.sleep(delay)
+                continue
+
+            attempt = 0
+            await lost.wait()
+            logger.warning("RabbitMQ connection lost, reconnecting")
+            self.breaker.trip()
+            await self._teardown()
+
+    async def _connect(self) -> asyncio.Event:
+        self.connection = await aio_pika.connect(
+            host=settings.rabbitmq_host,
+            port=settings.rabbitmq_port,
+            login=settings.rabbitmq_username,
+            password=settings.rabbitmq_password,
+            virtualhost=settings.rabbitmq_vhost
+        )
+
+        lost = asyncio.Event()
+        self.connection.close_callbacks.add(lambda *args: lost.set())
+
+        if not self._topology_declared:
+            await self._declare_topology()
+            self._topology_declared = True
+
+        self.channel_pool = Pool(self._create_channel, max_size=settings.rabbitmq_channel_pool_size)
+
+        # Close the breaker so hooks can publish, but keep other publishers waiting until they finish
+        self.breaker.record_success()
+        for hook in self.on_connected:
+            await hook()
+
+        self._ready.set()
+        logger.info("Connected to RabbitMQ")
+        return lost
+
+    async def _declare_topology(self) -> None:
+        # Exchange and queues are durable, so declaring them once per process is enough
+        channel = await self.connection.channel()
+        exchange = await channel.declare_exchange(
+            settings.orders_exchange, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+
+        # Declare queues
+        payment_queue = await channel.declare_queue(settings.payment_queue, durable=True)
+        notification_queue = await channel.declare_queue(settings.notification_queue, durable=True)
+
+        await payment_queue.bind(exchange, routing_key='order.created')
+        await notification_queue.bind(exchange, routing_key='order.*')
+        await channel.close()
+
+    async def _create_channel(self) -> AbstractChannel:
+        return await self.connection.channel(publisher_confirms=True)
+
+    async def _teardown(self) -> None:
+        self._ready.clear()
+        pool, connection = self.channel_pool, self.connection
+        self.channel_pool = None
+        self.connection = None
+
+        try:
+            if pool and not pool.is_closed:
+                await pool.close()
+            if connection and not connection.is_closed:
+                await connection.close()
+        except Exception as e:
+            logger.debug(f"Error while closing the RabbitMQ connection: {e}")
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: a random delay up to the exponential cap, so instances do not reconnect in lockstep
+        return random.uniform(0, min(self.max_delay_seconds, self.initial_delay_seconds * 2 ** attempt))
@@ -0,0 +1,149 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Current payload schema of each event type. Bump when a field changes meaning or is
+# removed, so consumers can keep decoding old messages still sitting in queues.
+EVENT_SCHEMA_VERSIONS: Dict[str, int] = {
+    "order.created": 1,
+}
+
+SCHEMA_VERSION_HEADER = "x-schema-version"
+EVENT_TYPE_HEADER = "x-event-type"
+
+
+def _utc(value: datetime) -> datetime:
+    # Dates read back from Mongo (e.g. outbox payloads) are naive UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class EventCodec(ABC):
+    """Encodes event payloads to message bodies and back; identified by its content type"""
+
+    content_type: str
+
+    @abstractmethod
+    def encode(self, payload: Mapping[str, Any]) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        pass
+
+
+class JsonCodec(EventCodec):
+    content_type = "application/json"
+
+    def encode(self, payload: Mapping[str, Any]) -> bytes:
+        return json.dumps(payload, default=self._default, separators=(",", ":")).encode()
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return json.loads(body)
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return _utc(value).isoformat()
+        return str(value)
+
+
+class OrjsonCodec(EventCodec):
+    """Same wire format as JsonCodec, serialized in native code"""
+
+    content_type = "application/json"
+
+    def __init__(self):
+        # Imported lazily so orjson is only required when this codec is used
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NAIVE_UTC
+
+    def encode(self, payload: Mapping[str, Any]) -> bytes:
+        return self._orjson.dumps(payload, default=str, option=self._options)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return self._orjson.loads(body)
+
+
+class MsgpackCodec(EventCodec):
+    """Binary encoding; datetimes travel as msgpack timestamps and decode back to UTC datetimes"""
+
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def encode(self, payload: Mapping[str, Any]) -> bytes:
+        return self._msgpack.packb(payload, default=self._default, use_bin_type=True, datetime=False)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return self._msgpack.unpackb(body, raw=False, timestamp=3)
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return self._msgpack.Timestamp.from_datetime(_utc(value))
+        return str(value)
+
+
+def default_json_codec() -> EventCodec:
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return JsonCodec()
+
+
+class CodecRegistry:
+    """Picks the codec for each routing key and decodes by the content type a message declares.
+
+    Publishing uses `default_content_type` unless a routing key has an override, so busy
+    routing keys can move to a compact encoding once their consumers accept it. Decoding
+    always follows the message's own content_type, so both encodings can coexist.
+    """
+
+    def __init__(self, default_content_type: str = "application/json", overrides: Optional[Mapping[str, str]] = None):
+        json_codec = default_json_codec()
+        self.codecs: Dict[str, EventCodec] = {json_codec.content_type: json_codec}
+        self.overrides = dict(overrides or {})
+
+        for content_type in {default_content_type, *self.overrides.values()}:
+            if content_type not in self.codecs:
+                self.register(self._build(content_type))
+        self.default_content_type = default_content_type
+
+    def register(self, codec: EventCodec) -> None:
+        self.codecs[codec.content_type] = codec
+
+    def for_routing_key(self, routing_key: str) -> EventCodec:
+        return self.codecs[self.overrides.get(routing_key, self.default_content_type)]
+
+    def headers_for(self, routing_key: str) -> Dict[str, Any]:
+        return {
+            EVENT_TYPE_HEADER: routing_key,
+            SCHEMA_VERSION_HEADER: EVENT_SCHEMA_VERSIONS.get(routing_key, 1),
+        }
+
+    def decode(self, body: bytes, content_type: Optional[str], headers: Optional[Mapping[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        """Decode a message body; returns (schema_version, payload). Messages without a content type are JSON"""
+
+        content_type = content_type or JsonCodec.content_type
+        codec = self.codecs.get(content_type)
+        if codec is None:
+            # Consumers accept every known encoding, not only the ones configured for publishing
+            codec = self._build(content_type)
+            self.register(codec)
+
+        schema_version = int((headers or {}).get(SCHEMA_VERSION_HEADER, 1))
+        return schema_version, codec.decode(body)
+
+    @staticmethod
+    def _build(content_type: str) -> EventCodec:
+        if content_type == MsgpackCodec.content_type:
+            return MsgpackCodec()
+        raise ValueError(f"Unsupported event content type: {content_type}")
+
+
+def message_timestamp(payload: Mapping[str, Any]) -> Optional[datetime]:
+    created_at = payload.get("created_at")
+    return _utc(created_at) if isinstance(created_at, datetime) else None
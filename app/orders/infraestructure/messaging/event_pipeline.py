@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from .rabbitmq_publisher import RabbitMQPublisher
+from ....shared.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+Envelope = Tuple[str, Dict[str, Any]]
+
+DROPPED_EVENTS = Counter("event_pipeline_dropped_events_total", "Queued events never published, because the service stopped first")
+
+class EventPipeline:
+    """Bounded queue of outgoing events flushed to RabbitMQ in micro-batches.
+
+    Callers return as soon as their event is queued. A single flusher groups queued
+    events until the batch is full or the flush interval has passed, and publishes
+    each group on one channel with one confirm round trip. When the queue is full,
+    submit() waits for room, which slows producers down to the broker's pace.
+
+    A batch that fails to publish (no spill buffer, or the spill buffer is full) is
+    retried with exponential backoff ahead of everything queued after it, so events
+    are not lost while the service runs; only those left at shutdown are dropped.
+    """
+
+    def __init__(self, publisher: RabbitMQPublisher, max_queue_size: int = 10000, max_batch_size: int = 100, flush_interval_seconds: float = 0.01, retry_initial_seconds: float = 0.1, retry_max_seconds: float = 5.0):
+        self.publisher = publisher
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_batch_size = max_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.queue: "asyncio.Queue[Envelope]" = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, routing_key: str, message: Dict[str, Any]) -> None:
+        if self._closing:
+            raise RuntimeError("Event pipeline is shutting down")
+        await self.queue.put((routing_key, message))
+
+    async def submit_many(self, messages: List[Envelope]) -> None:
+        for routing_key, message in messages:
+            await self.submit(routing_key, message)
+
+    async def close(self, timeout_seconds: float) -> None:
+        """Stop accepting events and wait for the queued ones to be published"""
+
+        self._closing = True
+        if self._task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Event pipeline drain timed out; {self.queue.qsize()} queued events were not published")
+            DROPPED_EVENTS.inc(self.queue.qsize())
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval_seconds
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._closing:
+                    break
+                await asyncio.sleep(remaining)
+
+            await self._flush(batch)
+
+    @traced()
+    async def _flush(self, batch: List[Envelope]) -> None:
+        delay = self.retry_initial_seconds
+        try:
+            while True:
+                try:
+                    await self.publisher.publish_batch(batch)
+                    return
+                except Exception as e:
+                    logger.error(f"Failed to publish a batch of {len(batch)} events, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max_seconds)
+        except asyncio.CancelledError:
+            DROPPED_EVENTS.inc(len(batch))
+            raise
+        finally:
+            for _ in batch:
+                self.queue.task_done()
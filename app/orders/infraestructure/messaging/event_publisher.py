@@ -1,21 +1,44 @@
-from typing import Union
+import logging
+from typing import List, Optional, Union
 from .rabbitmq_publisher import RabbitMQPublisher
+from .event_pipeline import EventPipeline
 from ...application.events.order_created_event import OrderCreatedEvent
+from ....shared.tracing import traced, with_trace_context
+
+logger = logging.getLogger(__name__)
 
 class EventPublisher:
     
-    def __init__(self, rabbitmq_publisher: RabbitMQPublisher):
+    def __init__(self, rabbitmq_publisher: RabbitMQPublisher, pipeline: Optional[EventPipeline] = None):
         self.rabbitmq_publisher = rabbitmq_publisher
+        self.pipeline = pipeline
         
+    @traced()
     async def publish(self, event: Union[OrderCreatedEvent]):
         try: 
-            event_dict = event.model_dump()
-            routing_key = event.event_type.replace('.', '.')
+            # Queued events are published from another task, so they carry the trace with them
+            event_dict = with_trace_context(event.model_dump())
+            routing_key = event.event_type
+            
+            # While the pipeline runs, events are queued and confirmed in batches in the background
+            if self.pipeline and self.pipeline.running:
+                await self.pipeline.submit(routing_key, event_dict)
+                return
             
-            self.rabbitmq_publisher.publish_message(
+            await self.rabbitmq_publisher.publish_message(
                 routing_key=routing_key,
                 message=event_dict
             )
         except Exception as e:
-            print(f"Failed to publish event {event.event_type}: {e}")
-            raise
\ No newline at end of file
+            logger.error(f"Failed to publish event {event.event_type}: {e}")
+            raise
+            
+    @traced()
+    async def publish_many(self, events: List[Union[OrderCreatedEvent]]):
+        messages = [(event.event_type, with_trace_context(event.model_dump())) for event in events]
+        
+        if self.pipeline and self.pipeline.running:
+            await self.pipeline.submit_many(messages)
+            return
+        
+        await self.rabbitmq_publisher.publish_batch(messages)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import uuid
+
+from ..repositories.order_outbox import OrderOutbox
+from .rabbitmq_publisher import RabbitMQPublisher
+from ....shared.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class OutboxRelay:
+    """Publishes pending outbox entries to RabbitMQ in creation order.
+
+    Entries are marked sent only after the broker confirms the whole batch, so a crash
+    or broker outage leads to a redelivery rather than a lost event. Consumers can
+    deduplicate on the event_id carried in every payload.
+    """
+
+    def __init__(self, outbox: OrderOutbox, publisher: RabbitMQPublisher, batch_size: int = 100, poll_interval_seconds: float = 0.5, lease_seconds: float = 30.0):
+        self.outbox = outbox
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+
+    async def relay_once(self) -> int:
+        """Publish one batch of pending entries; returns how many were sent"""
+
+        entries = await self.outbox.pending(self.batch_size)
+        if not entries:
+            return 0
+
+        with tracer.span("OutboxRelay.relay_once", attributes={"messaging.batch_size": len(entries)}):
+            # Never spill: the outbox already holds these durably and must see the failure to retry them in order
+            await self.publisher.publish_batch(
+                [(entry["routing_key"], entry["payload"]) for entry in entries], allow_spill=False
+            )
+            await self.outbox.mark_sent([entry["_id"] for entry in entries])
+        return len(entries)
+
+    async def run(self) -> None:
+        while True:
+            relayed = 0
+            try:
+                if await self.outbox.acquire_lease(self.owner, self.lease_seconds):
+                    relayed = await self.relay_once()
+            except Exception as e:
+                logger.error(f"Outbox relay failed, retrying: {e}")
+
+            # A full batch means there is probably more waiting, so drain without sleeping
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval_seconds)
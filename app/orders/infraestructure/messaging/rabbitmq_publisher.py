@@ -1,100 +1,144 @@
-import json 
-import pika 
-from typing import Dict, Any 
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import aio_pika
+from aio_pika.abc import AbstractChannel
+from prometheus_client import Counter, Histogram
+
 from ....config.settings import settings
+from .broker_supervisor import BrokerSupervisor, BrokerUnavailableError
+from .spill_buffer import SpillBuffer
+from .codecs import CodecRegistry, message_timestamp
+from ....shared.tracing import TRACEPARENT_FIELD, TRACEPARENT_HEADER, traced, tracer
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_DURATION = Histogram(
+    "rabbitmq_publish_duration_seconds", 
+    "Time to publish a batch of events and receive every broker confirm", 
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+PUBLISHED_MESSAGES = Counter("rabbitmq_published_messages_total", "Events confirmed by the broker", ["routing_key"])
+PUBLISH_FAILURES = Counter("rabbitmq_publish_failures_total", "Events whose publish failed", ["routing_key"])
+SPILLED_MESSAGES = Counter("rabbitmq_spilled_messages_total", "Events written to the spill buffer because the broker could not take them")
 
 class RabbitMQPublisher:
-    
-    def __init__(self):
-        self.connection = None 
-        self.channel = None 
-        self._connect()
-        
-    def _connect(self):
-        
-        try: 
-            
-            credentials = pika.PlainCredentials(
-                settings.rabbitmq_username, 
-                settings.rabbitmq_password
-            )
-            
-            parameters = pika.ConnectionParameters(
-                host=settings.rabbitmq_host, 
-                port=settings.rabbitmq_port, 
-                virtual_host=settings.rabbitmq_vhost, 
-                credentials=credentials
-            )
-
-            self.connection = pika.BlockingConnection(parameters)
-            self.channel = self.connection.channel()
-
-            self.channel.exchange_declare(exchange=settings.orders_exchange, exchange_type='topic', durable=True)
-            
-            # Declare queues
-            self.channel.queue_declare(queue=settings.payment_queue, durable=True)
-            self.channel.queue_declare(queue=settings.notification_queue, durable=True)
-            
-            self.channel.queue_bind(
-                exchange=settings.orders_exchange, 
-                queue=settings.payment_queue,
-                routing_key='order.created'
-            )
-             
-            self.channel.queue_bind(
-                exchange=settings.orders_exchange, 
-                queue=settings.notification_queue,
-                routing_key='order.*'
-            )
+    """Asyncio publisher on the supervisor's pool of confirm-mode channels.
+
+    Every publish awaits its broker confirm without blocking the event loop, and the
+    number of unconfirmed publishes is capped so a slow broker applies backpressure
+    to callers instead of piling up work. When the broker is unavailable, events are
+    spilled to the local buffer (if configured) and replayed on reconnect.
+    """
+
+    def __init__(self, supervisor: BrokerSupervisor, spill_buffer: Optional[SpillBuffer] = None, codecs: Optional[CodecRegistry] = None):
+        self.supervisor = supervisor
+        self.spill_buffer = spill_buffer
+        self.codecs = codecs or CodecRegistry()
+        self._in_flight = asyncio.Semaphore(settings.rabbitmq_max_in_flight)
+        self._replay_task: Optional[asyncio.Task] = None
 
+        if spill_buffer:
+            supervisor.on_connected.append(self._replay_spilled)
+
+    async def publish_message(self, routing_key: str, message: Dict[str, Any], allow_spill: bool = True):
+        await self.publish_batch([(routing_key, message)], allow_spill=allow_spill)
+
+    @traced()
+    async def publish_batch(self, messages: List[Tuple[str, Dict[str, Any]]], allow_spill: bool = True):
+        """Publish and await every confirm. With `allow_spill`, events the broker cannot take are
+        written to the spill buffer instead of raising; callers with their own durable store
+        (the outbox relay) pass False so they keep ownership of redelivery"""
+
+        if not messages:
+            return
+
+        try:
+            await self._send(messages)
         except Exception as e:
-            print(f"Failed to connect to RabbitMQ: {e}")
-            raise 
-
-    def publish_message(self, routing_key: str, message: Dict[str, Any]):
-        
-        try: 
-            
-            if not self.connection or self.connection.is_closed:
-                self._connect()
-
-            message_body = json.dumps(message, default=str)
-                
-            self.channel.basic_publish(
-                exchange=settings.orders_exchange,
-                routing_key=routing_key, 
-                body=message_body, 
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                    content_type='application/json', 
-                    timestamp=int(message.get('created_at', 0))
+            if not (allow_spill and self.spill_buffer):
+                raise
+
+            await self.spill_buffer.append(messages)
+            SPILLED_MESSAGES.inc(len(messages))
+            logger.warning(f"Spilled {len(messages)} events to {self.spill_buffer.path}: {e}")
+
+    async def _send(self, messages: List[Tuple[str, Dict[str, Any]]], wait_ready: bool = True):
+
+        breaker = self.supervisor.breaker
+        probing = breaker.state == "half_open"
+        started = time.perf_counter()
+        try:
+            # All publishes go out on one channel back to back and their confirms are
+            # awaited together, so the batch costs roughly one confirm round trip
+            async with self.supervisor.channel(wait_ready=wait_ready) as channel:
+                await asyncio.gather(*(
+                    self._publish(channel, routing_key, message) for routing_key, message in messages
+                ))
+        except BrokerUnavailableError:
+            # Rejected before reaching the broker, so it says nothing about the broker's health;
+            # counting it would keep pushing an open breaker's reset window out
+            for routing_key, _ in messages:
+                PUBLISH_FAILURES.labels(routing_key).inc()
+            raise
+        except Exception:
+            breaker.record_failure()
+            for routing_key, _ in messages:
+                PUBLISH_FAILURES.labels(routing_key).inc()
+            raise
+
+        PUBLISH_DURATION.observe(time.perf_counter() - started)
+        breaker.record_success()
+        for routing_key, _ in messages:
+            PUBLISHED_MESSAGES.labels(routing_key).inc()
+
+        # The breaker recovered without a reconnect, so on_connected will not replay what was spilled meanwhile
+        if probing and self.spill_buffer and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = asyncio.create_task(self._replay_spilled())
+
+    async def _publish(self, channel: AbstractChannel, routing_key: str, message: Dict[str, Any]):
+
+        # Queued messages carry the context of the request that produced them; it goes in the headers, not the body
+        traceparent = message.get(TRACEPARENT_FIELD)
+        if traceparent is not None:
+            message = {key: value for key, value in message.items() if key != TRACEPARENT_FIELD}
+
+        codec = self.codecs.for_routing_key(routing_key)
+        body = codec.encode(message)
+        headers = self.codecs.headers_for(routing_key)
+
+        # Published from the request itself, the current span is the closer parent; from a queue, the stored one is
+        current = tracer.current_span()
+        parent = None if current is not None and traceparent is not None and traceparent[3:35] == current.context.trace_id else traceparent
+
+        attributes = {"messaging.system": "rabbitmq", "messaging.destination": settings.orders_exchange, "messaging.rabbitmq.routing_key": routing_key}
+        with tracer.span(f"{routing_key} publish", kind="producer", attributes=attributes, parent=parent) as span:
+            # Consumers continue the trace from the producer span
+            if span is not None:
+                headers[TRACEPARENT_HEADER] = span.context.traceparent
+            elif traceparent is not None:
+                headers[TRACEPARENT_HEADER] = traceparent
+
+            async with self._in_flight:
+                exchange = await channel.get_exchange(settings.orders_exchange, ensure=False)
+                await exchange.publish(
+                    aio_pika.Message(
+                        body=body,
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        content_type=codec.content_type,
+                        headers=headers,
+                        timestamp=message_timestamp(message)
+                    ),
+                    routing_key=routing_key,
+                    timeout=settings.rabbitmq_publish_timeout_seconds
                 )
-            )    
-            
-            print(f"Message published to {routing_key}: {message}")   
-    
-        except Exception as e: 
-            print(f"Failed to publish message: {e}")
-            
-            try: 
-                self._connect()
-                self.channel.basic_publish(
-                    exchange=settings.orders_exchange,
-                    routing_key=routing_key, 
-                    body=message_body, 
-                    properties=pika.BasicProperties(
-                        delivery_mode=2,
-                        content_type='application/json', 
-                        timestamp=int(message.get('created_at', 0))
-                    )
-                )    
-
-                print(f"Message published to {routing_key}: {message}")   
-            
-            except Exception as retry_error: 
-                print(f"Retry failed: {retry_error}")
-            
-            
-    def close(self):
-        if self.connection and not self.connection.is_closed:
-            self.connection.close()
\ No newline at end of file
+
+    async def _replay_spilled(self):
+        replayed = await self.spill_buffer.replay(
+            lambda messages: self._send(messages, wait_ready=False),
+            batch_size=settings.event_pipeline_max_batch_size
+        )
+        if replayed:
+            logger.info(f"Replayed {replayed} spilled events")
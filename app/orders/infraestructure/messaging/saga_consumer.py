@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import Awaitable, List, Optional, Sequence, Tuple
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue
+
+from ...application.use_cases.apply_saga_events_use_case import ApplySagaEventsUseCase
+from .broker_supervisor import BrokerSupervisor
+from .codecs import CodecRegistry
+
+logger = logging.getLogger(__name__)
+
+Delivery = Tuple[AbstractIncomingMessage, str]
+
+class SagaEventConsumer:
+    """Consumes payment and delivery outcomes and applies them as order status transitions.
+
+    Deliveries are spread over `workers` by order id, so events for one order are
+    handled in arrival order while different orders proceed in parallel. Each worker
+    groups what it has received (up to `batch_size`, waiting at most `batch_wait_seconds`)
+    into a single batched status write, and acks only once that write has returned.
+    Prefetch bounds how many unacked deliveries the broker hands us at once.
+    """
+
+    def __init__(self, supervisor: BrokerSupervisor, codecs: CodecRegistry, use_case: ApplySagaEventsUseCase, queue_name: str, exchange_name: str, routing_keys: Sequence[str], prefetch: int = 256, batch_size: int = 100, batch_wait_seconds: float = 0.05, workers: int = 4):
+        self.supervisor = supervisor
+        self.codecs = codecs
+        self.use_case = use_case
+        self.queue_name = queue_name
+        self.exchange_name = exchange_name
+        self.routing_keys = list(routing_keys)
+        self.prefetch = prefetch
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        self._inboxes: List["asyncio.Queue[Delivery]"] = [asyncio.Queue() for _ in range(workers)]
+        self._workers: List[asyncio.Task] = []
+        self._channel: Optional[AbstractChannel] = None
+        self._queue: Optional[AbstractQueue] = None
+        self._consumer_tag: Optional[str] = None
+        self._declared = False
+
+        # Consumers live on the connection, so they are set up again after every reconnect
+        supervisor.on_connected.append(self._subscribe)
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work(inbox)) for inbox in self._inboxes]
+
+    async def close(self, timeout_seconds: float) -> None:
+        """Stop taking deliveries and finish the batches already received"""
+
+        try:
+            if self._queue and self._consumer_tag:
+                await self._queue.cancel(self._consumer_tag)
+        except Exception as e:
+            logger.debug(f"Could not cancel the saga consumer: {e}")
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*(inbox.join() for inbox in self._inboxes)), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Saga consumer did not drain in time; unacked deliveries will be redelivered")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._channel and not self._channel.is_closed:
+            await self._channel.close()
+
+    async def _subscribe(self) -> None:
+        self._channel = await self.supervisor.connection.channel()
+        await self._channel.set_qos(prefetch_count=self.prefetch)
+
+        if self._declared:
+            self._queue = await self._channel.get_queue(self.queue_name, ensure=False)
+        else:
+            exchange = await self._channel.declare_exchange(self.exchange_name, aio_pika.ExchangeType.TOPIC, durable=True)
+            self._queue = await self._channel.declare_queue(self.queue_name, durable=True)
+            for routing_key in self.routing_keys:
+                await self._queue.bind(exchange, routing_key=routing_key)
+            self._declared = True
+
+        self._consumer_tag = await self._queue.consume(self._on_message)
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        try:
+            _, payload = self.codecs.decode(message.body, message.content_type, message.headers)
+            order_id = str(payload["order_id"])
+        except Exception as e:
+            # Redelivering it would fail the same way; reject so a dead-letter queue can keep it
+            logger.error(f"Rejecting undecodable {message.routing_key} message: {e}")
+            await self._settle(message.reject(requeue=False))
+            return
+
+        self._inboxes[hash(order_id) % len(self._inboxes)].put_nowait((message, order_id))
+
+    async def _work(self, inbox: "asyncio.Queue[Delivery]") -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await inbox.get()]
+            deadline = loop.time() + self.batch_wait_seconds
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(inbox.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+
+            try:
+                await self._process(batch)
+            finally:
+                for _ in batch:
+                    inbox.task_done()
+
+    async def _process(self, batch: List[Delivery]) -> None:
+        try:
+            results = await self.use_case.execute([(message.routing_key, order_id) for message, order_id in batch])
+        except Exception as e:
+            logger.error(f"Failed to apply {len(batch)} saga events, requeueing them: {e}")
+            for message, _ in batch:
+                await self._settle(message.nack(requeue=True))
+            return
+
+        for (message, order_id), result in zip(batch, results):
+            if result.success:
+                await self._settle(message.ack())
+            elif result.retryable:
+                await self._settle(message.nack(requeue=True))
+            else:
+                # Not found, unknown event or a transition the order has moved past (e.g. a redelivered
+                # payment.completed for an order already confirmed): retrying cannot change the outcome
+                logger.warning(f"Ignoring {message.routing_key} for order {order_id}: {result.error}")
+                await self._settle(message.ack())
+
+    @staticmethod
+    async def _settle(settlement: Awaitable) -> None:
+        try:
+            await settlement
+        except Exception as e:
+            # The channel is gone; the broker redelivers anything we could not ack
+            logger.debug(f"Could not settle saga message: {e}")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+Envelope = Tuple[str, Dict[str, Any]]
+
+# Datetimes are written tagged, as in MongoDB Extended JSON, so replay gives back the same
+# datetimes the publisher would have had; a plain string would lose the AMQP timestamp
+DATE_TAG = "$date"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {DATE_TAG: value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and DATE_TAG in obj:
+        return datetime.fromisoformat(obj[DATE_TAG])
+    return obj
+
+class SpillBufferFull(Exception):
+    """Raised when spilling would grow the buffer file past its size limit"""
+
+
+class SpillBuffer:
+    """Append-only JSON Lines file holding events that could not reach the broker.
+
+    File I/O runs in a worker thread so the event loop is never blocked on disk.
+    replay() publishes the file in order and truncates it once everything is confirmed;
+    if a replay fails part way, only the unpublished tail is kept.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = asyncio.Lock()
+
+    async def append(self, messages: List[Envelope]) -> None:
+        lines = "".join(
+            json.dumps({"routing_key": routing_key, "message": message}, default=_encode_value) + "\n"
+            for routing_key, message in messages
+        )
+        async with self._lock:
+            await asyncio.to_thread(self._append, lines)
+
+    async def size(self) -> int:
+        return await asyncio.to_thread(self._size)
+
+    async def replay(self, publish_batch: Callable[[List[Envelope]], Awaitable[None]], batch_size: int = 100) -> int:
+        """Publish every spilled event in order; returns how many were published"""
+
+        async with self._lock:
+            lines = await asyncio.to_thread(self._read_lines)
+            published = 0
+
+            try:
+                for start in range(0, len(lines), batch_size):
+                    entries = [json.loads(line, object_hook=_decode_object) for line in lines[start:start + batch_size]]
+                    await publish_batch([(entry["routing_key"], entry["message"]) for entry in entries])
+                    published = start + len(entries)
+            finally:
+                if published:
+                    await asyncio.to_thread(self._rewrite, lines[published:])
+
+            return published
+
+    def _append(self, lines: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self._size() + len(lines.encode()) > self.max_bytes:
+            raise SpillBufferFull(f"Spill buffer {self.path} is full ({self.max_bytes} bytes)")
+
+        with open(self.path, "a", encoding="utf-8") as spill_file:
+            spill_file.write(lines)
+            spill_file.flush()
+            os.fsync(spill_file.fileno())
+
+    def _size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def _read_lines(self) -> List[str]:
+        try:
+            with open(self.path, encoding="utf-8") as spill_file:
+                return [line for line in spill_file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _rewrite(self, lines: List[str]) -> None:
+        if not lines:
+            os.remove(self.path)
+            return
+
+        # Write the remaining tail next to the file and swap it in atomically
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as spill_file:
+            spill_file.writelines(lines)
+            spill_file.flush()
+            os.fsync(spill_file.fileno())
+        os.replace(temporary_path, self.path)
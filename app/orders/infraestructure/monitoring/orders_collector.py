@@ -0,0 +1,78 @@
+from typing import Callable, Iterator, Optional
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from ..cache.order_cache import OrderCache
+from ..messaging.event_pipeline import EventPipeline
+from ..streaming.order_status_hub import OrderStatusHub
+from ....shared.admission_control import AdmissionController
+
+
+class OrdersCollector(Collector):
+    """Exports the counters the service already keeps in-process (admission control, order
+    cache, live streams, event pipeline), read at scrape time. Each source is a provider
+    so nothing is built before it is used; a None provider is skipped"""
+
+    def __init__(
+        self,
+        admission: Optional[Callable[[], AdmissionController]] = None,
+        order_cache: Optional[Callable[[], OrderCache]] = None,
+        status_hub: Optional[Callable[[], OrderStatusHub]] = None,
+        event_pipeline: Optional[Callable[[], EventPipeline]] = None
+    ):
+        self.admission = admission
+        self.order_cache = order_cache
+        self.status_hub = status_hub
+        self.event_pipeline = event_pipeline
+
+    def describe(self) -> Iterator[Metric]:
+        # Without this the registry would collect on registration, building the sources at import time
+        return iter(())
+
+    def collect(self) -> Iterator[Metric]:
+        if self.admission:
+            yield from self._admission(self.admission().stats())
+        if self.order_cache:
+            yield from self._order_cache(self.order_cache().stats())
+        if self.status_hub:
+            yield from self._status_hub(self.status_hub().stats())
+        if self.event_pipeline:
+            yield GaugeMetricFamily("event_pipeline_queue_depth", "Events waiting to be published", value=self.event_pipeline().queue.qsize())
+
+    @staticmethod
+    def _admission(stats) -> Iterator[Metric]:
+        active = GaugeMetricFamily("admission_active_requests", "Requests admitted and running", labels=["route_class"])
+        queued = GaugeMetricFamily("admission_queue_depth", "Requests waiting to be admitted", labels=["route_class"])
+        admitted = CounterMetricFamily("admission_admitted_requests", "Requests admitted", labels=["route_class"])
+        shed = CounterMetricFamily("admission_shed_requests", "Requests answered 503 instead of admitted", labels=["route_class", "reason"])
+
+        for route_class, class_stats in stats["classes"].items():
+            active.add_metric([route_class], class_stats["active"])
+            queued.add_metric([route_class], class_stats["queued"])
+            admitted.add_metric([route_class], class_stats["admitted"])
+            for reason, count in class_stats["shed"].items():
+                shed.add_metric([route_class, reason], count)
+
+        return [active, queued, admitted, shed]
+
+    @staticmethod
+    def _order_cache(stats) -> Iterator[Metric]:
+        hits = CounterMetricFamily("order_cache_hits", "Order lookups served from the cache", labels=["tier"])
+        hits.add_metric(["local"], stats["local_hits"])
+        hits.add_metric(["shared"], stats["shared_hits"])
+
+        return [
+            hits,
+            CounterMetricFamily("order_cache_misses", "Order lookups that went to the repository", value=stats["misses"]),
+            CounterMetricFamily("order_cache_invalidations", "Orders evicted from the cache by a write", value=stats["invalidations"]),
+            GaugeMetricFamily("order_cache_local_entries", "Orders held in the in-process cache", value=stats["local_size"]),
+        ]
+
+    @staticmethod
+    def _status_hub(stats) -> Iterator[Metric]:
+        return [
+            GaugeMetricFamily("order_stream_subscribers", "Open live order streams", value=stats["subscribers"]),
+            CounterMetricFamily("order_stream_status_changes", "Status changes published to live streams", value=stats["last_sequence"]),
+            CounterMetricFamily("order_stream_dropped_subscribers", "Streams disconnected for falling too far behind", value=stats["dropped"]),
+        ]
@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional, Sequence, Union
+
+from ...domain.entities.order import Order
+from ...domain.entities.enums import OrderStatus
+from ...domain.entities.bulk_result import BulkItemResult, StatusChange
+from ...domain.entities.outbox_message import OutboxMessage
+from ...domain.entities.order_summary import OrderSummary
+from ...domain.entities.order_version import OrderVersion
+from ...domain.repositories.order_repository import OrderRepository
+from ....shared.pagination import PageCursor
+from ..cache.order_cache import OrderCache
+
+class CachedOrderRepository(OrderRepository):
+    """Read-through cache for get_by_id in front of another repository.
+
+    Every write that can change an order invalidates its entry, including failed
+    conditional writes, since a conflict means our cached copy may be stale.
+    """
+
+    def __init__(self, repository: OrderRepository, cache: OrderCache):
+        self.repository = repository
+        self.cache = cache
+        # Reads in flight per order; an invalidation during the read stops it from
+        # filling the cache with the value it fetched
+        self._fills: Dict[str, object] = {}
+
+    async def create(self, order: Order, outbox: Sequence[OutboxMessage] = ()) -> Order:
+        return await self.repository.create(order, outbox)
+
+    async def create_many(self, orders: List[Order], outbox: Sequence[OutboxMessage] = ()) -> List[BulkItemResult]:
+        return await self.repository.create_many(orders, outbox)
+
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        order = await self.cache.get(order_id)
+        if order is not None:
+            return order
+
+        token = object()
+        self._fills[order_id] = token
+        try:
+            order = await self.repository.get_by_id(order_id)
+            if order is not None and self._fills.get(order_id) is token:
+                await self.cache.set(order)
+        finally:
+            if self._fills.get(order_id) is token:
+                del self._fills[order_id]
+
+        return order
+
+    async def get_many_by_ids(self, order_ids: Sequence[str]) -> Dict[str, Order]:
+        order_ids = list(dict.fromkeys(order_ids))
+        orders = await self.cache.get_many(order_ids)
+
+        missing = [order_id for order_id in order_ids if order_id not in orders]
+        if not missing:
+            return orders
+
+        tokens = {}
+        for order_id in missing:
+            tokens[order_id] = self._fills[order_id] = object()
+        try:
+            loaded = await self.repository.get_many_by_ids(missing)
+            for order_id, token in tokens.items():
+                order = loaded.get(order_id)
+                if order is not None and self._fills.get(order_id) is token:
+                    await self.cache.set(order)
+        finally:
+            for order_id, token in tokens.items():
+                if self._fills.get(order_id) is token:
+                    del self._fills[order_id]
+
+        return {**orders, **loaded}
+
+    async def get_version(self, order_id: str) -> Optional[OrderVersion]:
+        # Answer from the copy get_by_id would serve, so an ETag never runs ahead of the body
+        order = await self.cache.get(order_id)
+        if order is not None:
+            return OrderVersion.of(order)
+        return await self.repository.get_version(order_id)
+
+    async def get_by_user_id(self, user_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self.repository.get_by_user_id(user_id, limit, skip, after, fields)
+
+    async def get_by_restaurant_id(self, restaurant_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self.repository.get_by_restaurant_id(restaurant_id, limit, skip, after, fields)
+
+    async def get_by_status(self, status: OrderStatus, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self.repository.get_by_status(status, limit, skip, after, fields)
+
+    async def update_status(self, order_id: str, status: OrderStatus, expected_version: Optional[int] = None) -> Optional[Order]:
+        try:
+            return await self.repository.update_status(order_id, status, expected_version)
+        finally:
+            await self._invalidate(order_id)
+
+    async def update_status_many(self, changes: List[StatusChange]) -> List[BulkItemResult]:
+        try:
+            return await self.repository.update_status_many(changes)
+        finally:
+            for order_id in {change.order_id for change in changes}:
+                await self._invalidate(order_id)
+
+    async def update(self, order: Order) -> Order:
+        try:
+            return await self.repository.update(order)
+        finally:
+            await self._invalidate(order.id)
+
+    async def delete(self, order_id: str) -> bool:
+        try:
+            return await self.repository.delete(order_id)
+        finally:
+            await self._invalidate(order_id)
+
+    async def count_by_user_id(self, user_id: str) -> int:
+        return await self.repository.count_by_user_id(user_id)
+
+    async def count_by_restaurant_id(self, restaurant_id: str) -> int:
+        return await self.repository.count_by_restaurant_id(restaurant_id)
+
+    async def count_by_status(self, status: OrderStatus) -> int:
+        return await self.repository.count_by_status(status)
+
+    async def _invalidate(self, order_id: str) -> None:
+        self._fills.pop(order_id, None)
+        await self.cache.invalidate(order_id)
@@ -0,0 +1,206 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from bson import ObjectId
+
+from ...domain.entities.order import Order
+from ...domain.entities.enums import OrderStatus
+from ...domain.entities.bulk_result import BulkItemResult, StatusChange
+from ...domain.entities.outbox_message import OutboxMessage
+from ...domain.entities.order_summary import OrderSummary
+from ...domain.entities.order_version import OrderVersion
+from ...domain.repositories.order_repository import OrderRepository
+from .order_outbox import require_outbox
+from ....shared.exceptions import ConflictException, NotFoundException
+from ....shared.pagination import PageCursor
+
+SortKey = Tuple[datetime, str]
+
+INDEXED_FIELDS = ("user_id", "restaurant_id", "status")
+DATETIME_FIELDS = ("created_at", "updated_at", "estimated_delivery_time", "delivered_at")
+
+
+def _stored_datetime(value: Optional[datetime]) -> Optional[datetime]:
+    # Mirror BSON dates: UTC with millisecond precision, so cursors behave as they do on Mongo
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+class InMemoryOrderRepository(OrderRepository):
+    """Process-local repository with secondary indexes by user, restaurant and status.
+
+    Each index keeps its order ids sorted by (created_at, id), so listings, keyset
+    pagination and counts follow the same semantics as the Mongo repository without
+    a database. Intended for load-test baselines and ephemeral environments.
+    """
+
+    def __init__(self):
+        self._orders: Dict[str, Order] = {}
+        self._indexes: Dict[str, Dict[Any, List[SortKey]]] = {field: {} for field in INDEXED_FIELDS}
+
+    async def create(self, order: Order, outbox: Sequence[OutboxMessage] = ()) -> Order:
+        # Callers publish directly on this backend
+        require_outbox(None, outbox)
+
+        stored = self._stored(order, id=order.id or str(ObjectId()))
+        self._orders[stored.id] = stored
+        self._index(stored)
+        return stored.model_copy()
+
+    async def create_many(self, orders: List[Order], outbox: Sequence[OutboxMessage] = ()) -> List[BulkItemResult]:
+        require_outbox(None, outbox)
+
+        return [BulkItemResult(index=index, order=await self.create(order)) for index, order in enumerate(orders)]
+
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        order = self._orders.get(order_id)
+        return order.model_copy() if order else None
+
+    async def get_many_by_ids(self, order_ids: Sequence[str]) -> Dict[str, Order]:
+        return {order_id: self._orders[order_id].model_copy() for order_id in order_ids if order_id in self._orders}
+
+    async def get_version(self, order_id: str) -> Optional[OrderVersion]:
+        order = self._orders.get(order_id)
+        return OrderVersion.of(order) if order else None
+
+    async def get_by_user_id(self, user_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return self._list("user_id", user_id, limit, skip, after, fields)
+
+    async def get_by_restaurant_id(self, restaurant_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return self._list("restaurant_id", restaurant_id, limit, skip, after, fields)
+
+    async def get_by_status(self, status: OrderStatus, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return self._list("status", OrderStatus(status), limit, skip, after, fields)
+
+    async def update_status(self, order_id: str, status: OrderStatus, expected_version: Optional[int] = None) -> Optional[Order]:
+        order = self._orders.get(order_id)
+        if not order:
+            return None
+
+        error = self._transition_error(order, status, expected_version)
+        if error:
+            raise ConflictException(error)
+
+        return self._apply_status(order, status, datetime.now(timezone.utc)).model_copy()
+
+    async def update_status_many(self, changes: List[StatusChange]) -> List[BulkItemResult]:
+        now = datetime.now(timezone.utc)
+        seen = set()
+        results = []
+
+        for index, change in enumerate(changes):
+            order = self._orders.get(change.order_id)
+            if not order:
+                results.append(BulkItemResult(index=index, error=f"Order with id {change.order_id} not found"))
+            elif change.order_id in seen:
+                results.append(BulkItemResult(index=index, error=f"Order {change.order_id} appears more than once in the batch"))
+            elif error := self._transition_error(order, change.status, change.expected_version):
+                results.append(BulkItemResult(index=index, error=error))
+            else:
+                results.append(BulkItemResult(index=index, order=self._apply_status(order, change.status, now).model_copy()))
+            seen.add(change.order_id)
+
+        return results
+
+    async def update(self, order: Order) -> Order:
+        current = self._orders.get(order.id)
+        if not current:
+            raise NotFoundException(f"Order with id {order.id} not found")
+
+        if current.version != order.version:
+            raise ConflictException(
+                f"Order {order.id} was modified concurrently (version {current.version}, expected {order.version})"
+            )
+
+        stored = self._stored(order, id=order.id, version=order.version + 1)
+        self._unindex(current)
+        self._orders[stored.id] = stored
+        self._index(stored)
+        return stored.model_copy()
+
+    async def delete(self, order_id: str) -> bool:
+        order = self._orders.pop(order_id, None)
+        if not order:
+            return False
+
+        self._unindex(order)
+        return True
+
+    async def count_by_user_id(self, user_id: str) -> int:
+        return len(self._indexes["user_id"].get(user_id, ()))
+
+    async def count_by_restaurant_id(self, restaurant_id: str) -> int:
+        return len(self._indexes["restaurant_id"].get(restaurant_id, ()))
+
+    async def count_by_status(self, status: OrderStatus) -> int:
+        return len(self._indexes["status"].get(OrderStatus(status), ()))
+
+    def _stored(self, order: Order, **overrides: Any) -> Order:
+        for field in DATETIME_FIELDS:
+            overrides.setdefault(field, _stored_datetime(getattr(order, field)))
+        return order.model_copy(update=overrides)
+
+    def _transition_error(self, order: Order, status: OrderStatus, expected_version: Optional[int]) -> Optional[str]:
+        if expected_version is not None and expected_version != order.version:
+            return f"Order {order.id} was modified concurrently (version {order.version}, expected {expected_version})"
+
+        if not order.status.can_transition_to(status):
+            return f"Order {order.id} is '{order.status.value}' and cannot change to '{status.value}'"
+
+        return None
+
+    def _apply_status(self, order: Order, status: OrderStatus, now: datetime) -> Order:
+        now = _stored_datetime(now)
+        update = {"status": status, "updated_at": now, "version": order.version + 1}
+        if status == OrderStatus.DELIVERED:
+            update["delivered_at"] = now
+
+        updated = order.model_copy(update=update)
+        self._move_in_index("status", order, order.status, status)
+        self._orders[order.id] = updated
+        return updated
+
+    def _index(self, order: Order) -> None:
+        for field in INDEXED_FIELDS:
+            insort(self._indexes[field].setdefault(getattr(order, field), []), (order.created_at, order.id))
+
+    def _unindex(self, order: Order) -> None:
+        for field in INDEXED_FIELDS:
+            self._remove_key(field, getattr(order, field), (order.created_at, order.id))
+
+    def _move_in_index(self, field: str, order: Order, old: Any, new: Any) -> None:
+        if old == new:
+            return
+        self._remove_key(field, old, (order.created_at, order.id))
+        insort(self._indexes[field].setdefault(new, []), (order.created_at, order.id))
+
+    def _remove_key(self, field: str, value: Any, key: SortKey) -> None:
+        keys = self._indexes[field].get(value)
+        if not keys:
+            return
+
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+        if not keys:
+            del self._indexes[field][value]
+
+    def _list(self, field: str, value: Any, limit: int, skip: int, after: Optional[PageCursor], fields: Optional[Sequence[str]]) -> List[Union[Order, OrderSummary]]:
+        keys = self._indexes[field].get(value, [])
+
+        # Keys are ascending; listings are newest first, so walk backwards from `end`
+        if after:
+            end = bisect_left(keys, (_stored_datetime(after.created_at), after.id))
+        else:
+            end = len(keys) - skip
+
+        page = [self._orders[order_id] for _, order_id in reversed(keys[max(end - limit, 0):max(end, 0)])]
+
+        if fields is None:
+            return [order.model_copy() for order in page]
+
+        include = {"id", "created_at", "updated_at", "version", *fields}
+        return [OrderSummary(**order.model_dump(include=include)) for order in page]
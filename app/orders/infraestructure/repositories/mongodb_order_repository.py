@@ -1,112 +1,486 @@
-from typing import List, Optional
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
 from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.write_concern import WriteConcern
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ...domain.entities.order import Order 
 from ...domain.entities.enums import OrderStatus
+from ...domain.entities.bulk_result import BulkItemResult, StatusChange
+from ...domain.entities.order_summary import OrderSummary
+from ...domain.entities.order_version import OrderVersion
+from ...domain.entities.outbox_message import OutboxMessage
 from ...domain.repositories.order_repository import OrderRepository
-from ....shared.exceptions import NotFoundException
+from ....shared.exceptions import ConflictException, NotFoundException
+from ....shared.pagination import PageCursor
+from ....shared.tracing import traced
+from .order_counters import COUNTED_FIELDS, OrderCounters, merge_deltas
+from .order_outbox import OrderOutbox, require_outbox
+
+logger = logging.getLogger(__name__)
+
+# Server error code for "Transaction numbers are only allowed on a replica set member or mongos"
+_TRANSACTIONS_UNSUPPORTED = 20
+
+LISTING_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+# Only the fields the Order entity knows about come back from reads and write results
+ORDER_PROJECTION = {
+    (field.alias or name): 1 for name, field in Order.model_fields.items() if name != "id"
+}
+
+COUNTED_PROJECTION = {field: 1 for field in COUNTED_FIELDS}
+
+VERSION_PROJECTION = {"version": 1, "updated_at": 1}
+
+def _version_filter(version: int) -> Any:
+    # Orders written before versioning have no field; treat them as version 0
+    return {"$in": [0, None]} if version == 0 else version
+
+def _same_instant(stored: Optional[datetime], written: datetime) -> bool:
+    # BSON dates have millisecond precision and come back naive (UTC)
+    if stored is None:
+        return False
+    if stored.tzinfo is None:
+        stored = stored.replace(tzinfo=timezone.utc)
+    return abs((stored - written).total_seconds()) < 0.001
 
 class MongoDBOrderRepository(OrderRepository):
     
-    def __init__(self, database: AsyncIOMotorDatabase):
+    def __init__(self, database: AsyncIOMotorDatabase, write_concern: Optional[WriteConcern] = None, counters: Optional[OrderCounters] = None, outbox: Optional[OrderOutbox] = None, use_transactions: bool = True, trusted_reads: bool = True):
         self.database = database 
         self.collection = database.orders 
+        self.counters = counters 
+        self.outbox = outbox
+        self.write_concern = write_concern
+        self.use_transactions = use_transactions
+        # Documents in this collection were validated before they were written, so by
+        # default they are hydrated as-is; turn off to validate every read again
+        self._to_order = Order.from_document if trusted_reads else Order.model_validate
+        self._to_summary = OrderSummary.from_document if trusted_reads else OrderSummary.model_validate
         
-    async def create(self, order: Order) -> Order:
+        if write_concern is not None:
+            self.collection = self.collection.with_options(write_concern=write_concern)
         
-        order_dict = order.model_dump(by_alias=True, exclude={"id"})
+    @traced()
+    async def create(self, order: Order, outbox: Sequence[OutboxMessage] = ()) -> Order:
+        
+        order_dict = self._new_document(order)
+        
+        async def insert(session):
+            await self.collection.insert_one(order_dict, session=session)
         
-        result = await self.collection.insert_one(order_dict)
+        await self._write_with_outbox(insert, outbox)
         
-        created_order = await self.collection.find_one({"_id": result.inserted_id})
+        # The inserted document is exactly what we sent, so there is no need to read it back
+        order_dict["_id"] = str(order_dict["_id"])
         
-        # Convert ObjectId to string for Pydantic model
-        if created_order and "_id" in created_order:
-            created_order["_id"] = str(created_order["_id"])
+        await self._count(OrderCounters.deltas_for(order_dict))
         
-        return Order(**created_order)
+        return self._to_order(order_dict)
     
+    @traced()
+    async def create_many(self, orders: List[Order], outbox: Sequence[OutboxMessage] = ()) -> List[BulkItemResult]:
+
+        if not orders:
+            return []
+
+        # Ids are assigned client-side, so they are known even for a partially failed batch
+        order_dicts = [self._new_document(order) for order in orders]
+        errors: Dict[int, str] = {}
+        rolled_back = False
+        outbox_written = False
+
+        async def insert(session):
+            await self.collection.insert_many(order_dicts, ordered=False, session=session)
+
+        try:
+            if outbox and self._transactional():
+                # Any write error aborts the transaction, so either every order and
+                # message of the batch is written or none is
+                await self._write_with_outbox(insert, outbox)
+                outbox_written = True
+            else:
+                await insert(None)
+        except BulkWriteError as e:
+            # Still transactional means the transaction ran (no standalone fallback) and was aborted
+            rolled_back = bool(outbox) and self._transactional()
+            for write_error in e.details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error.get("errmsg", "Write failed")
+
+        results = []
+        for index, order_dict in enumerate(order_dicts):
+            if index in errors:
+                results.append(BulkItemResult(index=index, error=errors[index]))
+                continue
+            if rolled_back:
+                results.append(BulkItemResult(index=index, error="Not inserted: another order in the batch failed and the batch was rolled back"))
+                continue
+
+            order_dict["_id"] = str(order_dict["_id"])
+            results.append(BulkItemResult(index=index, order=self._to_order(order_dict)))
+
+        if outbox and not outbox_written and not rolled_back:
+            written = {result.order.id for result in results if result.success}
+            await self._add_to_outbox([message for message in outbox if message.aggregate_id in written])
+
+        await self._count(merge_deltas(
+            OrderCounters.deltas_for(order_dicts[result.index]) for result in results if result.success
+        ))
+
+        return results
+    
+    @traced()
     async def get_by_id(self, order_id: str) -> Optional[Order]:
         
         try: 
             object_id = ObjectId(order_id)
-            order_doc = await self.collection.find_one({"_id": object_id})
+            order_doc = await self.collection.find_one({"_id": object_id}, ORDER_PROJECTION)
             
             if order_doc:
-                # Convert ObjectId to string for Pydantic model
-                order_doc["_id"] = str(order_doc["_id"])
-                return Order(**order_doc)
+                return self._to_order(order_doc)
             return None 
         except Exception:
             return None
 
-    async def get_by_user_id(self, user_id, limit = 10, skip = 0):
-        return await super().get_by_user_id(user_id, limit, skip)  
+    @traced()
+    async def get_many_by_ids(self, order_ids: Sequence[str]) -> Dict[str, Order]:
+
+        object_ids = list({ObjectId(order_id) for order_id in order_ids if ObjectId.is_valid(order_id)})
+        if not object_ids:
+            return {}
+
+        cursor = self.collection.find({"_id": {"$in": object_ids}}, ORDER_PROJECTION, batch_size=len(object_ids))
+
+        orders = {}
+        async for order_doc in cursor:
+            order = self._to_order(order_doc)
+            orders[order.id] = order
+        return orders
+
+    @traced()
+    async def get_version(self, order_id: str) -> Optional[OrderVersion]:
+
+        if not ObjectId.is_valid(order_id):
+            return None
+
+        order_doc = await self.collection.find_one({"_id": ObjectId(order_id)}, VERSION_PROJECTION)
+        if not order_doc:
+            return None
+
+        return OrderVersion(id=order_id, version=order_doc.get("version") or 0, updated_at=order_doc["updated_at"])
+
+    @traced()
+    async def get_by_user_id(self, user_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self._list({"user_id": user_id}, limit, skip, after, fields)
     
-    async def update_status(self, order_id: str, status: OrderStatus) -> bool:
+    @traced()
+    async def update_status(self, order_id: str, status: OrderStatus, expected_version: Optional[int] = None) -> Optional[Order]:
 
-        try: 
-            
-            object_id = ObjectId(order_id)
-            order = await self.collection.find_one({"_id": object_id})
+        if not ObjectId.is_valid(order_id):
+            return None
 
-            update_data = {
-                "status": status, 
-                "updated_at" : order.updated_at
-            }
+        object_id = ObjectId(order_id)
+        now = datetime.now(timezone.utc)
+        update_data = {
+            "status": status, 
+            "updated_at" : now
+        }
 
-            if status == OrderStatus.DELIVERED:
-                from datetime import datetime, timezone
-                update_data["delivered_at"] = datetime.now(timezone.utc)
+        if status == OrderStatus.DELIVERED:
+            update_data["delivered_at"] = now
 
-            result = await self.collection.update_one(
-                {"_id": object_id}, 
-                {"$set": update_data}
-            )
+        # The state machine and the optimistic version check are enforced by the filter,
+        # so the transition is a single conditional write with no read beforehand
+        query = {"_id": object_id, "status": {"$in": OrderStatus.allowed_sources(status)}}
+        if expected_version is not None:
+            query["version"] = _version_filter(expected_version)
 
-            return result.modified_count > 0
-            
-        except Exception: 
-            return False 
+        # The pre-image tells us which status counter to decrement; the post-image is
+        # the pre-image plus the fields we just set
+        previous = await self.collection.find_one_and_update(
+            query, 
+            {"$set": update_data, "$inc": {"version": 1}}, 
+            projection=ORDER_PROJECTION, 
+            return_document=ReturnDocument.BEFORE
+        )
+
+        if not previous:
+            await self._raise_conflict(object_id, status, expected_version)
+            return None
+
+        order_doc = {**previous, **update_data, "_id": order_id, "version": previous.get("version", 0) + 1}
+        await self._count(OrderCounters.change_deltas(previous, order_doc))
+
+        return self._to_order(order_doc)
+
+    @traced()
+    async def update_status_many(self, changes: List[StatusChange]) -> List[BulkItemResult]:
+
+        results: Dict[int, BulkItemResult] = {}
+        object_ids = {}
+        for index, change in enumerate(changes):
+            if not ObjectId.is_valid(change.order_id):
+                results[index] = BulkItemResult(index=index, error=f"Order with id {change.order_id} not found")
+            elif change.order_id in object_ids:
+                results[index] = BulkItemResult(index=index, error=f"Order {change.order_id} appears more than once in the batch")
+            else:
+                object_ids[change.order_id] = ObjectId(change.order_id)
+
+        # One read for the current state of every order, so each write can be conditioned
+        # on the exact status and version it is transitioning from
+        current_docs = {}
+        if object_ids:
+            cursor = self.collection.find({"_id": {"$in": list(object_ids.values())}}, ORDER_PROJECTION)
+            async for order_doc in cursor:
+                current_docs[str(order_doc["_id"])] = order_doc
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        planned = {}
+        for index, change in enumerate(changes):
+            if index in results:
+                continue
+
+            order_doc = current_docs.get(change.order_id)
+            if not order_doc:
+                results[index] = BulkItemResult(index=index, error=f"Order with id {change.order_id} not found")
+                continue
+
+            current_status = OrderStatus(order_doc["status"])
+            current_version = order_doc.get("version", 0)
+
+            if change.expected_version is not None and change.expected_version != current_version:
+                results[index] = BulkItemResult(
+                    index=index, 
+                    error=f"Order {change.order_id} was modified concurrently (version {current_version}, expected {change.expected_version})"
+                )
+                continue
+
+            if not current_status.can_transition_to(change.status):
+                results[index] = BulkItemResult(
+                    index=index, 
+                    error=f"Order {change.order_id} is '{current_status.value}' and cannot change to '{change.status.value}'"
+                )
+                continue
+
+            update_data = {"status": change.status, "updated_at": now}
+            if change.status == OrderStatus.DELIVERED:
+                update_data["delivered_at"] = now
+
+            operations.append(UpdateOne(
+                {"_id": order_doc["_id"], "status": current_status, "version": _version_filter(current_version)}, 
+                {"$set": update_data, "$inc": {"version": 1}}
+            ))
+            planned[index] = {**order_doc, **update_data, "version": current_version + 1}
+
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
 
+            applied = set(planned)
+            if result.matched_count < len(operations):
+                applied = await self._applied_transitions(planned)
+
+            await self._count(merge_deltas(
+                OrderCounters.change_deltas(current_docs[changes[index].order_id], planned[index]) for index in applied
+            ))
+
+            for index, order_doc in planned.items():
+                if index in applied:
+                    results[index] = BulkItemResult(index=index, order=self._to_order(order_doc))
+                else:
+                    results[index] = BulkItemResult(
+                        index=index, 
+                        error=f"Order {changes[index].order_id} was modified concurrently", 
+                        retryable=True
+                    )
+
+        return [results[index] for index in range(len(changes))]
+
+    async def _applied_transitions(self, planned: Dict[int, Dict[str, Any]]) -> set:
+        """Work out which conditional updates of a partially matched bulk_write took effect"""
+
+        stored = {}
+        cursor = self.collection.find(
+            {"_id": {"$in": [order_doc["_id"] for order_doc in planned.values()]}}, 
+            {"version": 1, "updated_at": 1}
+        )
+        async for order_doc in cursor:
+            stored[order_doc["_id"]] = order_doc
+
+        applied = set()
+        for index, order_doc in planned.items():
+            current = stored.get(order_doc["_id"])
+            if current and current.get("version") == order_doc["version"] and _same_instant(current.get("updated_at"), order_doc["updated_at"]):
+                applied.add(index)
+
+        return applied
+
+    @traced()
     async def update(self, order: Order) -> Order:
 
-        try: 
-            object_id = ObjectId(order.id)
-            order_dict = order.model_dump(by_alias=True, exclude={"id"})
-            
-            result = await self.collection.update_one(
-                {"_id": object_id}, 
-                {"$set": order_dict}
-            )
-            
-            if result.modified_count == 0:
-                raise NotFoundException(f"Order with id {order.id} not found")
-            
-            updated_order = await self.collection.find_one({"_id": object_id})
-            return Order(**updated_order)
-            
-        except Exception as e: 
+        if not order.id or not ObjectId.is_valid(order.id):
             raise NotFoundException(f"Order with id {order.id} not found")
 
+        object_id = ObjectId(order.id)
+        order_dict = order.model_dump(by_alias=True, exclude={"id"})
+        order_dict["version"] = order.version + 1
+        
+        # Every Order field is $set, so the post-image is order_dict itself; only the
+        # counted fields of the pre-image are needed to adjust the counters
+        previous = await self.collection.find_one_and_update(
+            {"_id": object_id, "version": _version_filter(order.version)}, 
+            {"$set": order_dict}, 
+            projection=COUNTED_PROJECTION, 
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if not previous:
+            await self._raise_conflict(object_id, expected_version=order.version)
+            raise NotFoundException(f"Order with id {order.id} not found")
+        
+        await self._count(OrderCounters.change_deltas(previous, order_dict))
+        
+        order_dict["_id"] = order.id
+        return self._to_order(order_dict)
+
 
+    @traced()
     async def delete(self, order_id):
 
-        try:
-            object_id = ObjectId(order_id)
-            
-            result = await self.collection.delete_one({
-                "_id" : object_id 
-            })
+        if not ObjectId.is_valid(order_id):
+            return False
 
-            return result.delete_count > 0
-        
-        except Exception as e:
+        deleted = await self.collection.find_one_and_delete(
+            {"_id": ObjectId(order_id)}, 
+            projection=COUNTED_PROJECTION
+        )
+
+        if not deleted:
             return False
 
-    async def get_by_restaurant_id(self, restaurant_id, limit = 10, skip = 0):
-        return await super().get_by_restaurant_id(restaurant_id, limit, skip)
+        await self._count(OrderCounters.deltas_for(deleted, sign=-1))
+        return True
+
+    @traced()
+    async def count_by_user_id(self, user_id: str) -> int:
+        return await self._counted("user_id", user_id)
+
+    @traced()
+    async def count_by_restaurant_id(self, restaurant_id: str) -> int:
+        return await self._counted("restaurant_id", restaurant_id)
+
+    @traced()
+    async def count_by_status(self, status: OrderStatus) -> int:
+        return await self._counted("status", status)
+
+    def _new_document(self, order: Order) -> Dict[str, Any]:
+        order_dict = order.model_dump(by_alias=True, exclude={"id"})
+        # Callers may assign the id up front, e.g. to reference the order from its outbox message
+        order_dict["_id"] = ObjectId(order.id) if order.id else ObjectId()
+        return order_dict
+
+    def _transactional(self) -> bool:
+        return self.use_transactions and self.outbox is not None
+
+    async def _add_to_outbox(self, messages: Sequence[OutboxMessage], session=None) -> None:
+        if not messages:
+            return
+        require_outbox(self.outbox, messages)
+        await self.outbox.add(messages, session=session)
+
+    @traced()
+    async def _write_with_outbox(self, write: Callable[[Any], Awaitable[None]], messages: Sequence[OutboxMessage]) -> None:
+        """Run `write` and store `messages` in the outbox, in one transaction when the deployment supports it"""
+
+        if not messages:
+            await write(None)
+            return
+
+        if self._transactional():
+            try:
+                async with await self.database.client.start_session() as session:
+                    async with session.start_transaction(write_concern=self.write_concern):
+                        await write(session)
+                        await self._add_to_outbox(messages, session=session)
+                return
+            except OperationFailure as e:
+                # Rejected before anything was written, so it is safe to retry without a transaction
+                if e.code != _TRANSACTIONS_UNSUPPORTED:
+                    raise
+                logger.warning("MongoDB does not support transactions (standalone server); the outbox is written right after the order instead")
+                self.use_transactions = False
+
+        await write(None)
+        await self._add_to_outbox(messages)
+
+    async def _counted(self, field: str, value: Any) -> int:
+        if self.counters:
+            return await self.counters.get(field, value)
+        return await self.collection.count_documents({field: value})
+
+    @traced()
+    async def _count(self, deltas) -> None:
+        if self.counters:
+            await self.counters.apply(deltas)
+
+    @traced()
+    async def get_by_restaurant_id(self, restaurant_id: str, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self._list({"restaurant_id": restaurant_id}, limit, skip, after, fields)
+
+    @traced()
+    async def get_by_status(self, status: OrderStatus, limit: int = 10, skip: int = 0, after: Optional[PageCursor] = None, fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+        return await self._list({"status": status}, limit, skip, after, fields)
+
+    async def _raise_conflict(self, object_id: ObjectId, status: Optional[OrderStatus] = None, expected_version: Optional[int] = None) -> None:
+        """Explain why a conditional write matched nothing. Returns quietly if the order does not exist"""
+
+        current = await self.collection.find_one({"_id": object_id}, {"status": 1, "version": 1})
+        if not current:
+            return
+
+        current_status = OrderStatus(current["status"])
+        current_version = current.get("version", 0)
+
+        if status is not None and not current_status.can_transition_to(status):
+            raise ConflictException(
+                f"Order {object_id} is '{current_status.value}' and cannot change to '{status.value}'"
+            )
+
+        raise ConflictException(
+            f"Order {object_id} was modified concurrently (version {current_version}, expected {expected_version})"
+        )
+
+    async def _list(self, query: Dict[str, Any], limit: int, skip: int, after: Optional[PageCursor], fields: Optional[Sequence[str]] = None) -> List[Union[Order, OrderSummary]]:
+
+        if after:
+            # Keyset pagination: seek past the cursor on the (created_at, _id) index
+            # instead of walking and discarding `skip` entries
+            after_id = ObjectId(after.id) if ObjectId.is_valid(after.id) else after.id
+            query = {
+                **query,
+                "$or": [
+                    {"created_at": {"$lt": after.created_at}},
+                    {"created_at": after.created_at, "_id": {"$lt": after_id}}
+                ]
+            }
+            skip = 0
+
+        if fields is None:
+            projection = ORDER_PROJECTION
+        else:
+            # created_at is always needed to build the next cursor, version and
+            # updated_at to tag the page; the response only shows the requested fields
+            projection = {field: 1 for field in fields}
+            projection.update(created_at=1, updated_at=1, version=1)
+
+        cursor = self.collection.find(query, projection).sort(LISTING_SORT).skip(skip).limit(limit)
+
+        orders = []
+        async for order_doc in cursor:
+            orders.append(self._to_order(order_doc) if fields is None else self._to_summary(order_doc))
 
-    async def get_by_status(self, status, limit = 10, skip = 0):
-        return await super().get_by_status(status, limit, skip)
+        return orders
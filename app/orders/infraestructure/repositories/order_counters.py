@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Mapping, Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+# Order fields that have a maintained count, and the prefix of their counter keys
+COUNTED_FIELDS = {
+    "user_id": "user",
+    "restaurant_id": "restaurant",
+    "status": "status",
+}
+
+class OrderCounters:
+    """Per-user, per-restaurant and per-status order counts kept up to date with $inc.
+
+    Counts are maintained best-effort next to each order write, so listing totals
+    are a single _id lookup instead of a count_documents. reconcile() recomputes
+    them from the orders collection to repair any drift.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase, write_concern: Optional[WriteConcern] = None, settle_seconds: float = 5.0):
+        self.orders = database.orders
+        self.settle_seconds = settle_seconds
+        self.collection = database.order_counters
+
+        if write_concern is not None:
+            self.collection = self.collection.with_options(write_concern=write_concern)
+
+    @staticmethod
+    def key(field: str, value: Any) -> str:
+        value = getattr(value, "value", value)
+        return f"{COUNTED_FIELDS[field]}:{value}"
+
+    @classmethod
+    def deltas_for(cls, order_doc: Mapping[str, Any], sign: int = 1) -> Counter:
+        return Counter({
+            cls.key(field, order_doc[field]): sign
+            for field in COUNTED_FIELDS if order_doc.get(field) is not None
+        })
+
+    @classmethod
+    def change_deltas(cls, before: Mapping[str, Any], after: Mapping[str, Any]) -> Counter:
+        deltas = cls.deltas_for(after)
+        deltas.subtract(cls.deltas_for(before))
+        return deltas
+
+    async def get(self, field: str, value: Any) -> int:
+        counter = await self.collection.find_one({"_id": self.key(field, value)})
+        return max(counter["count"], 0) if counter else 0
+
+    async def apply(self, deltas: Mapping[str, int]) -> None:
+        """Apply all deltas in one unordered bulk write. Failures are logged; reconcile() repairs them"""
+
+        operations = [
+            UpdateOne({"_id": key}, {"$inc": {"count": delta}}, upsert=True)
+            for key, delta in deltas.items() if delta
+        ]
+        if not operations:
+            return
+
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Failed to update order counters, totals may drift until reconciliation: {e}")
+
+    async def reconcile(self) -> int:
+        """Recompute every count from the orders collection; returns how many counters were corrected.
+
+        A counter's $inc follows its order write rather than being part of it, so the aggregate
+        can count an order whose $inc has not landed yet. Counters are therefore read before the
+        aggregate and again `settle_seconds` after it, and only those unchanged across both reads
+        are corrected, each conditionally on that value. An $inc slower than `settle_seconds` can
+        still be miscounted; the next pass repairs it.
+        """
+
+        before = await self._read_stored()
+
+        actual: Dict[str, int] = {}
+        for field in COUNTED_FIELDS:
+            pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+            async for group in self.orders.aggregate(pipeline, allowDiskUse=True):
+                if group["_id"] is not None:
+                    actual[self.key(field, group["_id"])] = group["count"]
+
+        await asyncio.sleep(self.settle_seconds)
+        after = await self._read_stored()
+        # A counter missing from both reads is unchanged too
+        stored = {key: value for key, value in after.items() if key in before and before[key] == value}
+        unchanged = set(stored) | (set(actual) - set(before) - set(after))
+
+        operations = [
+            # {"count": None} also matches a counter without the field; only missing counters are created
+            UpdateOne({"_id": key, "count": stored.get(key)}, {"$set": {"count": actual.get(key, 0)}}, upsert=key not in stored)
+            for key in unchanged
+            if actual.get(key, 0) != (stored.get(key) or 0)
+        ]
+        if not operations:
+            return 0
+
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.modified_count + result.upserted_count
+        except BulkWriteError as e:
+            # A counter created by an $inc since it was read fails its upsert on the _id; skip it like the others
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            return e.details["nModified"] + e.details["nUpserted"]
+
+    async def _read_stored(self) -> Dict[str, Optional[int]]:
+        return {counter["_id"]: counter.get("count") async for counter in self.collection.find({}, {"count": 1})}
+
+    async def run_reconciliation(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                corrected = await self.reconcile()
+                if corrected:
+                    logger.warning(f"Order counter reconciliation corrected {corrected} counters")
+            except Exception as e:
+                logger.error(f"Order counter reconciliation failed: {e}")
+
+            await asyncio.sleep(interval_seconds)
+
+
+def merge_deltas(deltas: Iterable[Counter]) -> Counter:
+    merged = Counter()
+    for delta in deltas:
+        merged.update(delta)
+    return merged
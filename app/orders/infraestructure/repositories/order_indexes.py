@@ -0,0 +1,150 @@
+import logging
+from typing import Any, Dict, List, Tuple
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ....config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Options that change how an index behaves; a mismatch on any of them is drift
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+# Declared indexes per collection. Listing indexes end in (created_at desc, _id desc)
+# so keyset pagination can seek straight to the cursor position.
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "orders": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_created_at", background=True
+        ),
+        IndexModel(
+            [("restaurant_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="restaurant_id_created_at", background=True
+        ),
+        IndexModel(
+            [("restaurant_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)],
+            name="restaurant_id_status_created_at", background=True
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created_at", background=True
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("updated_at", ASCENDING)],
+            name="status_updated_at", background=True
+        ),
+    ],
+    "outbox": [
+        # Pending entries (sent_at null) in relay order
+        IndexModel(
+            [("sent_at", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="sent_at_created_at", background=True
+        ),
+        # Sent entries expire after the retention period; pending ones have no date and never do
+        IndexModel(
+            [("sent_at", ASCENDING)],
+            name="sent_at_ttl", expireAfterSeconds=settings.outbox_sent_retention_seconds, background=True
+        ),
+    ],
+    # Keys are the _id (unique); each record carries its own expiry
+    "idempotency_keys": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0, background=True),
+    ],
+}
+
+
+class IndexReport(BaseModel):
+    created: List[str] = []
+    drifted: List[str] = []
+    recreated: List[str] = []
+    unmanaged: List[str] = []
+    ok: List[str] = []
+
+    def log(self) -> None:
+        logger.info(
+            "Index reconciliation: %d ok, %d created, %d recreated",
+            len(self.ok), len(self.created), len(self.recreated)
+        )
+        for name in self.drifted:
+            logger.warning("Index drift: %s", name)
+        for name in self.unmanaged:
+            logger.warning("Unmanaged index (not in registry): %s", name)
+
+
+def _normalize_key(pairs) -> Tuple[tuple, ...]:
+    # The server may report directions as floats (1.0) for indexes created from the shell
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in pairs
+    )
+
+
+def _differences(declared: Dict[str, Any], existing: Dict[str, Any]) -> List[str]:
+    differences = []
+
+    declared_key = _normalize_key(declared["key"].items())
+    existing_key = _normalize_key(existing["key"])
+    if declared_key != existing_key:
+        differences.append(f"key {list(existing_key)} != {list(declared_key)}")
+
+    for option in _COMPARED_OPTIONS:
+        if declared.get(option) != existing.get(option):
+            differences.append(f"{option} {existing.get(option)!r} != {declared.get(option)!r}")
+
+    return differences
+
+
+async def ensure_indexes(
+    database: AsyncIOMotorDatabase,
+    registry: Dict[str, List[IndexModel]] = INDEX_REGISTRY,
+    drop_drifted: bool = False
+) -> IndexReport:
+    """Create missing indexes from the registry and report drift. Safe to run on every startup"""
+
+    report = IndexReport()
+
+    for collection_name, models in registry.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        existing_by_key = {_normalize_key(info["key"]): name for name, info in existing.items()}
+
+        to_create = []
+        aliased = set()
+        for model in models:
+            declared = model.document
+            name = declared["name"]
+            qualified = f"{collection_name}.{name}"
+
+            if name not in existing:
+                same_key = existing_by_key.get(_normalize_key(declared["key"].items()))
+                if same_key:
+                    aliased.add(same_key)
+                    # Creating it would fail with "index already exists with a different name"
+                    report.drifted.append(f"{qualified}: exists as {collection_name}.{same_key}")
+                else:
+                    to_create.append(model)
+                    report.created.append(qualified)
+                continue
+
+            differences = _differences(declared, existing[name])
+            if not differences:
+                report.ok.append(qualified)
+                continue
+
+            report.drifted.append(f"{qualified}: {'; '.join(differences)}")
+            if drop_drifted:
+                await collection.drop_index(name)
+                to_create.append(model)
+                report.recreated.append(qualified)
+
+        declared_names = {model.document["name"] for model in models}
+        for name in existing:
+            if name != "_id_" and name not in declared_names and name not in aliased:
+                report.unmanaged.append(f"{collection_name}.{name}")
+
+        if to_create:
+            await collection.create_indexes(to_create)
+
+    return report
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+
+from ...domain.entities.outbox_message import OutboxMessage
+
+PENDING_SORT = [("created_at", ASCENDING), ("_id", ASCENDING)]
+
+class OrderOutbox:
+    """The `outbox` collection: events written next to their order and drained by the relay.
+
+    Pending entries have sent_at = null and are read oldest first. Sent entries keep
+    their sent_at and are removed by the TTL index declared in the index registry.
+    """
+
+    LEASE_ID = "outbox_relay"
+
+    def __init__(self, database: AsyncIOMotorDatabase, write_concern: Optional[WriteConcern] = None):
+        self.collection = database.outbox
+        self.leases = database.outbox_leases
+
+        if write_concern is not None:
+            self.collection = self.collection.with_options(write_concern=write_concern)
+
+    async def add(self, messages: Sequence[OutboxMessage], session: Optional[AsyncIOMotorClientSession] = None) -> None:
+        if not messages:
+            return
+
+        await self.collection.insert_many(
+            [{"_id": ObjectId(), **message.model_dump(), "sent_at": None} for message in messages],
+            ordered=True, session=session
+        )
+
+    async def pending(self, limit: int) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({"sent_at": None}).sort(PENDING_SORT).limit(limit)
+        return [entry async for entry in cursor]
+
+    async def mark_sent(self, entry_ids: Sequence[ObjectId]) -> None:
+        if entry_ids:
+            await self.collection.update_many(
+                {"_id": {"$in": list(entry_ids)}}, {"$set": {"sent_at": datetime.now(timezone.utc)}}
+            )
+
+    async def acquire_lease(self, owner: str, lease_seconds: float) -> bool:
+        """Take or renew the relay lease, so only one instance drains the outbox and order is kept"""
+
+        now = datetime.now(timezone.utc)
+        try:
+            lease = await self.leases.find_one_and_update(
+                {"_id": self.LEASE_ID, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=lease_seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another instance holds an unexpired lease, so the upsert collided with it
+            return False
+
+        return True
+
+
+def require_outbox(outbox: Optional[OrderOutbox], messages: Sequence[OutboxMessage]) -> None:
+    """Repositories without an outbox must not accept messages, since nothing would ever relay them"""
+    if messages and outbox is None:
+        raise ValueError("Outbox messages were given but the repository has no outbox configured")
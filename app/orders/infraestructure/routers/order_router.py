@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, status, Query
-from typing import Optional 
+from fastapi import APIRouter, Depends, Header, status, Query
+from typing import Literal, Optional 
 
 from ..controllers.order_controller import OrderController 
-from ...application.dto.create_order_dto import CreateOrderDTO 
-from ...application.dto.order_response_dto import OrderResponseDTO, OrderCreatedResponseDTO, OrderListResponseDTO 
+from ...application.dto.create_order_dto import CreateOrderDTO, CreateOrdersBatchDTO 
+from ...application.dto.update_order_status_dto import UpdateOrdersStatusBatchDTO 
+from ...application.dto.order_response_dto import OrderResponseDTO, OrderCreatedResponseDTO, OrderListResponseDTO, OrdersByIdsResponseDTO, BatchOrdersResponseDTO 
 
 from ..dependencies import get_order_controller
 
@@ -12,6 +13,9 @@ from ....shared.responses import SuccessResponse
 
 router = APIRouter(prefix="/api/v1/orders", tags=["orders"]) 
 
+NOT_MODIFIED = {304: {"description": "The ETag in If-None-Match is still current; no body"}}
+EVENT_STREAM = {200: {"content": {"text/event-stream": {}}, "description": "Server-Sent Events; each `status` event carries the order id, status, version and updated_at"}}
+
 @router.post(
     "/", 
     response_model=SuccessResponse[OrderCreatedResponseDTO], 
@@ -22,47 +26,125 @@ router = APIRouter(prefix="/api/v1/orders", tags=["orders"])
 async def create_order(order_dto: CreateOrderDTO, controller: OrderController = Depends(get_order_controller)):
     return await controller.create_order(order_dto)
 
+@router.post(
+    "/batch", 
+    response_model=SuccessResponse[BatchOrdersResponseDTO], 
+    status_code=status.HTTP_200_OK, 
+    summary="Create orders in bulk", 
+    description="Create up to 500 orders in one request. Each order is validated and persisted independently and reported per item"
+)
+async def create_orders_batch(batch_dto: CreateOrdersBatchDTO, controller: OrderController = Depends(get_order_controller)):
+    return await controller.create_orders_batch(batch_dto)
+
     
+@router.get(
+    "", 
+    response_model=SuccessResponse[OrdersByIdsResponseDTO], 
+    status_code=status.HTTP_200_OK, 
+    summary="Get several orders by ID", 
+    description="Retrieve up to 100 orders with one query, e.g. GET /api/v1/orders?ids=a,b,c. Orders come back in the requested order; unknown ids are listed in `missing`", 
+    responses=NOT_MODIFIED
+)
+async def get_orders_by_ids(
+    ids: str = Query(..., description="Comma-separated order ids"), 
+    if_none_match: Optional[str] = Header(None), 
+    controller: OrderController = Depends(get_order_controller)
+):
+    order_ids = [order_id.strip() for order_id in ids.split(",") if order_id.strip()]
+    return await controller.get_orders_by_ids(order_ids, if_none_match)
+
 @router.get(
     "/{order_id}", 
     response_model=SuccessResponse[OrderResponseDTO], 
     status_code=status.HTTP_200_OK, 
     summary="Get order by ID", 
-    description="Retrieve a specific order by its ID"
+    description="Retrieve a specific order by its ID. Send the ETag back in If-None-Match to get a 304 while the order is unchanged", 
+    responses=NOT_MODIFIED
 )
-async def get_order(order_id: str, controller: OrderController = Depends(get_order_controller)):
-    return await controller.get_order(order_id)
+async def get_order(
+    order_id: str, 
+    if_none_match: Optional[str] = Header(None), 
+    controller: OrderController = Depends(get_order_controller)
+):
+    return await controller.get_order(order_id, if_none_match)
+
+@router.get(
+    "/restaurant/{restaurant_id}/events", 
+    status_code=status.HTTP_200_OK, 
+    summary="Stream status changes of a restaurant's orders", 
+    description="Server-Sent Events with every status change of the restaurant's orders. Reconnects send Last-Event-ID to replay what was missed; a `reset` event means it can no longer be replayed and orders should be reloaded", 
+    responses=EVENT_STREAM
+)
+async def stream_restaurant_events(
+    restaurant_id: str, 
+    last_event_id: Optional[str] = Header(None), 
+    controller: OrderController = Depends(get_order_controller)
+):
+    return await controller.stream_restaurant_events(restaurant_id, last_event_id)
 
 @router.get(
     "/user/{user_id}", 
     response_model=SuccessResponse[OrderListResponseDTO],
     status_code=status.HTTP_200_OK, 
     summary="Get orders by user", 
-    description="Retrieve all orders for a specific user with pagination" 
+    description="Retrieve all orders for a specific user with pagination. Supports If-None-Match like a single order", 
+    responses=NOT_MODIFIED
 )
 async def get_orders_by_user(
     user_id: str, 
     page: int = Query(1, ge=1, description="Page number"), 
     per_page: int = Query(10, ge=1, le=100, description="Items per page"), 
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over page"), 
+    view: Literal["full", "summary"] = Query("full", description="'summary' omits items and delivery address"), 
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. status,final_amount,created_at; overrides view"), 
+    if_none_match: Optional[str] = Header(None), 
     controller: OrderController = Depends(get_order_controller)
     
 ):
-    # Get orders with filters (for admin/restaurant use)
-    return await controller.get_orders_by_user("", page, per_page)
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    return await controller.get_orders_by_user(user_id, page, per_page, after, view, field_list, if_none_match)
+
+@router.get(
+    "/{order_id}/events", 
+    status_code=status.HTTP_200_OK, 
+    summary="Stream status changes of an order", 
+    description="Server-Sent Events instead of polling GET /{order_id}: the current status first, then every change, until the order is delivered or cancelled. Event ids are order versions; reconnects with Last-Event-ID get the current status if they missed any change", 
+    responses={**EVENT_STREAM, 204: {"description": "The client already has the final status; stop reconnecting"}}
+)
+async def stream_order_events(
+    order_id: str, 
+    last_event_id: Optional[str] = Header(None), 
+    controller: OrderController = Depends(get_order_controller)
+):
+    return await controller.stream_order_events(order_id, last_event_id)
+
+@router.put(
+    "/batch/status",
+    response_model=SuccessResponse[BatchOrdersResponseDTO],
+    status_code=status.HTTP_200_OK, 
+    summary="Update the status of several orders",
+    description="Apply up to 500 status transitions with one bulk write. Each change is validated against the order state machine and reported per item"
+)
+async def update_orders_status_batch(
+    batch_dto: UpdateOrdersStatusBatchDTO, 
+    controller: OrderController = Depends(get_order_controller)
+):
+    return await controller.update_orders_status_batch(batch_dto)
 
 @router.put(
     "/{order_id}",
     response_model=SuccessResponse[OrderResponseDTO],
     status_code=status.HTTP_200_OK, 
     summary="Update order status",
-    description="Update the status of a specific order"
+    description="Update the status of a specific order. Transitions follow the order state machine; a conflicting concurrent change returns 409"
 )
 async def update_order_status(
     order_id: str, 
     new_status: OrderStatus = Query(..., description="New status for the order"),
+    expected_version: Optional[int] = Query(None, ge=0, description="Only apply the change if the order is still at this version"),
     controller: OrderController = Depends(get_order_controller)
 ):
-    return await controller.update_order_status(order_id, new_status) 
+    return await controller.update_order_status(order_id, new_status, expected_version) 
 
 @router.delete(
     "/{order_id}", 
@@ -0,0 +1,119 @@
+from typing import AsyncIterator, List, Optional, Tuple
+
+from ...domain.entities.order import Order
+from ...domain.entities.enums import ORDER_STATUS_TRANSITIONS, OrderStatus
+from ...application.events.order_status_changed_event import OrderStatusChangedEvent
+from ....shared.fanout import Subscription, SubscriptionOverflow
+from .order_status_hub import OrderStatusHub, SequencedEvent
+
+# Proxies must pass events through as they are written
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+HEARTBEAT = b": heartbeat\n\n"
+
+
+def sse_frame(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def is_final(status: OrderStatus) -> bool:
+    return not ORDER_STATUS_TRANSITIONS[status]
+
+
+class OrderEventStreams:
+    """Server-Sent Events streams of status changes, for one order or a whole restaurant.
+
+    Both start from a subscription taken before anything is read, so no change falls in
+    between. A comment line goes out every `heartbeat_seconds` of silence to keep proxies
+    from timing the connection out. A client that falls `buffer_size` events behind is
+    disconnected; it reconnects with Last-Event-ID and catches up from there.
+    """
+
+    def __init__(self, hub: OrderStatusHub, heartbeat_seconds: float = 15.0, buffer_size: int = 100, retry_ms: int = 3000):
+        self.hub = hub
+        self.heartbeat_seconds = heartbeat_seconds
+        self.buffer_size = buffer_size
+        self.retry_ms = retry_ms
+
+    def subscribe_order(self, order_id: str) -> Subscription:
+        return self.hub.subscribe_order(order_id, self.buffer_size)
+
+    def subscribe_restaurant(self, restaurant_id: str, last_event_id: Optional[str] = None) -> Tuple[Subscription, Optional[List[SequencedEvent]]]:
+        return self.hub.subscribe_restaurant(restaurant_id, self.buffer_size, last_event_id)
+
+    async def order_events(self, subscription: Subscription, order: Order, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Events of one order. Ids are the order's version, so a client can resume on any instance:
+        if it is behind the current version it gets the current state first. Ends once the order
+        reaches a final status"""
+
+        try:
+            yield self._retry()
+            last_version = _parse_version(last_event_id)
+            if last_version is None or order.version > last_version:
+                yield self._order_frame(OrderStatusChangedEvent.from_order(order))
+            if is_final(order.status):
+                return
+            last_version = order.version
+
+            async for sequenced in self._receive(subscription):
+                if sequenced is None:
+                    yield HEARTBEAT
+                    continue
+                event = sequenced[1]
+                # Changes already covered by the state we started from were queued meanwhile
+                if event.version <= last_version:
+                    continue
+                last_version = event.version
+                yield self._order_frame(event)
+                if is_final(event.status):
+                    return
+        finally:
+            subscription.close()
+
+    async def restaurant_events(self, subscription: Subscription, replay: Optional[List[SequencedEvent]]) -> AsyncIterator[bytes]:
+        """Status changes of every order of a restaurant made on this instance, after the `replay`
+        from `subscribe_restaurant`. When there is none to give (events after Last-Event-ID are no
+        longer kept) a `reset` event tells the client to reload"""
+
+        try:
+            yield self._retry()
+            if replay is None:
+                yield sse_frame("{}", event="reset")
+                replay = []
+
+            for sequenced in replay:
+                yield self._restaurant_frame(sequenced)
+            async for sequenced in self._receive(subscription):
+                yield HEARTBEAT if sequenced is None else self._restaurant_frame(sequenced)
+        finally:
+            subscription.close()
+
+    async def _receive(self, subscription: Subscription) -> AsyncIterator[Optional[SequencedEvent]]:
+        """Events as they arrive, and None after each `heartbeat_seconds` without one"""
+        while True:
+            try:
+                yield await subscription.get(self.heartbeat_seconds)
+            except SubscriptionOverflow:
+                return
+
+    def _retry(self) -> bytes:
+        # How long EventSource waits before reconnecting
+        return f"retry: {self.retry_ms}\n\n".encode()
+
+    def _order_frame(self, event: OrderStatusChangedEvent) -> bytes:
+        return sse_frame(event.model_dump_json(), event="status", event_id=str(event.version))
+
+    def _restaurant_frame(self, sequenced: SequencedEvent) -> bytes:
+        sequence, event = sequenced
+        return sse_frame(event.model_dump_json(), event="status", event_id=self.hub.event_id(sequence))
+
+
+def _parse_version(last_event_id: Optional[str]) -> Optional[int]:
+    if last_event_id is None or not last_event_id.strip().isdigit():
+        return None
+    return int(last_event_id.strip())
@@ -0,0 +1,80 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from ...application.events.order_status_changed_event import OrderStatusChangedEvent
+from ...application.events.status_publisher import StatusPublisher
+from ....shared.fanout import FanOut, Subscription
+
+# (sequence number in this process, event)
+SequencedEvent = Tuple[int, OrderStatusChangedEvent]
+
+
+class OrderStatusHub(StatusPublisher):
+    """In-process fan-out of order status changes to the live streams of this instance.
+
+    Every event gets a sequence number and goes to the order's topic and its restaurant's
+    topic. The last `history_size` events are kept so a restaurant stream can resume from
+    its Last-Event-ID; order streams resume from the order's version instead.
+    """
+
+    def __init__(self, max_subscribers: Optional[int] = None, history_size: int = 1000):
+        self.fanout = FanOut(max_subscribers)
+        self.history: Deque[SequencedEvent] = deque(maxlen=history_size)
+        # Tells sequence numbers of this process apart from those of a previous one
+        self.stream_id = uuid4().hex[:8]
+        self._sequence = 0
+
+    def publish(self, event: OrderStatusChangedEvent) -> None:
+        self._sequence += 1
+        sequenced = (self._sequence, event)
+        self.history.append(sequenced)
+        self.fanout.publish(order_topic(event.order_id), sequenced)
+        self.fanout.publish(restaurant_topic(event.restaurant_id), sequenced)
+
+    def subscribe_order(self, order_id: str, max_buffer: int) -> Subscription:
+        return self.fanout.subscribe([order_topic(order_id)], max_buffer)
+
+    def subscribe_restaurant(self, restaurant_id: str, max_buffer: int, last_event_id: Optional[str] = None) -> Tuple[Subscription, Optional[List[SequencedEvent]]]:
+        """Subscribe, and get the restaurant's events after `last_event_id` to replay first.
+
+        The replay is None when events may have been missed: the id is from another
+        process, or older than the history kept.
+        """
+
+        subscription = self.fanout.subscribe([restaurant_topic(restaurant_id)], max_buffer)
+        if last_event_id is None:
+            return subscription, []
+
+        sequence = self.parse_event_id(last_event_id)
+        if sequence is None or sequence > self._sequence:
+            return subscription, None
+        oldest = self.history[0][0] if self.history else self._sequence + 1
+        if sequence < oldest - 1:
+            return subscription, None
+
+        replay = [
+            (number, event) for number, event in self.history
+            if number > sequence and event.restaurant_id == restaurant_id
+        ]
+        return subscription, replay
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.stream_id}-{sequence}"
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        stream_id, _, sequence = event_id.strip().partition("-")
+        if stream_id != self.stream_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.fanout.stats(), "last_sequence": self._sequence}
+
+
+def order_topic(order_id: str) -> str:
+    return f"order:{order_id}"
+
+
+def restaurant_topic(restaurant_id: str) -> str:
+    return f"restaurant:{restaurant_id}"
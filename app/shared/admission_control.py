@@ -0,0 +1,183 @@
+import asyncio
+import bisect
+import itertools
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class RequestShed(Exception):
+    """The request was not admitted; `reason` is "queue_full", "evicted" or "timeout\""""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class RouteClass:
+    """A group of routes sharing a priority (lower runs first) and an optional concurrency cap"""
+
+    def __init__(self, name: str, priority: int, max_concurrency: Optional[int] = None):
+        self.name = name
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+
+
+class AdmissionController:
+    """Bounds how many requests run at once and decides who waits, who runs next and who is shed.
+
+    Up to `max_concurrency` requests run in total, each route class also within its own
+    cap. Requests that cannot start wait in one queue ordered by class priority, then
+    arrival, for at most `queue_timeout_seconds`. When the queue is full a new request
+    takes the place of the lowest-priority waiter if it outranks it, otherwise it is
+    shed at once: failing fast keeps latency flat for what is admitted.
+    """
+
+    def __init__(self, classes: Sequence[RouteClass], max_concurrency: int, max_queue_size: int, queue_timeout_seconds: float):
+        self.classes = {route_class.name: route_class for route_class in classes}
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.active = 0
+        self.active_by_class: Counter = Counter()
+        self.admitted: Counter = Counter()
+        self.shed: Counter = Counter()
+        # Sorted by (priority, arrival); the future resolves when the request is admitted
+        self._queue: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    async def acquire(self, class_name: str) -> None:
+        route_class = self.classes[class_name]
+
+        # Waiters are dispatched greedily on every release, so any still queued are blocked:
+        # starting now when there is room cannot overtake someone who could have run
+        if self._has_room(route_class):
+            self._start(route_class)
+            return
+
+        if len(self._queue) >= self.max_queue_size:
+            # With max_queue_size=0 there is no waiter to evict
+            lowest = self._queue[-1] if self._queue else None
+            if lowest is None or lowest[0] <= route_class.priority:
+                self._count_shed(class_name, "queue_full")
+                raise RequestShed("queue_full")
+            self._queue.pop()
+            if not lowest[3].done():
+                lowest[3].set_exception(RequestShed("evicted"))
+            self._count_shed(lowest[2], "evicted")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (route_class.priority, next(self._arrivals), class_name, future)
+        # Arrival numbers are unique, so tuples never get as far as comparing futures
+        bisect.insort(self._queue, entry)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._forget(entry)
+            if future.done() and not future.exception():
+                # Admitted in the same instant the deadline passed; hand the slot back
+                self.release(class_name)
+            self._count_shed(class_name, "timeout")
+            raise RequestShed("timeout")
+        except asyncio.CancelledError:
+            self._forget(entry)
+            if future.done() and not future.cancelled() and not future.exception():
+                self.release(class_name)
+            raise
+
+    def release(self, class_name: str) -> None:
+        self.active -= 1
+        self.active_by_class[class_name] -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        queued = Counter(class_name for _, _, class_name, _ in self._queue)
+        return {
+            "active": self.active,
+            "queued": len(self._queue),
+            "classes": {
+                name: {
+                    "active": self.active_by_class[name],
+                    "queued": queued[name],
+                    "admitted": self.admitted[name],
+                    "shed": {reason: count for (shed_class, reason), count in self.shed.items() if shed_class == name},
+                }
+                for name in self.classes
+            },
+        }
+
+    def _has_room(self, route_class: RouteClass) -> bool:
+        if self.active >= self.max_concurrency:
+            return False
+        return route_class.max_concurrency is None or self.active_by_class[route_class.name] < route_class.max_concurrency
+
+    def _start(self, route_class: RouteClass) -> None:
+        self.active += 1
+        self.active_by_class[route_class.name] += 1
+        self.admitted[route_class.name] += 1
+
+    def _dispatch(self) -> None:
+        index = 0
+        while index < len(self._queue) and self.active < self.max_concurrency:
+            _, _, class_name, future = self._queue[index]
+            route_class = self.classes[class_name]
+            if future.done() or not self._has_room(route_class):
+                # Skip waiters whose class is at its cap; a lower class may still have room
+                index += 1
+                continue
+            del self._queue[index]
+            self._start(route_class)
+            future.set_result(None)
+
+    def _forget(self, entry) -> None:
+        try:
+            self._queue.remove(entry)
+        except ValueError:
+            pass
+
+    def _count_shed(self, class_name: str, reason: str) -> None:
+        self.shed[(class_name, reason)] += 1
+
+
+class AdmissionControlMiddleware:
+    """Runs each matched request through the admission controller; unmatched ones (health checks,
+    docs, metrics) bypass it. Shed requests get a 503 with Retry-After right away"""
+
+    def __init__(self, app, controller: AdmissionController, rules: Sequence[Tuple[str, str, str]], retry_after_seconds: int = 1):
+        self.app = app
+        self.controller = controller
+        # (method, path regex, class name); the first match wins
+        self.rules = [(method, re.compile(pattern), class_name) for method, pattern, class_name in rules]
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope, receive, send):
+        class_name = self._classify(scope) if scope["type"] == "http" else None
+        if class_name is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            await self.controller.acquire(class_name)
+        except RequestShed:
+            return await self._overloaded(send)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(class_name)
+
+    def _classify(self, scope) -> Optional[str]:
+        for method, pattern, class_name in self.rules:
+            if scope["method"] == method and pattern.fullmatch(scope["path"]):
+                return class_name
+        return None
+
+    async def _overloaded(self, send) -> None:
+        body = json.dumps({"detail": "Service overloaded, retry later"}).encode()
+        await send({"type": "http.response.start", "status": 503, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(self.retry_after_seconds).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
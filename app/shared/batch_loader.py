@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """Coalesces single-key loads made in the same event-loop tick into one batched load.
+
+    The first `load` in a tick schedules a dispatch for the next iteration of the loop;
+    every key requested until then goes into the same `load_many` call (split into chunks
+    of `max_batch_size`), and callers asking for the same key share one result. Nothing
+    is cached between batches: each tick reads fresh data.
+    """
+
+    def __init__(self, load_many: Callable[[List[K]], Awaitable[Dict[K, V]]], max_batch_size: int = 100):
+        self.load_many = load_many
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._tasks: set = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """Value for `key`, or None when `load_many` did not return it"""
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+
+        # Shielded so a caller that is cancelled does not cancel the result for the others
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self.max_batch_size]}
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, "asyncio.Future[Optional[V]]"]) -> None:
+        try:
+            values = await self.load_many(list(batch))
+        except BaseException as e:
+            # Every caller waiting on this batch gets the failure; a cancelled batch cancels them
+            for future in batch.values():
+                if not future.done():
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                    else:
+                        future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,53 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Clients may keep a copy but must revalidate it (cheaply, with If-None-Match) before using it
+CACHE_CONTROL = "private, no-cache"
+
+
+def _millis(value: Optional[datetime]) -> int:
+    # Stored dates are naive UTC with millisecond precision; fresh ones are aware with microseconds
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def version_etag(version: Optional[int], updated_at: Optional[datetime]) -> str:
+    """Strong ETag of one resource that is versioned on every write"""
+    return f'"{version or 0}-{_millis(updated_at):x}"'
+
+
+def listing_etag(items: Iterable[Any], *parts: Any) -> str:
+    """Strong ETag of a page of versioned items (anything with id, version and updated_at).
+
+    Keyed on every item's version rather than only the newest updated_at, so an order
+    leaving the page (deleted, or pushed out by a new one) also changes the tag. `parts`
+    are the other values in the response, such as totals and the next cursor.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(f"{part}\x1f".encode())
+    for item in items:
+        digest.update(f"{item.id}:{item.version or 0}:{_millis(item.updated_at)}\x1e".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; it uses weak comparison, so a W/ prefix on either side is ignored"""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -0,0 +1,116 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+
+
+class SubscriptionOverflow(Exception):
+    """The subscriber fell further behind than its buffer allows and was dropped"""
+
+
+class TooManySubscribers(Exception):
+    """The fan-out already has as many subscribers as it allows"""
+
+
+class Subscription:
+    """Messages published to any of `topics` since subscribing, buffered until read.
+
+    At most `max_buffer` messages are held. A subscriber that falls further behind is
+    dropped rather than allowed to grow: its buffer is freed and the next `get` raises
+    SubscriptionOverflow, so the consumer can reconnect and catch up from its own state.
+    """
+
+    def __init__(self, fanout: "FanOut", topics: Iterable[str], max_buffer: int):
+        self.topics = tuple(topics)
+        self.max_buffer = max_buffer
+        self.overflowed = False
+        self._fanout = fanout
+        self._buffer: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+
+    async def get(self, timeout: float) -> Optional[Any]:
+        """Next message, or None when nothing arrives within `timeout`"""
+
+        if not self._buffer and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        if self.overflowed:
+            raise SubscriptionOverflow()
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        self._fanout._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _offer(self, message: Any) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            self.overflowed = True
+            self._buffer.clear()
+            self._fanout.dropped += 1
+            self.close()
+        else:
+            self._buffer.append(message)
+        self._ready.set()
+
+
+class FanOut:
+    """In-process publish/subscribe by topic; publishing never waits on subscribers"""
+
+    def __init__(self, max_subscribers: Optional[int] = None):
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.dropped = 0
+        self._subscriptions: Set[Subscription] = set()
+        self._by_topic: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, topics: Iterable[str], max_buffer: int) -> Subscription:
+        if self.max_subscribers is not None and len(self._subscriptions) >= self.max_subscribers:
+            raise TooManySubscribers(f"At most {self.max_subscribers} subscribers are allowed")
+
+        subscription = Subscription(self, topics, max_buffer)
+        self._subscriptions.add(subscription)
+        for topic in subscription.topics:
+            self._by_topic.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def publish(self, topic: str, message: Any) -> int:
+        """Hand `message` to every subscriber of `topic`; returns how many got it"""
+
+        subscribers = self._by_topic.get(topic)
+        if not subscribers:
+            return 0
+
+        self.published += 1
+        delivered = 0
+        # Copied: a subscriber that overflows unsubscribes while we iterate
+        for subscription in tuple(subscribers):
+            subscription._offer(message)
+            delivered += not subscription.overflowed
+        return delivered
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "topics": len(self._by_topic),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self._by_topic.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_topic[topic]
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from starlette.routing import Match
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, from the first middleware to the last byte sent",
+    ["method", "route"]
+)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests served", ["method", "route", "status"])
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method", "route"])
+
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "Duration of MongoDB commands as reported by the driver",
+    ["command", "collection"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+MONGO_COMMAND_FAILURES = Counter("mongodb_command_failures_total", "MongoDB commands that failed", ["command", "collection"])
+
+EVENT_LOOP_LAG = Gauge("event_loop_lag_seconds", "How late the last event-loop lag probe woke up")
+EVENT_LOOP_LAG_DURATION = Histogram(
+    "event_loop_lag_duration_seconds",
+    "How late event-loop lag probes woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Request latency, count and in-flight gauges per route template.
+
+    Labelled with the route's path (/api/v1/orders/{order_id}) rather than the request
+    path, so the number of series stays bounded however many orders there are.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+
+
+def route_template(scope) -> str:
+    """Path template of the route that will serve the request, e.g. /api/v1/orders/{order_id}"""
+    # Routing has not run yet, so match the app's routes the same way the router will
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """PyMongo command listener feeding the command duration histogram; pass it to the client
+    in `event_listeners`. Runs on the driver's threads, so it only does dictionary work"""
+
+    def __init__(self):
+        # The collection is only in the started event; kept until the command finishes
+        self._collections: Dict[Tuple, str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._collections[(event.connection_id, event.request_id)] = _collection(event.command_name, event.command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+def _collection(command_name: str, command) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    # CRUD commands name their collection as the value of the command itself: {"find": "orders", ...}
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+async def monitor_event_loop_lag(interval_seconds: float = 0.5) -> None:
+    """Sleep `interval_seconds` at a time and record how much later than asked the loop woke us.
+    Anything blocking the loop (CPU-heavy work, sync I/O) shows up here before it shows up as latency"""
+
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval_seconds)
+        lag = max(0.0, loop.time() - started - interval_seconds)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_DURATION.observe(lag)
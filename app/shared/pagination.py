@@ -0,0 +1,46 @@
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pydantic import BaseModel
+
+from .exceptions import ValidationException
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class PageCursor(BaseModel):
+    """Keyset position in a listing sorted by (created_at desc, _id desc)"""
+    created_at: datetime
+    id: str
+
+    @classmethod
+    def after_item(cls, item) -> "PageCursor":
+        return cls(created_at=item.created_at, id=item.id)
+
+    def encode(self) -> str:
+        created_at = self.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        millis = (created_at - _EPOCH) // timedelta(milliseconds=1)
+        raw = f"{millis}:{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: Optional[str]) -> Optional["PageCursor"]:
+        if not token:
+            return None
+
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            millis, order_id = raw.split(":", 1)
+            created_at = _EPOCH + timedelta(milliseconds=int(millis))
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            raise ValidationException("Invalid pagination cursor")
+
+        if not order_id:
+            raise ValidationException("Invalid pagination cursor")
+
+        return cls(created_at=created_at, id=order_id)
@@ -1,5 +1,12 @@
-from typing import Generic, TypeVar, Optional, Any
+from typing import Dict, Generic, TypeVar, Optional, Any
 from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements, the stdlib path is a fallback
+    orjson = None
 
 T = TypeVar('T')
 
@@ -32,4 +39,30 @@ class PaginatedResponse(BaseModel, Generic[T]):
     status_code: int = 200
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, which handles datetimes, enums and nested dicts natively"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content)
+
+
+def success_response(data: Any, message: str, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> FastJSONResponse:
+    """SuccessResponse envelope serialized directly.
+
+    Returning a Response skips FastAPI's response_model validation, so `data` must already
+    have the documented shape (e.g. built by the order response mapper).
+    """
+    return FastJSONResponse(
+        {"success": True, "data": data, "message": message, "status_code": status_code},
+        status_code=status_code,
+        headers=headers
+    )
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """304 for a conditional GET: no body, only the validators and caching headers"""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,340 @@
+import asyncio
+import functools
+import importlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Messages queued for publishing (event pipeline, outbox, spill buffer) carry the trace context of
+# the request that produced them under this key; the publisher moves it into the AMQP headers
+TRACEPARENT_FIELD = "_traceparent"
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+class SpanContext:
+    """What is propagated between services: W3C Trace Context ids and the sampled flag"""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        match = _TRACEPARENT.match(value.strip().lower()) if value else None
+        if not match or match.group(1) == _INVALID_TRACE_ID or match.group(2) == _INVALID_SPAN_ID:
+            return None
+        return cls(match.group(1), match.group(2), sampled=bool(int(match.group(3), 16) & 1))
+
+
+class Span:
+    """One timed operation. Finished spans are handed to the exporters when sampled"""
+
+    __slots__ = ("name", "kind", "context", "parent_id", "attributes", "start_time", "duration", "error", "_started")
+
+    def __init__(self, name: str, kind: str, context: SpanContext, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.error = f"{type(exception).__name__}: {getattr(exception, 'detail', None) or exception}"
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self, service: str) -> Dict[str, Any]:
+        return {
+            "service": service,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.fromtimestamp(self.start_time, timezone.utc).isoformat(),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(ABC):
+    """Receives finished spans in batches, on a worker thread"""
+
+    @abstractmethod
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """One log line per span"""
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        for span in spans:
+            error = f" error={span['error']!r}" if span["error"] else ""
+            logger.info(
+                f"span {span['name']} {span['duration_ms']}ms trace={span['trace_id']} "
+                f"span={span['span_id']} parent={span['parent_id']}{error}"
+            )
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans as JSON Lines, for offline analysis"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write("".join(json.dumps(span, default=str) + "\n" for span in spans))
+
+
+# Exporters selectable by name in settings; register others here or name them as "module:Class"
+SPAN_EXPORTERS: Dict[str, Callable[..., SpanExporter]] = {
+    "console": lambda **options: ConsoleSpanExporter(),
+    "file": lambda **options: FileSpanExporter(options["file_path"]),
+}
+
+
+def build_exporter(name: str, **options: Any) -> SpanExporter:
+    if name in SPAN_EXPORTERS:
+        return SPAN_EXPORTERS[name](**options)
+    module_name, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown span exporter '{name}'")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+class _SpanScope:
+    """Makes the span current for the duration of a `with` block"""
+
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc is not None and not isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            status_code = getattr(exc, "status_code", None)
+            if isinstance(status_code, int) and status_code < 500:
+                # An HTTP error answered to the client (404, 409...) is not a failure of the span
+                self.span.set_attribute("http.status_code", status_code)
+            else:
+                self.span.record_exception(exc)
+        self.span.end()
+        _current_span.reset(self._token)
+        self.tracer._finished(self.span)
+
+
+class _NoSpanScope:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpanScope()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans, tracks the current one per task, and ships finished spans to the exporters.
+
+    Disabled until configured, in which case `span()` costs one attribute check. Finished
+    spans are buffered (up to `max_queue_size`, beyond which they are dropped) and
+    exported in batches from a background task so exporting never runs on the event loop.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.service_name = ""
+        self.exporters: List[SpanExporter] = []
+        self.sample_ratio = 1.0
+        self.max_queue_size = 2048
+        self.export_interval_seconds = 1.0
+        self.dropped = 0
+        self._queue: Deque[Span] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, service_name: str, exporters: Sequence[SpanExporter], sample_ratio: float = 1.0, max_queue_size: int = 2048, export_interval_seconds: float = 1.0) -> None:
+        self.enabled = True
+        self.service_name = service_name
+        self.exporters = list(exporters)
+        self.sample_ratio = sample_ratio
+        self.max_queue_size = max_queue_size
+        self.export_interval_seconds = export_interval_seconds
+
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None, parent: Union[SpanContext, str, None] = None):
+        """Context manager for a child of `parent` (a SpanContext or traceparent) or else of the
+        current span; with neither it starts a trace. Yields the Span, or None when disabled"""
+
+        if not self.enabled:
+            return _NO_SPAN
+
+        if isinstance(parent, str):
+            parent = SpanContext.from_traceparent(parent)
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current else None
+
+        if parent is None:
+            context = SpanContext(_new_id(128), _new_id(64), sampled=random.random() < self.sample_ratio)
+        else:
+            context = SpanContext(parent.trace_id, _new_id(64), sampled=parent.sampled)
+
+        return _SpanScope(self, Span(name, kind, context, parent.span_id if parent else None, attributes))
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start(self) -> None:
+        if self.enabled and self.exporters and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    async def flush(self) -> None:
+        while self._queue:
+            batch = [self._queue.popleft().to_dict(self.service_name) for _ in range(min(len(self._queue), 512))]
+            for exporter in self.exporters:
+                try:
+                    await asyncio.to_thread(exporter.export, batch)
+                except Exception as e:
+                    logger.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+    def _finished(self, span: Span) -> None:
+        if not span.context.sampled or not self.exporters:
+            return
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.export_interval_seconds)
+            await self.flush()
+
+
+def _new_id(bits: int) -> str:
+    # Never all zeros, which W3C Trace Context reserves as invalid
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None, kind: str = "internal") -> Callable:
+    """Run the decorated function (sync or async) in a span named after it"""
+
+    def decorate(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await function(*args, **kwargs)
+                with tracer.span(span_name, kind):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(span_name, kind):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def with_trace_context(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Tag a message about to be queued for publishing with the current trace context"""
+
+    span = _current_span.get()
+    if span is not None:
+        message[TRACEPARENT_FIELD] = span.context.traceparent
+    return message
+
+
+class TracingMiddleware:
+    """Server span for every HTTP request, continuing the caller's trace when it sends a traceparent"""
+
+    def __init__(self, app, route_name: Callable[[Dict[str, Any]], str]):
+        self.app = app
+        self.route_name = route_name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for header, value in scope["headers"]:
+            if header == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        route = self.route_name(scope)
+        attributes = {"http.method": method, "http.route": route, "http.target": scope["path"]}
+
+        with tracer.span(f"{method} {route}", kind="server", attributes=attributes, parent=traceparent) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.error = f"HTTP {message['status']}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
@@ -0,0 +1,77 @@
+"""Time to turn stored order documents into Order entities: validated vs trusted hydration.
+
+Documents are shaped like what MongoDB returns for the orders collection (ObjectId `_id`,
+naive UTC datetimes, status as a string, three line items), so the numbers isolate the
+entity construction the repository does after a read. The garbage collector is paused
+while timing, since at these batch sizes its scans of the growing heap cost as much as
+the construction itself; pass --with-gc to include them.
+
+    python -m benchmarks.order_hydration [--sizes 1000 10000 100000] [--with-gc]
+"""
+import argparse
+import copy
+import gc
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.orders.domain.entities.order import Order
+
+
+def documents(count: int) -> list:
+    now = datetime.utcnow().replace(microsecond=0)
+    return [
+        {
+            "_id": ObjectId(), "user_id": f"user-{index % 500}", "restaurant_id": "bench-restaurant",
+            "items": [
+                {"product_id": f"p{item}", "product_name": "Pizza Margherita", "quantity": 2, "unit_price": 150.0, "subtotal": 300.0}
+                for item in range(3)
+            ],
+            "delivery_address": {
+                "street": "Av. Revolución 123", "city": "CDMX", "state": "CDMX", "postal_code": "06700",
+                "country": "Mexico", "additional_info": None
+            },
+            "status": "confirmed", "total_amount": 900.0, "delivery_fee": 25.0, "tax_amount": 144.0,
+            "final_amount": 1069.0, "notes": None, "created_at": now, "updated_at": now,
+            "estimated_delivery_time": None, "delivered_at": None, "version": 1,
+        }
+        for index in range(count)
+    ]
+
+
+def measure(hydrate, docs: list, with_gc: bool = False) -> float:
+    # Fresh dicts per run, as the driver decodes them per read (trusted hydration adopts
+    # the nested ones), and the entities are kept alive like a listing keeps its page
+    batch = copy.deepcopy(docs)
+    gc.collect()
+    if not with_gc:
+        gc.disable()
+    try:
+        started = time.perf_counter()
+        orders = [hydrate(doc) for doc in batch]
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    del orders
+    return elapsed
+
+
+def main(sizes: list, with_gc: bool) -> None:
+    print(f"{'orders':>8} {'validated':>12} {'trusted':>12} {'speedup':>8}")
+    for size in sizes:
+        docs = documents(size)
+        measure(Order.model_validate, docs[:1000])
+        measure(Order.from_document, docs[:1000])
+
+        validated = measure(Order.model_validate, docs, with_gc)
+        trusted = measure(Order.from_document, docs, with_gc)
+        print(f"{size:>8} {validated * 1e3:>10.1f}ms {trusted * 1e3:>10.1f}ms {validated / trusted:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--with-gc", action="store_true")
+    args = parser.parse_args()
+    main(args.sizes, args.with_gc)
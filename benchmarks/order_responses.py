@@ -0,0 +1,88 @@
+"""CPU cost per request of GET /api/v1/orders/{order_id} and GET /api/v1/orders/user/{user_id}.
+
+Requests are sent straight to the ASGI app (no HTTP server or client in the loop) against
+the in-memory repository, so the numbers are the service's own routing, mapping and
+serialization work.
+
+    python -m benchmarks.order_responses [--requests 2000] [--per-page 50]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ORDER_REPOSITORY_BACKEND", "memory")
+os.environ.setdefault("ORDER_CACHE_ENABLED", "false")
+
+from app.main import app  # noqa: E402
+from app.orders.infraestructure.dependencies import get_order_repository  # noqa: E402
+from app.orders.domain.entities.order import Order  # noqa: E402
+from app.orders.domain.entities.value_objects import DeliveryAddress, OrderItem  # noqa: E402
+
+
+async def call(url: str) -> bytes:
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("bench", 1),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{url} returned {message['status']}")
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def seed(count: int) -> str:
+    repository = get_order_repository()
+    order_id = None
+    for index in range(count):
+        items = [
+            OrderItem(product_id=f"p{item}", product_name="Pizza Margherita", quantity=2, unit_price=150.0, subtotal=300.0)
+            for item in range(3)
+        ]
+        order = await repository.create(Order(
+            user_id="bench-user", restaurant_id="bench-restaurant", items=items,
+            delivery_address=DeliveryAddress(street="Av. Revolución 123", city="CDMX", state="CDMX", postal_code="06700"),
+            total_amount=900.0, delivery_fee=25.0, tax_amount=144.0, final_amount=1069.0, notes=f"order {index}"
+        ))
+        order_id = order.id
+    return order_id
+
+
+async def measure(path: str, requests: int) -> float:
+    for _ in range(50):
+        await call(path)
+
+    started = time.process_time()
+    for _ in range(requests):
+        await call(path)
+    return (time.process_time() - started) / requests * 1e6
+
+
+async def main(requests: int, per_page: int) -> None:
+    order_id = await seed(max(per_page, 100))
+
+    results = {
+        "get order": await measure(f"/api/v1/orders/{order_id}", requests),
+        f"list {per_page} orders": await measure(f"/api/v1/orders/user/bench-user?per_page={per_page}", requests // 10 or 1),
+    }
+    for name, micros in results.items():
+        print(f"{name:>16}: {micros:8.1f} us CPU/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.per_page))
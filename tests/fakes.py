@@ -0,0 +1,39 @@
+from contextlib import asynccontextmanager
+
+from app.orders.infraestructure.messaging.broker_supervisor import BrokerUnavailableError, CircuitBreaker
+
+
+class FakeExchange:
+    def __init__(self):
+        self.fail = False
+        self.published = []
+        self.messages = []
+
+    async def publish(self, message, routing_key, timeout=None):
+        if self.fail:
+            raise TimeoutError("no confirm")
+        self.published.append(routing_key)
+        self.messages.append(message)
+
+
+class FakeChannel:
+    def __init__(self, exchange: FakeExchange):
+        self.exchange = exchange
+
+    async def get_exchange(self, name, ensure=True):
+        return self.exchange
+
+
+class FakeSupervisor:
+    """Connected supervisor; like the real one, borrowing a channel fails fast while the breaker is open"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.exchange = FakeExchange()
+        self.on_connected = []
+
+    @asynccontextmanager
+    async def channel(self, wait_ready: bool = True):
+        if not self.breaker.allow():
+            raise BrokerUnavailableError("RabbitMQ is unavailable (circuit open)")
+        yield FakeChannel(self.exchange)
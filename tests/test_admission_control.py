@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.shared import admission_control
+from app.shared.admission_control import AdmissionController, AdmissionControlMiddleware, RequestShed, RouteClass
+
+CLASSES = [
+    RouteClass("status", priority=0),
+    RouteClass("read", priority=1),
+    RouteClass("bulk", priority=2, max_concurrency=1),
+]
+
+
+def controller(max_concurrency: int = 1, max_queue_size: int = 10, queue_timeout_seconds: float = 1.0) -> AdmissionController:
+    return AdmissionController(CLASSES, max_concurrency, max_queue_size, queue_timeout_seconds)
+
+
+async def queued(admission: AdmissionController, class_name: str, admitted: list) -> asyncio.Task:
+    async def wait():
+        await admission.acquire(class_name)
+        admitted.append(class_name)
+
+    task = asyncio.create_task(wait())
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_by_priority_then_arrival():
+    admission = controller()
+    await admission.acquire("read")
+    admitted = []
+
+    tasks = [await queued(admission, class_name, admitted) for class_name in ("bulk", "read", "status", "read")]
+    for _ in tasks:
+        admission.release(admitted[-1] if admitted else "read")
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*tasks)
+    assert admitted == ["status", "read", "read", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_evicts_the_lowest_priority_waiter():
+    admission = controller(max_queue_size=1)
+    await admission.acquire("read")
+    admitted = []
+
+    bulk = await queued(admission, "bulk", admitted)
+    status = await queued(admission, "status", admitted)
+
+    with pytest.raises(RequestShed) as shed:
+        await bulk
+    assert shed.value.reason == "evicted"
+
+    # A waiter that does not outrank the queue is shed instead
+    with pytest.raises(RequestShed) as shed:
+        await admission.acquire("read")
+    assert shed.value.reason == "queue_full"
+
+    admission.release("read")
+    await status
+    assert admitted == ["status"]
+    assert admission.stats()["classes"]["bulk"]["shed"] == {"evicted": 1}
+
+
+@pytest.mark.asyncio
+async def test_waiter_is_shed_after_the_queue_timeout():
+    admission = controller(queue_timeout_seconds=0.01)
+    await admission.acquire("read")
+
+    with pytest.raises(RequestShed) as shed:
+        await admission.acquire("read")
+
+    assert shed.value.reason == "timeout"
+    assert admission.stats()["queued"] == 0
+    assert admission.active == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_admitted_at_the_deadline_is_given_back(monkeypatch):
+    admission = controller()
+    await admission.acquire("read")
+
+    async def admitted_as_it_times_out(awaitable, timeout):
+        # The holder finishes and admits the waiter in the same instant its deadline passes
+        admission.release("read")
+        awaitable.cancel()
+        raise asyncio.TimeoutError()
+
+    patched = SimpleNamespace(**{**vars(asyncio), "wait_for": admitted_as_it_times_out})
+    monkeypatch.setattr(admission_control, "asyncio", patched)
+
+    with pytest.raises(RequestShed) as shed:
+        await admission.acquire("read")
+
+    assert shed.value.reason == "timeout"
+    assert admission.active == 0
+    assert admission.active_by_class["read"] == 0
+
+
+@pytest.mark.asyncio
+async def test_class_at_its_cap_does_not_block_lower_classes():
+    classes = [RouteClass("bulk", priority=0, max_concurrency=1), RouteClass("read", priority=1)]
+    admission = AdmissionController(classes, max_concurrency=2, max_queue_size=10, queue_timeout_seconds=1.0)
+    await admission.acquire("bulk")
+    await admission.acquire("read")
+    admitted = []
+
+    bulk = await queued(admission, "bulk", admitted)
+    read = await queued(admission, "read", admitted)
+    admission.release("read")
+    await read
+
+    assert admitted == ["read"]
+    assert not bulk.done()
+    admission.release("bulk")
+    await bulk
+
+
+class SlowEndpoint:
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.mark.asyncio
+async def test_shed_request_gets_503_with_retry_after():
+    endpoint = SlowEndpoint()
+    middleware = AdmissionControlMiddleware(
+        endpoint,
+        AdmissionController(CLASSES, max_concurrency=1, max_queue_size=0, queue_timeout_seconds=1.0),
+        rules=[("GET", r"/api/v1/orders/[^/]+", "read")],
+        retry_after_seconds=3
+    )
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/api/v1/orders/1"))
+        await asyncio.sleep(0.01)
+
+        shed = await client.get("/api/v1/orders/2")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "3"
+
+        # Unmatched routes bypass admission control
+        endpoint.release.set()
+        assert (await client.get("/health")).status_code == 200
+        assert (await running).status_code == 200
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.orders.infraestructure.messaging import broker_supervisor
+from app.orders.infraestructure.messaging.broker_supervisor import BrokerUnavailableError, CircuitBreaker
+from app.orders.infraestructure.messaging.rabbitmq_publisher import RabbitMQPublisher
+
+from fakes import FakeSupervisor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the breaker's clock; the event loop keeps the real one
+    monkeypatch.setattr(broker_supervisor, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1.0)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1.0)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now += 1.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1.0)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now += 1.0
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 0.5
+    assert breaker.state == "open"
+    clock.now += 0.5
+    assert breaker.state == "half_open"
+
+
+def test_failures_while_open_do_not_extend_the_window(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1.0)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    # Publishes that were in flight when it opened
+    clock.now += 0.9
+    breaker.record_failure()
+    clock.now += 0.1
+    assert breaker.state == "half_open"
+
+
+@pytest.mark.asyncio
+async def test_publisher_recovers_while_connected(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1.0)
+    supervisor = FakeSupervisor(breaker)
+    publisher = RabbitMQPublisher(supervisor)
+    message = {"order_id": "1", "created_at": "2024-01-01T00:00:00"}
+
+    # Confirms time out while the connection stays up
+    supervisor.exchange.fail = True
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await publisher.publish_message("order.created", message, allow_spill=False)
+    assert breaker.state == "open"
+
+    # Publishes rejected by the open breaker keep coming faster than reset_seconds
+    supervisor.exchange.fail = False
+    for _ in range(9):
+        clock.now += 0.1
+        with pytest.raises(BrokerUnavailableError):
+            await publisher.publish_message("order.created", message, allow_spill=False)
+    clock.now += 0.1
+    assert breaker.state == "half_open"
+
+    await publisher.publish_message("order.created", message, allow_spill=False)
+    assert breaker.state == "closed"
+    assert supervisor.exchange.published == ["order.created"]
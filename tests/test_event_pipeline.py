@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.orders.infraestructure.messaging.event_pipeline import EventPipeline
+
+
+def dropped_events() -> float:
+    return REGISTRY.get_sample_value("event_pipeline_dropped_events_total")
+
+
+class FlakyPublisher:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.published = []
+
+    async def publish_batch(self, messages, allow_spill=True):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("spill buffer full")
+        self.published.extend(messages)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_ahead_of_later_events():
+    publisher = FlakyPublisher(failures=2)
+    pipeline = EventPipeline(publisher, max_batch_size=1, flush_interval_seconds=0, retry_initial_seconds=0.01)
+    pipeline.start()
+
+    await pipeline.submit("order.created", {"order_id": "1"})
+    await pipeline.submit("order.created", {"order_id": "2"})
+    await pipeline.close(timeout_seconds=1)
+
+    assert [message["order_id"] for _, message in publisher.published] == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_events_left_at_shutdown_are_counted_as_dropped():
+    publisher = FlakyPublisher(failures=1000)
+    pipeline = EventPipeline(publisher, max_batch_size=1, flush_interval_seconds=0, retry_initial_seconds=0.01)
+    pipeline.start()
+    dropped = dropped_events()
+
+    await pipeline.submit("order.created", {"order_id": "1"})
+    await pipeline.submit("order.created", {"order_id": "2"})
+    await asyncio.sleep(0.05)
+    await pipeline.close(timeout_seconds=0.05)
+
+    assert publisher.published == []
+    assert dropped_events() - dropped == 2
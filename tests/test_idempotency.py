@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.orders.infraestructure.idempotency.idempotency_middleware import IdempotencyMiddleware
+from app.orders.infraestructure.idempotency.idempotency_store import IdempotencyRecord, InMemoryIdempotencyStore, MongoIdempotencyStore
+
+PATH = "/api/v1/orders"
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryIdempotencyStore()
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return MongoIdempotencyStore(mongomock_motor.AsyncMongoMockClient().db)
+
+
+class Endpoint:
+    """ASGI app standing in for the order endpoint; counts calls and can be held open"""
+
+    def __init__(self, status_code: int = 201):
+        self.status_code = status_code
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = (await receive())["body"]
+        await self.release.wait()
+        response = json.dumps({"call": self.calls, "echo": body.decode()}).encode()
+        await send({"type": "http.response.start", "status": self.status_code, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": response})
+
+
+def client_for(endpoint: Endpoint, store, **options) -> httpx.AsyncClient:
+    middleware = IdempotencyMiddleware(endpoint, store_provider=lambda: store, paths=[PATH], **options)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+def post(client: httpx.AsyncClient, body: str = "order", key: str = "key-1"):
+    return client.post(PATH, content=body, headers={"Idempotency-Key": key})
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_the_stored_response(store):
+    endpoint = Endpoint()
+    async with client_for(endpoint, store) as client:
+        first = await post(client)
+        retry = await post(client)
+
+    assert endpoint.calls == 1
+    assert retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_waits_for_the_first_attempt(store):
+    endpoint = Endpoint()
+    endpoint.release.clear()
+    async with client_for(endpoint, store) as client:
+        first = asyncio.create_task(post(client))
+        duplicate = asyncio.create_task(post(client))
+        await asyncio.sleep(0.05)
+        endpoint.release.set()
+        first, duplicate = await first, await duplicate
+
+    assert endpoint.calls == 1
+    assert duplicate.status_code == first.status_code == 201
+    assert duplicate.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_duplicate_on_another_instance_waits_for_the_stored_response(store):
+    endpoint = Endpoint()
+    endpoint.release.clear()
+    async with client_for(endpoint, store) as instance, client_for(endpoint, store) as other_instance:
+        first = asyncio.create_task(post(instance))
+        await asyncio.sleep(0.02)
+        duplicate = asyncio.create_task(post(other_instance))
+        await asyncio.sleep(0.05)
+        endpoint.release.set()
+        first, duplicate = await first, await duplicate
+
+    assert endpoint.calls == 1
+    assert duplicate.content == first.content
+    assert duplicate.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_server_error_is_released_so_the_retry_runs_again(store):
+    endpoint = Endpoint(status_code=500)
+    async with client_for(endpoint, store) as client:
+        await post(client)
+        endpoint.status_code = 201
+        retry = await post(client)
+
+    assert endpoint.calls == 2
+    assert retry.status_code == 201
+    assert "idempotent-replayed" not in retry.headers
+
+
+@pytest.mark.asyncio
+async def test_same_key_with_another_body_is_rejected(store):
+    endpoint = Endpoint()
+    async with client_for(endpoint, store) as client:
+        await post(client, body="order")
+        mismatch = await post(client, body="another order")
+
+    assert endpoint.calls == 1
+    assert mismatch.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_taken_over_attempt_cannot_overwrite_the_new_owner(store):
+    assert await store.begin("key", "fingerprint", "slow", lock_seconds=0, ttl_seconds=60) is None
+    await asyncio.sleep(0.01)
+    # The lock expired: another instance takes the key over
+    assert await store.begin("key", "fingerprint", "fast", lock_seconds=30, ttl_seconds=60) is None
+
+    fast = IdempotencyRecord(key="key", fingerprint="fingerprint", claim_token="fast", status_code=201, body=b"fast")
+    slow = IdempotencyRecord(key="key", fingerprint="fingerprint", claim_token="slow", status_code=201, body=b"slow")
+    assert await store.complete(fast, ttl_seconds=60)
+    assert not await store.complete(slow, ttl_seconds=60)
+    await store.release("key", "slow")
+
+    record = await store.get("key")
+    assert record.completed and record.body == b"fast"
+
+
+@pytest.mark.asyncio
+async def test_release_only_gives_up_the_owned_attempt(store):
+    await store.begin("key", "fingerprint", "slow", lock_seconds=0, ttl_seconds=60)
+    await asyncio.sleep(0.01)
+    await store.begin("key", "fingerprint", "fast", lock_seconds=30, ttl_seconds=60)
+
+    await store.release("key", "slow")
+    assert (await store.get("key")).claim_token == "fast"
+
+    await store.release("key", "fast")
+    assert await store.get("key") is None
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.orders.infraestructure.messaging.broker_supervisor import CircuitBreaker
+from app.orders.infraestructure.messaging.rabbitmq_publisher import RabbitMQPublisher
+from app.orders.infraestructure.messaging.spill_buffer import SpillBuffer
+
+from fakes import FakeSupervisor
+
+
+def order_created() -> dict:
+    return {
+        "event_type": "order.created",
+        "order_id": "6ad511a90b19bc183f00da2c",
+        "total_amount": 10.0,
+        "items": [{"product_id": "p1", "quantity": 2, "unit_price": 5.0}],
+        "created_at": datetime(2026, 10, 18, 18, 36, 25, 847000, tzinfo=timezone.utc),
+    }
+
+
+@pytest.mark.asyncio
+async def test_replayed_message_matches_direct_publish(tmp_path):
+    supervisor = FakeSupervisor(CircuitBreaker(failure_threshold=5))
+    publisher = RabbitMQPublisher(supervisor, SpillBuffer(str(tmp_path / "spill.jsonl")))
+
+    await publisher.publish_message("order.created", order_created())
+    direct = supervisor.exchange.messages.pop()
+
+    supervisor.exchange.fail = True
+    await publisher.publish_message("order.created", order_created())
+    supervisor.exchange.fail = False
+    await publisher._replay_spilled()
+    replayed = supervisor.exchange.messages.pop()
+
+    assert replayed.body == direct.body
+    assert replayed.timestamp == direct.timestamp
+    assert replayed.timestamp is not None
+    assert replayed.headers == direct.headers
+    assert await publisher.spill_buffer.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_restores_datetimes(tmp_path):
+    buffer = SpillBuffer(str(tmp_path / "spill.jsonl"))
+    message = order_created()
+    await buffer.append([("order.created", message)])
+
+    replayed = []
+
+    async def publish_batch(messages):
+        replayed.extend(messages)
+
+    assert await buffer.replay(publish_batch) == 1
+    assert replayed == [("order.created", message)]